@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+from .game_logic import DIAGONALS, Board, Point, TurnSequence
+
+SQUARES = 32
+FULL_MASK = (1 << SQUARES) - 1
+
+
+class BitPosition(NamedTuple):
+    white_men: int = 0
+    white_kings: int = 0
+    black_men: int = 0
+    black_kings: int = 0
+
+    @property
+    def white(self) -> int:
+        return self.white_men | self.white_kings
+
+    @property
+    def black(self) -> int:
+        return self.black_men | self.black_kings
+
+    @property
+    def occupied(self) -> int:
+        return self.white_men | self.white_kings | self.black_men | self.black_kings
+
+
+class BitSequence(NamedTuple):
+    steps: tuple[tuple[int, int], ...]
+    captured: tuple[int, ...]
+    position: BitPosition
+
+    @property
+    def is_capture(self) -> bool:
+        return bool(self.captured)
+
+
+def square_index(point: Point) -> int:
+    row, col = point
+    return row * 4 + col // 2
+
+
+def square_point(square: int) -> Point:
+    row = square // 4
+    return row, (square % 4) * 2 + (1 - row % 2)
+
+
+def _is_playable(point: Point) -> bool:
+    row, col = point
+    return 0 <= row < 8 and 0 <= col < 8 and (row + col) % 2 == 1
+
+
+def _build_rays() -> tuple[tuple[tuple[int, ...], ...], ...]:
+    rays = []
+    for square in range(SQUARES):
+        row, col = square_point(square)
+        square_rays = []
+        for dr, dc in DIAGONALS:
+            ray = []
+            r, c = row + dr, col + dc
+            while _is_playable((r, c)):
+                ray.append(square_index((r, c)))
+                r += dr
+                c += dc
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+RAYS = _build_rays()
+BITS = tuple(1 << square for square in range(SQUARES))
+JUMPS: tuple[tuple[tuple[int, int], ...], ...] = tuple(
+    tuple((ray[0], ray[1]) for ray in RAYS[square] if len(ray) >= 2)
+    for square in range(SQUARES)
+)
+WHITE_STEPS = tuple(tuple(RAYS[square][d][0] for d in (0, 1) if RAYS[square][d]) for square in range(SQUARES))
+BLACK_STEPS = tuple(tuple(RAYS[square][d][0] for d in (2, 3) if RAYS[square][d]) for square in range(SQUARES))
+WHITE_PROMOTION = sum(BITS[square] for square in range(4))
+BLACK_PROMOTION = sum(BITS[square] for square in range(28, 32))
+
+
+def _iter_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _own(position: BitPosition, player: str) -> tuple[int, int]:
+    if player == "white":
+        return position.white_men, position.white_kings
+    return position.black_men, position.black_kings
+
+
+def _enemy(position: BitPosition, player: str) -> int:
+    return position.black if player == "white" else position.white
+
+
+def from_board(board: Board) -> BitPosition:
+    white_men = white_kings = black_men = black_kings = 0
+    for square in range(SQUARES):
+        row, col = square_point(square)
+        piece = board[row][col]
+        if piece == "w":
+            white_men |= BITS[square]
+        elif piece == "W":
+            white_kings |= BITS[square]
+        elif piece == "b":
+            black_men |= BITS[square]
+        elif piece == "B":
+            black_kings |= BITS[square]
+    return BitPosition(white_men, white_kings, black_men, black_kings)
+
+
+def to_board(position: BitPosition) -> Board:
+    board: Board = [[None for _ in range(8)] for _ in range(8)]
+    for mask, piece in zip(position, ("w", "W", "b", "B")):
+        for square in _iter_bits(mask):
+            row, col = square_point(square)
+            board[row][col] = piece
+    return board
+
+
+def piece_at(position: BitPosition, square: int) -> Optional[str]:
+    bit = BITS[square]
+    for mask, piece in zip(position, ("w", "W", "b", "B")):
+        if mask & bit:
+            return piece
+    return None
+
+
+def _captures_from(
+    square: int,
+    is_king: bool,
+    enemy: int,
+    occupied: int,
+    blocked: int,
+) -> list[tuple[int, int]]:
+    captures: list[tuple[int, int]] = []
+    if not is_king:
+        for middle, landing in JUMPS[square]:
+            landing_bit = BITS[landing]
+            if landing_bit & blocked or landing_bit & occupied:
+                continue
+            if BITS[middle] & enemy:
+                captures.append((landing, middle))
+        return captures
+
+    for ray in RAYS[square]:
+        jumped = -1
+        for target in ray:
+            bit = BITS[target]
+            if bit & blocked:
+                break
+            if jumped < 0:
+                if not bit & occupied:
+                    continue
+                if not bit & enemy:
+                    break
+                jumped = target
+                continue
+            if bit & occupied:
+                break
+            captures.append((target, jumped))
+    return captures
+
+
+def piece_capture_moves(
+    position: BitPosition,
+    square: int,
+    player: str,
+    blocked: int = 0,
+) -> list[int]:
+    men, kings = _own(position, player)
+    bit = BITS[square]
+    if not (men | kings) & bit:
+        return []
+    captures = _captures_from(square, bool(kings & bit), _enemy(position, player), position.occupied, blocked)
+    return [landing for landing, _ in captures]
+
+
+def _quiet_moves(position: BitPosition, square: int, player: str) -> list[int]:
+    men, kings = _own(position, player)
+    occupied = position.occupied
+    if men & BITS[square]:
+        steps = WHITE_STEPS if player == "white" else BLACK_STEPS
+        return [target for target in steps[square] if not BITS[target] & occupied]
+    moves: list[int] = []
+    for ray in RAYS[square]:
+        for target in ray:
+            if BITS[target] & occupied:
+                break
+            moves.append(target)
+    return moves
+
+
+def any_capture(position: BitPosition, player: str, blocked: int = 0) -> bool:
+    men, kings = _own(position, player)
+    enemy = _enemy(position, player)
+    occupied = position.occupied
+    for square in _iter_bits(men | kings):
+        if _captures_from(square, bool(kings & BITS[square]), enemy, occupied, blocked):
+            return True
+    return False
+
+
+def has_legal_move(position: BitPosition, player: str) -> bool:
+    men, kings = _own(position, player)
+    if not men | kings:
+        return False
+    if any_capture(position, player):
+        return True
+    return any(_quiet_moves(position, square, player) for square in _iter_bits(men | kings))
+
+
+def _place(position: BitPosition, player: str, men: int, kings: int, enemy_men: int, enemy_kings: int) -> BitPosition:
+    if player == "white":
+        return BitPosition(men, kings, enemy_men, enemy_kings)
+    return BitPosition(enemy_men, enemy_kings, men, kings)
+
+
+def apply_move(
+    position: BitPosition,
+    start: int,
+    end: int,
+    player: str,
+    blocked: int = 0,
+    forced_start: int | None = None,
+) -> tuple[BitPosition, int | None]:
+    men, kings = _own(position, player)
+    start_bit = BITS[start]
+    end_bit = BITS[end]
+    if not (men | kings) & start_bit or position.occupied & end_bit:
+        raise ValueError("Неверный ход")
+    if forced_start is not None and start != forced_start:
+        raise ValueError("Нужно продолжить взятие той же шашкой")
+
+    is_king = bool(kings & start_bit)
+    captures = _captures_from(start, is_king, _enemy(position, player), position.occupied, blocked)
+    captured: int | None = None
+    if captures:
+        for landing, jumped in captures:
+            if landing == end:
+                captured = jumped
+                break
+        else:
+            raise ValueError("Неверный ход")
+    elif forced_start is not None:
+        raise ValueError("Нужно продолжить взятие")
+    elif any_capture(position, player, blocked):
+        raise ValueError("Обязательное взятие")
+    elif end not in _quiet_moves(position, start, player):
+        raise ValueError("Неверный ход")
+
+    enemy_men, enemy_kings = _own(position, "black" if player == "white" else "white")
+    if captured is not None:
+        enemy_men &= ~BITS[captured]
+        enemy_kings &= ~BITS[captured]
+    promotion = WHITE_PROMOTION if player == "white" else BLACK_PROMOTION
+    if is_king:
+        kings = (kings & ~start_bit) | end_bit
+    elif end_bit & promotion:
+        men &= ~start_bit
+        kings |= end_bit
+    else:
+        men = (men & ~start_bit) | end_bit
+    return _place(position, player, men, kings, enemy_men, enemy_kings), captured
+
+
+def _capture_chains(
+    square: int,
+    is_king: bool,
+    player: str,
+    men: int,
+    kings: int,
+    enemy_men: int,
+    enemy_kings: int,
+    blocked: int,
+    steps: tuple[tuple[int, int], ...],
+    captured: tuple[int, ...],
+    out: list[BitSequence],
+    position: BitPosition,
+) -> None:
+    enemy = enemy_men | enemy_kings
+    occupied = men | kings | enemy
+    jumps = _captures_from(square, is_king, enemy, occupied, blocked)
+    if not jumps:
+        if steps:
+            out.append(BitSequence(steps, captured, _place(position, player, men, kings, enemy_men, enemy_kings)))
+        return
+
+    promotion = WHITE_PROMOTION if player == "white" else BLACK_PROMOTION
+    square_bit = BITS[square]
+    for landing, jumped in jumps:
+        landing_bit = BITS[landing]
+        jumped_bit = BITS[jumped]
+        next_is_king = is_king or bool(landing_bit & promotion)
+        if is_king:
+            next_men, next_kings = men, (kings & ~square_bit) | landing_bit
+        elif next_is_king:
+            next_men, next_kings = men & ~square_bit, kings | landing_bit
+        else:
+            next_men, next_kings = (men & ~square_bit) | landing_bit, kings
+        _capture_chains(
+            landing,
+            next_is_king,
+            player,
+            next_men,
+            next_kings,
+            enemy_men & ~jumped_bit,
+            enemy_kings & ~jumped_bit,
+            blocked | jumped_bit,
+            steps + ((square, landing),),
+            captured + (jumped,),
+            out,
+            position,
+        )
+
+
+def generate_turn_sequences(position: BitPosition, player: str) -> list[BitSequence]:
+    men, kings = _own(position, player)
+    enemy_men, enemy_kings = _own(position, "black" if player == "white" else "white")
+    captures: list[BitSequence] = []
+    for square in _iter_bits(men | kings):
+        _capture_chains(
+            square,
+            bool(kings & BITS[square]),
+            player,
+            men,
+            kings,
+            enemy_men,
+            enemy_kings,
+            0,
+            (),
+            (),
+            captures,
+            position,
+        )
+    if captures:
+        return captures
+
+    promotion = WHITE_PROMOTION if player == "white" else BLACK_PROMOTION
+    quiet: list[BitSequence] = []
+    for square in _iter_bits(men | kings):
+        square_bit = BITS[square]
+        is_king = bool(kings & square_bit)
+        for target in _quiet_moves(position, square, player):
+            target_bit = BITS[target]
+            if is_king:
+                next_men, next_kings = men, (kings & ~square_bit) | target_bit
+            elif target_bit & promotion:
+                next_men, next_kings = men & ~square_bit, kings | target_bit
+            else:
+                next_men, next_kings = (men & ~square_bit) | target_bit, kings
+            quiet.append(
+                BitSequence(
+                    ((square, target),),
+                    (),
+                    _place(position, player, next_men, next_kings, enemy_men, enemy_kings),
+                )
+            )
+    return quiet
+
+
+def game_status(position: BitPosition) -> Optional[str]:
+    if not has_legal_move(position, "black"):
+        return "white_win"
+    if not has_legal_move(position, "white"):
+        return "black_win"
+    return None
+
+
+def to_turn_sequence(sequence: BitSequence) -> TurnSequence:
+    return TurnSequence(
+        steps=tuple((square_point(start), square_point(end)) for start, end in sequence.steps),
+        board=to_board(sequence.position),
+        captured_positions=tuple(square_point(square) for square in sequence.captured),
+    )
+
+
+def board_turn_sequences(board: Board, player: str) -> list[TurnSequence]:
+    return [to_turn_sequence(sequence) for sequence in generate_turn_sequences(from_board(board), player)]
+
+
+def board_game_status(board: Board) -> Optional[str]:
+    return game_status(from_board(board))
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import multiprocessing
+import os
 import random
 import sys
 import time
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Iterable
+from typing import Callable, Iterable, Iterator
 
 if __package__ in (None, ""):
     sys.path.append(str(Path(__file__).resolve().parents[3]))
@@ -22,15 +25,19 @@ if __package__ in (None, ""):
         weights_from_mapping,
         weights_to_dict,
     )
-    from src.app.game.bot_memory import DEFAULT_MEMORY_PATH, MoveMemory, outcome_score, project_path
-    from src.app.game.game_logic import (
-        Board,
-        create_initial_board,
-        format_move,
-        game_status,
-        generate_turn_sequences,
-        opponent,
+    from src.app.game.bot_memory import (
+        DEFAULT_MEMORY_PATH,
+        DeltaMemory,
+        MemoryDelta,
+        MoveMemory,
+        PruneReport,
+        outcome_score,
+        project_path,
+        write_binary_memory,
     )
+    from src.app.game.bitboard import board_game_status as game_status
+    from src.app.game.bitboard import board_turn_sequences as generate_turn_sequences
+    from src.app.game.game_logic import Board, create_initial_board, format_move, opponent
     from src.app.game.single_logic import (
         captured_material,
         choose_turn,
@@ -38,6 +45,7 @@ if __package__ in (None, ""):
         root_safety_penalty,
         root_tactical_bonus,
     )
+    from src.app.game.transposition import SharedTranspositionTable, TranspositionTable
 else:
     from .bot_profiles import (
         BotProfile,
@@ -49,9 +57,23 @@ else:
         weights_from_mapping,
         weights_to_dict,
     )
-    from .bot_memory import DEFAULT_MEMORY_PATH, MoveMemory, outcome_score, project_path
-    from .game_logic import Board, create_initial_board, format_move, game_status, generate_turn_sequences, opponent
+    from .bot_memory import (
+        DEFAULT_MEMORY_PATH,
+        DeltaMemory,
+        MemoryDelta,
+        MoveMemory,
+        PruneReport,
+        outcome_score,
+        project_path,
+        write_binary_memory,
+    )
+    from .bitboard import board_game_status as game_status
+    from .bitboard import board_turn_sequences as generate_turn_sequences
+    from .game_logic import Board, create_initial_board, format_move, opponent
     from .single_logic import captured_material, choose_turn, evaluate_board, root_safety_penalty, root_tactical_bonus
+    from .transposition import SharedTranspositionTable, TranspositionTable
+
+ARENA_START_METHOD = os.getenv("CHECKERS_ARENA_START_METHOD", "spawn")
 
 ArenaObserver = Callable[[dict[str, object]], None]
 
@@ -211,7 +233,7 @@ def _immediate_learning_score(board: Board, player: str, sequence, profile: BotP
     return max(-0.6, min(0.6, scaled))
 
 
-def choose_arena_turn(board: Board, player: str, bot: ArenaBot):
+def choose_arena_turn(board: Board, player: str, bot: ArenaBot, tt: TranspositionTable | None = None):
     sequence = choose_turn(
         board,
         player,
@@ -219,9 +241,12 @@ def choose_arena_turn(board: Board, player: str, bot: ArenaBot):
         max_depth=bot.max_depth,
         time_limit=bot.time_limit,
         weights=bot.profile.weights,
+        # The book is mined from arena reports; matches measure and train the search itself.
+        search=replace(bot.profile.search, opening_book=False),
         memory=bot.memory,
         memory_strength=bot.memory_strength,
         use_default_memory=False,
+        tt=tt,
     )
     if (
         sequence is None
@@ -252,6 +277,12 @@ def choose_arena_turn(board: Board, player: str, bot: ArenaBot):
     return random.choice(pool[: min(3, len(pool))]), True
 
 
+def _game_table(bot: ArenaBot) -> TranspositionTable:
+    if bot.profile.search.parallel_workers > 1:
+        return SharedTranspositionTable.create()
+    return TranspositionTable()
+
+
 def play_game(
     white: ArenaBot,
     black: ArenaBot,
@@ -277,6 +308,7 @@ def play_game(
     current = initial_player if initial_board is not None else "white"
     moves: list[str] = list(initial_moves or []) if record_moves else []
     learned_decisions: list[dict[str, object]] = []
+    tables = {"white": _game_table(white), "black": _game_table(black)}
     status = game_status(board)
     plies = initial_plies if initial_board is not None else 0
     if observer is not None:
@@ -299,7 +331,7 @@ def play_game(
                 explored = False
                 bot_name = "opening"
             else:
-                sequence, explored = choose_arena_turn(board, current, bot)
+                sequence, explored = choose_arena_turn(board, current, bot, tables[current])
             if sequence is None:
                 status = f"{opponent(current)}_win"
                 break
@@ -350,6 +382,7 @@ def play_game(
                 player,
                 decision["steps"],
                 credit,
+                ply=ply,
             )
         if observer is not None:
             observer({
@@ -360,6 +393,8 @@ def play_game(
                 "board": board,
             })
     finally:
+        for table in tables.values():
+            table.close()
         random.setstate(random_state)
 
     return {
@@ -415,6 +450,151 @@ def _summarize_games(games: Iterable[dict[str, object]], bot_a: ArenaBot, bot_b:
     }
 
 
+@dataclass(frozen=True)
+class _ScheduledGame:
+    index: int
+    a_is_white: bool
+    seed: int
+    opening: tuple[Board, str, int, list[str]] | None = None
+
+
+def _match_schedule(
+    games: int,
+    *,
+    seed: int,
+    alternate_colors: bool,
+    paired_openings: bool,
+    opening_plies: int,
+    record_moves: bool,
+) -> list[_ScheduledGame]:
+    schedule: list[_ScheduledGame] = []
+    index = 0
+    while index < games:
+        opening = None
+        if paired_openings and alternate_colors:
+            opening = build_opening(opening_plies=opening_plies, seed=seed + index // 2, record_moves=record_moves)
+
+        if alternate_colors and index % 2 == 1:
+            colors = [False]
+        elif paired_openings and alternate_colors and index + 1 < games:
+            colors = [True, False]
+        else:
+            colors = [True]
+
+        for a_is_white in colors:
+            if index >= games:
+                break
+            schedule.append(_ScheduledGame(index + 1, a_is_white, seed + index, opening))
+            index += 1
+    return schedule
+
+
+def _play_scheduled(
+    bot_a: ArenaBot,
+    bot_b: ArenaBot,
+    game: _ScheduledGame,
+    *,
+    max_plies: int,
+    record_moves: bool,
+    observer: ArenaObserver | None,
+    opening_plies: int,
+    draw_score: float,
+) -> dict[str, object]:
+    white, black = (bot_a, bot_b) if game.a_is_white else (bot_b, bot_a)
+    if game.opening is None:
+        result = play_game(
+            white,
+            black,
+            max_plies=max_plies,
+            seed=game.seed,
+            record_moves=record_moves,
+            observer=observer,
+            game_index=game.index,
+            opening_plies=opening_plies,
+            draw_score=draw_score,
+        )
+    else:
+        board, player, plies, moves = game.opening
+        result = play_game(
+            white,
+            black,
+            max_plies=max_plies,
+            seed=game.seed,
+            record_moves=record_moves,
+            observer=observer,
+            game_index=game.index,
+            opening_plies=0,
+            draw_score=draw_score,
+            initial_board=board,
+            initial_player=player,
+            initial_plies=plies,
+            initial_moves=list(moves),
+        )
+    result["winner_bot"] = _winner_bot(result)
+    return result
+
+
+_worker_bots: tuple[ArenaBot, ArenaBot] | None = None
+_worker_options: dict[str, object] = {}
+
+
+def _worker_bot(bot: ArenaBot) -> ArenaBot:
+    # Match workers already use the CPUs, and Lazy SMP helpers would make games depend on timing.
+    profile = replace(bot.profile, search=replace(bot.profile.search, parallel_workers=1))
+    memory = bot.memory
+    if memory is not None:
+        memory = MoveMemory(
+            positions=memory.positions,
+            total_updates=memory.total_updates,
+            metadata=memory.metadata,
+            generation=memory.generation,
+        )
+    return replace(bot, profile=profile, memory=memory)
+
+
+def _init_match_worker(bot_a: ArenaBot, bot_b: ArenaBot, options: dict[str, object]) -> None:
+    global _worker_bots, _worker_options
+    _worker_bots = (bot_a, bot_b)
+    _worker_options = options
+
+
+def _play_isolated(game: _ScheduledGame) -> tuple[dict[str, object], list[list[MemoryDelta]]]:
+    """Play one game against the batch-start memory, returning its memory updates instead of applying them."""
+    assert _worker_bots is not None
+    bots = [
+        bot if bot.memory is None or not bot.learn else replace(bot, memory=DeltaMemory.over(bot.memory))
+        for bot in _worker_bots
+    ]
+    result = _play_scheduled(bots[0], bots[1], game, observer=None, **_worker_options)
+    deltas = [bot.memory.deltas if isinstance(bot.memory, DeltaMemory) else [] for bot in bots]
+    return result, deltas
+
+
+def _play_in_workers(
+    bot_a: ArenaBot,
+    bot_b: ArenaBot,
+    schedule: list[_ScheduledGame],
+    workers: int,
+    options: dict[str, object],
+) -> Iterator[tuple[dict[str, object], list[list[MemoryDelta]]]]:
+    global _worker_bots
+    snapshots = (_worker_bot(bot_a), _worker_bot(bot_b))
+    if workers == 1:
+        _init_match_worker(*snapshots, options)
+        try:
+            yield from map(_play_isolated, schedule)
+        finally:
+            _worker_bots = None
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(ARENA_START_METHOD),
+        initializer=_init_match_worker,
+        initargs=(*snapshots, options),
+    ) as pool:
+        yield from pool.map(_play_isolated, schedule)
+
+
 def run_match(
     bot_a: ArenaBot,
     bot_b: ArenaBot,
@@ -430,57 +610,52 @@ def run_match(
     opening_plies: int = 2,
     draw_score: float = -0.15,
     paired_openings: bool = True,
+    workers: int = 0,
 ) -> dict[str, object]:
-    played: list[dict[str, object]] = []
-    index = 0
-    while index < games:
-        pair_board = pair_player = pair_plies = pair_moves = None
-        if paired_openings and alternate_colors:
-            pair_board, pair_player, pair_plies, pair_moves = build_opening(
-                opening_plies=opening_plies,
-                seed=seed + index // 2,
-                record_moves=record_moves,
-            )
+    """Play a match; ``workers`` > 0 plays every game from the batch-start memory and merges updates afterwards.
+
+    Without workers each game learns from the ones before it, as it always has.
+    """
+    schedule = _match_schedule(
+        games,
+        seed=seed,
+        alternate_colors=alternate_colors,
+        paired_openings=paired_openings,
+        opening_plies=opening_plies,
+        record_moves=record_moves,
+    )
+    options = {
+        "max_plies": max_plies,
+        "record_moves": record_moves,
+        "opening_plies": opening_plies,
+        "draw_score": draw_score,
+    }
+    if workers > 0 and observer is not None:
+        raise ValueError("a match observer cannot watch games played in worker processes")
 
-        if alternate_colors and index % 2 == 1:
-            pairings = [(bot_b, bot_a)]
-        elif paired_openings and alternate_colors and index + 1 < games:
-            pairings = [(bot_a, bot_b), (bot_b, bot_a)]
-        else:
-            pairings = [(bot_a, bot_b)]
+    if workers > 0:
+        outcomes = _play_in_workers(bot_a, bot_b, schedule, workers, options)
+    else:
+        outcomes = ((_play_scheduled(bot_a, bot_b, game, observer=observer, **options), None) for game in schedule)
 
-        for white, black in pairings:
-            if index >= games:
-                break
-            use_paired_opening = pair_board is not None
-            current_game_index = index + 1
-            game_seed = seed + index
-            initial_moves = list(pair_moves or [])
-            result = play_game(
-                white,
-                black,
-                max_plies=max_plies,
-                seed=game_seed,
-                record_moves=record_moves,
-                observer=observer,
-                game_index=current_game_index,
-                opening_plies=0 if use_paired_opening else opening_plies,
-                draw_score=draw_score,
-                initial_board=pair_board if use_paired_opening else None,
-                initial_player=str(pair_player) if use_paired_opening else "white",
-                initial_plies=int(pair_plies or 0) if use_paired_opening else 0,
-                initial_moves=initial_moves if use_paired_opening else None,
+    played: list[dict[str, object]] = []
+    game_deltas: list[list[list[MemoryDelta]]] = []
+    for game, (result, deltas) in zip(schedule, outcomes):
+        played.append(result)
+        if deltas is not None:
+            game_deltas.append(deltas)
+        if progress:
+            print(
+                f"{progress_label} {game.index}/{games}: winner_bot={result['winner_bot']} "
+                f"winner_color={result['winner']} status={result['status']} "
+                f"plies={result['plies']} duration_ms={result['duration_ms']}",
+                flush=True,
             )
-            result["winner_bot"] = _winner_bot(result)
-            played.append(result)
-            if progress:
-                print(
-                    f"{progress_label} {current_game_index}/{games}: winner_bot={result['winner_bot']} "
-                    f"winner_color={result['winner']} status={result['status']} "
-                    f"plies={result['plies']} duration_ms={result['duration_ms']}",
-                    flush=True,
-                )
-            index += 1
+
+    for deltas in game_deltas:
+        for bot, bot_deltas in zip((bot_a, bot_b), deltas):
+            for position_key, move_key, score, ply in bot_deltas:
+                bot.memory.apply_delta(position_key, move_key, score, ply=ply)
 
     return {
         "created_at": _now_iso(),
@@ -525,6 +700,7 @@ def mutate_profile(
         name=name or f"{profile.name}_mutated",
         description=f"Mutated from {profile.name}",
         weights=weights_from_mapping(data, profile.weights),
+        search=profile.search,
     )
 
 
@@ -542,6 +718,7 @@ def tune_profile(
     scale: float,
     opening_plies: int,
     draw_score: float,
+    workers: int = 0,
 ) -> tuple[BotProfile, list[dict[str, object]]]:
     rng = random.Random(seed)
     current = start_profile
@@ -558,6 +735,7 @@ def tune_profile(
             record_moves=False,
             opening_plies=opening_plies,
             draw_score=draw_score,
+            workers=workers,
         )
         best_score = float(best_report["summary"]["score_rate"])
 
@@ -577,6 +755,7 @@ def tune_profile(
                 record_moves=False,
                 opening_plies=opening_plies,
                 draw_score=draw_score,
+                workers=workers,
             )
             score = float(report["summary"]["score_rate"])
             if score > best_score:
@@ -607,6 +786,17 @@ def write_report(report: dict[str, object], path: str | Path) -> None:
         f.write("\n")
 
 
+def with_search_pruning(profile: BotProfile, mode: str) -> BotProfile:
+    if mode == "profile":
+        return profile
+    search = replace(
+        profile.search,
+        late_move_reductions=mode in ("all", "lmr"),
+        delta_pruning=mode in ("all", "delta"),
+    )
+    return replace(profile, search=search)
+
+
 def _load_named_profile(name_or_path: str) -> BotProfile:
     path = Path(name_or_path)
     if path.exists():
@@ -709,16 +899,76 @@ def _accept_validated_memory(
         )
         return False
 
-    memory.metadata["best_validation_score"] = score
-    memory.metadata["best_validation_at"] = _now_iso()
-    memory.metadata["best_validation_summary"] = validation_report["summary"]
-    memory.metadata["best_validation_settings"] = validation_report["settings"]
+    memory.update_metadata(
+        {
+            "best_validation_score": score,
+            "best_validation_at": _now_iso(),
+            "best_validation_summary": validation_report["summary"],
+            "best_validation_settings": validation_report["settings"],
+        }
+    )
     print(f"validation: new best score_rate={score:.4f}; accepted into {project_path(memory_path)}", flush=True)
     return True
 
 
+def _print_prune(report: PruneReport) -> None:
+    removed = " ".join(f"{reason}={count}" for reason, count in report.removed.items())
+    print(
+        f"prune: positions {report.positions_before}->{report.positions_after} "
+        f"moves {report.moves_before}->{report.moves_after} ({removed}); "
+        f"bias mass lost {report.bias_mass_lost:.2f} of {report.bias_mass_before:.2f} "
+        f"({report.lost_fraction:.2%})",
+        flush=True,
+    )
+
+
+def prune_memory(args: argparse.Namespace) -> None:
+    memory = MoveMemory.load(args.memory)
+    report = memory.prune(
+        min_visits=args.min_visits,
+        max_age=args.max_age or None,
+        max_ply=args.max_ply or None,
+        max_moves=args.memory_budget or None,
+    )
+    _print_prune(report)
+    if args.dry_run:
+        print("dry run: memory left unchanged", flush=True)
+        return
+    memory.compact(args.memory)
+    if args.memory_binary:
+        write_binary_memory(memory, args.memory_binary)
+    print(f"memory written: {project_path(args.memory)}", flush=True)
+
+
+def _save_memory(memory: MoveMemory, args: argparse.Namespace, batch: int) -> None:
+    journal = memory.open_journal(args.memory)
+    journal.release()
+    if batch % max(1, args.compact_interval) == 0:
+        if args.memory_budget > 0:
+            _print_prune(memory.prune(max_moves=args.memory_budget))
+        memory.compact(args.memory)
+        action = "compacted"
+    else:
+        journal.flush()
+        action = "journaled"
+    if args.memory_binary:
+        write_binary_memory(memory, args.memory_binary)
+    print(
+        f"memory {action}: positions={memory.position_count} "
+        f"moves={memory.move_count} updates={memory.total_updates}",
+        flush=True,
+    )
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run self-play matches for checkers bot profiles.")
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        choices=("play", "prune"),
+        default="play",
+        help="play: self-play batches (default); prune: evict weak move-memory entries and exit.",
+    )
     parser.add_argument("--baseline", default="hard", help="Baseline profile name or JSON path.")
     parser.add_argument("--candidate", default="hardcore", help="Candidate profile name or JSON path.")
     parser.add_argument("--games", type=int, default=20)
@@ -737,6 +987,32 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--mutate-scale", type=float, default=0.18)
     parser.add_argument("--save-profile", default="", help="Where to save the best tuned profile JSON.")
     parser.add_argument("--memory", default=str(DEFAULT_MEMORY_PATH), help="Persistent move-memory JSON path.")
+    parser.add_argument(
+        "--memory-binary",
+        default="",
+        help="Also write the memory in the memory-mapped binary format the server can load (CHECKERS_MEMORY).",
+    )
+    parser.add_argument(
+        "--compact-interval",
+        type=int,
+        default=10,
+        help="Batches between folding the memory journal into a new snapshot.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=0,
+        help="Most move-memory entries to keep; the weakest are evicted at compaction. 0 keeps everything.",
+    )
+    parser.add_argument("--min-visits", type=int, default=2, help="prune: drop entries visited fewer times.")
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=0,
+        help="prune: drop entries not updated for N generations; entries older than generation tracking count as current.",
+    )
+    parser.add_argument("--max-ply", type=int, default=0, help="prune: drop entries first seen deeper than N plies.")
+    parser.add_argument("--dry-run", action="store_true", help="prune: report without writing the memory.")
     parser.add_argument("--no-memory", action="store_true", help="Disable move-memory learning for candidate.")
     parser.add_argument("--memory-strength", type=int, default=700, help="How strongly learned move memory affects search.")
     parser.add_argument("--exploration", type=float, default=0.08, help="Chance to try a safe alternative move during learning.")
@@ -749,19 +1025,45 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--watch", action="store_true", help="Print a live board after every move.")
     parser.add_argument("--watch-delay", type=float, default=0.25, help="Seconds to wait between watched moves.")
     parser.add_argument("--quiet", action="store_true", help="Do not print per-game progress.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Play each batch across N processes from the batch-start memory; 0 learns game by game in-process.",
+    )
+    parser.add_argument(
+        "--candidate-pruning",
+        choices=("profile", "all", "lmr", "delta", "none"),
+        default="profile",
+        help="Override late move reductions / quiescence delta pruning for the candidate.",
+    )
+    parser.add_argument(
+        "--baseline-pruning",
+        choices=("profile", "all", "lmr", "delta", "none"),
+        default="profile",
+        help="Override late move reductions / quiescence delta pruning for the baseline.",
+    )
+    args = parser.parse_args()
+    if args.watch and args.workers > 0:
+        parser.error("--watch cannot be combined with --workers")
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    baseline_profile = _load_named_profile(args.baseline)
-    candidate_profile = _load_named_profile(args.candidate)
+    if args.mode == "prune":
+        prune_memory(args)
+        return
+    baseline_profile = with_search_pruning(_load_named_profile(args.baseline), args.baseline_pruning)
+    candidate_profile = with_search_pruning(_load_named_profile(args.candidate), args.candidate_pruning)
     move_memory = None if args.no_memory else MoveMemory.load(args.memory)
     if move_memory is not None:
-        if not args.no_draw_pressure:
-            changed = move_memory.apply_draw_pressure(args.draw_score)
-            if changed:
-                print(f"draw pressure: revalued {changed} pure-draw memories", flush=True)
+        changed = 0 if args.no_draw_pressure else move_memory.apply_draw_pressure(args.draw_score)
+        if changed:
+            print(f"draw pressure: revalued {changed} pure-draw memories", flush=True)
+            move_memory.compact(args.memory)
+        else:
+            move_memory.open_journal(args.memory)
         print(
             f"memory: {project_path(args.memory)} "
             f"positions={move_memory.position_count} moves={move_memory.move_count} "
@@ -772,11 +1074,17 @@ def main() -> None:
 
     while True:
         batch += 1
-        batch_start_memory = move_memory.clone() if move_memory is not None else None
+        batch_start_offset = None
+        if move_memory is not None:
+            journal = move_memory.open_journal(args.memory)
+            batch_start_offset = journal.offset()
+            # Nothing reaches the file (or a server watching it) until the batch is accepted.
+            journal.hold()
+            move_memory.new_generation()
         batch_start_stats = _memory_snapshot(move_memory)
         print(
             f"batch {batch}: candidate={candidate_profile.name} baseline={baseline_profile.name} "
-            f"games={args.games} depth={args.depth} time_limit={args.time_limit}",
+            f"games={args.games} depth={args.depth} time_limit={args.time_limit} workers={args.workers}",
             flush=True,
         )
         if args.tune_rounds > 0:
@@ -797,6 +1105,7 @@ def main() -> None:
                 scale=args.mutate_scale,
                 opening_plies=args.opening_plies,
                 draw_score=args.draw_score,
+                workers=args.workers,
             )
         else:
             events = []
@@ -824,6 +1133,7 @@ def main() -> None:
             opening_plies=args.opening_plies,
             draw_score=args.draw_score,
             paired_openings=not args.unpaired_openings,
+            workers=args.workers,
         )
         batch_after_stats = _memory_snapshot(move_memory)
         report["training"] = {
@@ -882,6 +1192,7 @@ def main() -> None:
                     opening_plies=args.opening_plies,
                     draw_score=args.draw_score,
                     paired_openings=not args.unpaired_openings,
+                    workers=args.workers,
                 )
                 accepted = _accept_validated_memory(
                     memory=move_memory,
@@ -889,22 +1200,12 @@ def main() -> None:
                     validation_report=validation_report,
                     min_delta=args.best_min_delta,
                 )
-                if not accepted and batch_start_memory is not None:
-                    move_memory = batch_start_memory
+                if not accepted and batch_start_offset is not None:
+                    move_memory = move_memory.rollback(args.memory, batch_start_offset)
                 else:
-                    move_memory.save(args.memory)
-                    print(
-                        f"memory saved: positions={move_memory.position_count} "
-                        f"moves={move_memory.move_count} updates={move_memory.total_updates}",
-                        flush=True,
-                    )
+                    _save_memory(move_memory, args, batch)
             else:
-                move_memory.save(args.memory)
-                print(
-                    f"memory saved: positions={move_memory.position_count} "
-                    f"moves={move_memory.move_count} updates={move_memory.total_updates}",
-                    flush=True,
-                )
+                _save_memory(move_memory, args, batch)
 
         if not args.loop:
             break
@@ -0,0 +1,593 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+from typing import Any
+
+from .bot_memory import SEARCH_MEMORY_PATH, memory_cache, shared_move_memory
+from .endgame import default_tablebase
+from .game_logic import Board, Move, Point, apply_sequence, generate_turn_sequences, opponent
+from .opening_book import default_opening_book
+from .single_logic import play_bot_turn, predicted_reply
+from .parallel_search import shutdown_helpers
+from .transposition import game_table, release_game_table
+from .zobrist import position_hash
+
+BOT_SEARCH_WORKERS = int(os.getenv("CHECKERS_BOT_WORKERS", "2"))
+BOT_SEARCH_START_METHOD = os.getenv("CHECKERS_BOT_START_METHOD", "spawn")
+PONDER_ENABLED = os.getenv("CHECKERS_PONDER", "1") == "1"
+PONDER_MAX_GAMES = int(os.getenv("CHECKERS_PONDER_GAMES", str(max(1, BOT_SEARCH_WORKERS // 2))))
+PONDER_SECONDS = float(os.getenv("CHECKERS_PONDER_SECONDS", "15"))
+PONDER_DIFFICULTIES = frozenset({"hard", "hardcore"})
+BOT_QUEUE_LIMIT = int(os.getenv("CHECKERS_BOT_QUEUE", str(8 * max(1, BOT_SEARCH_WORKERS))))
+LANE_STEAL_SECONDS = 0.5
+QUEUE_WARN_SECONDS = 2.0
+# searches waiting per worker -> share of the normal thinking time
+LOAD_TIME_SCALES = ((0.5, 1.0), (1.0, 0.6), (2.0, 0.35))
+MIN_TIME_SCALE = 0.2
+CANCEL_SLOTS = 256
+TIMING_WINDOW = 200
+
+logger = logging.getLogger(__name__)
+
+BotTurnResult = tuple[Board, list[Point], list[Point]]
+
+_worker_cancel_flags: Any = None
+_pondered: dict[str, tuple[int, BotTurnResult]] = {}
+
+
+class BotSearchCancelled(Exception):
+    pass
+
+
+class BotSearchRejected(Exception):
+    """The search queue is full; the caller should retry shortly."""
+
+
+def _init_worker(cancel_flags: Any) -> None:
+    global _worker_cancel_flags
+    _worker_cancel_flags = cancel_flags
+    # Lazy SMP helpers are started from inside the lane, so the lane has to stop them when it exits.
+    Finalize(None, shutdown_helpers, exitpriority=20)
+    default_opening_book()
+    default_tablebase()
+    shared_move_memory(SEARCH_MEMORY_PATH)
+
+
+def _run_search(
+    slot: int,
+    game_id: str,
+    board: Board,
+    player: str,
+    difficulty: str,
+    clock_expires: float | None = None,
+    time_scale: float = 1.0,
+) -> tuple[BotTurnResult, tuple[Move, ...] | None, bool, float, float, dict[str, object]]:
+    started = time.time()
+    flags = _worker_cancel_flags
+    should_stop = (lambda: bool(flags[slot])) if flags is not None else None
+    pondered = _pondered.pop(game_id, None)
+    reused = pondered is not None and pondered[0] == position_hash(board, player)
+    if reused:
+        result = pondered[1]
+    else:
+        result = play_bot_turn(
+            board,
+            player,
+            difficulty,
+            should_stop=should_stop,
+            game_id=game_id,
+            clock_expires=clock_expires,
+            time_scale=time_scale,
+        )
+    reply = predicted_reply(result[0], opponent(player), game_table(game_id))
+    return result, reply, reused, started, time.time(), memory_cache(SEARCH_MEMORY_PATH).metrics()
+
+
+def _run_ponder(
+    slot: int,
+    game_id: str,
+    board: Board,
+    player: str,
+    difficulty: str,
+    clock_expires: float | None = None,
+) -> bool:
+    """Search the position expected after the human's reply; the game's table stays warm either way."""
+    flags = _worker_cancel_flags
+    deadline = time.time() + PONDER_SECONDS
+
+    def should_stop() -> bool:
+        return bool(flags[slot]) or time.time() >= deadline
+
+    _pondered.pop(game_id, None)
+    result = play_bot_turn(
+        board,
+        player,
+        difficulty,
+        should_stop=should_stop,
+        game_id=game_id,
+        clock_expires=clock_expires,
+    )
+    if flags[slot]:
+        return False
+    # A ponder cut off by PONDER_SECONDS still has its best move so far, which beats starting over.
+    _pondered[game_id] = (position_hash(board, player), result)
+    return True
+
+
+def _release_game(game_id: str) -> None:
+    _pondered.pop(game_id, None)
+    release_game_table(game_id)
+
+
+@dataclass(frozen=True)
+class SearchTiming:
+    game_id: str
+    difficulty: str
+    queue_ms: float
+    search_ms: float
+    cancelled: bool = False
+    time_scale: float = 1.0
+
+
+@dataclass
+class _Job:
+    game_id: str
+    slot: int
+    submitted: float
+    board: Board
+    player: str
+    difficulty: str
+    clock_expires: float | None
+    done: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    lane: int | None = None
+    future: Future | None = None
+    time_scale: float = 1.0
+
+    @property
+    def priority(self) -> float:
+        # The player closest to flagging goes first; games without a clock go last.
+        return math.inf if self.clock_expires is None else self.clock_expires
+
+
+@dataclass
+class _Ponder:
+    key: int
+    lane: int
+    slot: int
+    future: Future
+
+
+class BotSearchExecutor:
+    """Schedules bot searches over a fixed set of worker lanes.
+
+    Waiting searches are ordered by the bot's remaining clock, the queue is bounded,
+    and searches started while others wait get a proportionally shorter think.
+    """
+
+    def __init__(
+        self,
+        workers: int = BOT_SEARCH_WORKERS,
+        start_method: str = BOT_SEARCH_START_METHOD,
+        queue_limit: int = BOT_QUEUE_LIMIT,
+    ) -> None:
+        self.workers = max(0, workers)
+        self.start_method = start_method
+        self.queue_limit = max(1, queue_limit)
+        self._lanes: list[Executor] = []
+        self._running: list[_Job | None] = []
+        self._cancel_flags: Any = None
+        self._slots = itertools.cycle(range(CANCEL_SLOTS))
+        self._sequence = itertools.count()
+        self._queue: list[tuple[float, int, _Job]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._jobs: dict[str, list[_Job]] = {}
+        self._game_lanes: dict[str, set[int]] = {}
+        self._timings: deque[SearchTiming] = deque(maxlen=TIMING_WINDOW)
+        self._completed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._degraded = 0
+        self._ponders: dict[str, _Ponder] = {}
+        self._predictions: dict[str, tuple[Move, ...]] = {}
+        self._ponder_hits = 0
+        self._ponder_misses = 0
+        self._ponder_reused = 0
+        self._memory_metrics: dict[str, object] = {}
+
+    def _ensure_lanes(self) -> list[Executor]:
+        # Each worker is its own lane and a game prefers its own lane,
+        # so the worker-local transposition table for that game stays warm.
+        if not self._lanes and self.workers == 0:
+            self._cancel_flags = [0] * CANCEL_SLOTS
+            self._lanes = [
+                ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="bot-search",
+                    initializer=_init_worker,
+                    initargs=(self._cancel_flags,),
+                )
+            ]
+        if not self._lanes:
+            context = multiprocessing.get_context(self.start_method)
+            self._cancel_flags = context.Array("b", CANCEL_SLOTS, lock=False)
+            self._lanes = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self._cancel_flags,),
+                )
+                for _ in range(self.workers)
+            ]
+        if len(self._running) != len(self._lanes):
+            self._running = [None] * len(self._lanes)
+        return self._lanes
+
+    def lane_for(self, game_id: str) -> int:
+        return zlib.crc32(game_id.encode("utf-8")) % max(1, self.workers)
+
+    def time_scale(self, waiting: int | None = None) -> float:
+        """Share of the normal thinking time for a search started with ``waiting`` searches queued."""
+        waiting = len(self._queue) if waiting is None else waiting
+        load = waiting / max(1, self.workers)
+        for limit, scale in LOAD_TIME_SCALES:
+            if load <= limit:
+                return scale
+        return MIN_TIME_SCALE
+
+    async def run(
+        self,
+        game_id: str,
+        board: Board,
+        player: str,
+        difficulty: str,
+        *,
+        remaining_time: float | None = None,
+    ) -> BotTurnResult:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        if len(self._queue) >= self.queue_limit:
+            self._rejected += 1
+            logger.warning("Bot search queue is full (%d waiting), rejecting game %s", len(self._queue), game_id)
+            raise BotSearchRejected(game_id)
+        self._ensure_lanes()
+        submitted = time.time()
+        job = _Job(
+            game_id=game_id,
+            slot=next(self._slots),
+            submitted=submitted,
+            board=board,
+            player=player,
+            difficulty=difficulty,
+            clock_expires=None if remaining_time is None else submitted + remaining_time,
+            done=loop.create_future(),
+            loop=loop,
+        )
+        self._cancel_flags[job.slot] = 0
+        self._jobs.setdefault(game_id, []).append(job)
+        self._yield_lane(game_id, board, player)
+        heapq.heappush(self._queue, (job.priority, next(self._sequence), job))
+        self._dispatch()
+        if job.lane is None:
+            loop.call_later(LANE_STEAL_SECONDS, self._dispatch)
+        try:
+            result, reply, reused, started, finished, memory_metrics = await job.done
+        except asyncio.CancelledError:
+            now = time.time()
+            self._record(job, now, now, cancelled=True)
+            self._unqueue(job)
+            if self._cancel_flags[job.slot]:
+                raise BotSearchCancelled(game_id)
+            self._cancel_flags[job.slot] = 1
+            if job.future is not None:
+                job.future.cancel()
+            raise
+        finally:
+            self._forget(job)
+        cancelled = bool(self._cancel_flags[job.slot])
+        self._record(job, started, finished, cancelled=cancelled)
+        self._memory_metrics = memory_metrics
+        if cancelled:
+            raise BotSearchCancelled(game_id)
+        if reused:
+            self._ponder_reused += 1
+        if reply is not None:
+            self._predictions[game_id] = reply
+        return result
+
+    def _dispatch(self) -> None:
+        if not self._queue or not self._lanes:
+            return
+        now = time.time()
+        waiting: list[tuple[float, int, _Job]] = []
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            lane = self._pick_lane(entry[2], now)
+            if lane is None:
+                waiting.append(entry)
+            else:
+                self._start(entry[2], lane, self.time_scale(len(self._queue) + len(waiting)))
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+
+    def _pick_lane(self, job: _Job, now: float) -> int | None:
+        home = self.lane_for(job.game_id) % len(self._lanes)
+        if self._lane_idle(home):
+            return home
+        ponder = self._ponders.get(job.game_id)
+        if ponder is not None and ponder.lane == home and not ponder.future.done():
+            # A matching ponder survived _yield_lane, so its result is worth waiting for.
+            return None
+        if now - job.submitted < LANE_STEAL_SECONDS:
+            return None
+        for lane in range(len(self._lanes)):
+            if self._running[lane] is None:
+                self._stop_lane_ponders(lane)
+                return lane
+        return None
+
+    def _start(self, job: _Job, lane: int, time_scale: float) -> None:
+        job.lane = lane
+        job.time_scale = time_scale
+        # A stolen lane builds its own table for the game, which release() has to free too.
+        self._game_lanes.setdefault(job.game_id, set()).add(lane)
+        if time_scale < 1.0:
+            self._degraded += 1
+        self._running[lane] = job
+        try:
+            job.future = self._lanes[lane].submit(
+                _run_search,
+                job.slot,
+                job.game_id,
+                job.board,
+                job.player,
+                job.difficulty,
+                job.clock_expires,
+                time_scale,
+            )
+        except RuntimeError as exc:
+            self._running[lane] = None
+            if not job.done.done():
+                job.done.set_exception(exc)
+            return
+        job.future.add_done_callback(lambda future: self._notify(job.loop, self._finish, job, future))
+
+    def _finish(self, job: _Job, future: Future) -> None:
+        if job.lane is not None and self._running and self._running[job.lane] is job:
+            self._running[job.lane] = None
+        if not job.done.done():
+            if future.cancelled():
+                job.done.cancel()
+            elif future.exception() is not None:
+                job.done.set_exception(future.exception())
+            else:
+                job.done.set_result(future.result())
+        self._dispatch()
+
+    @staticmethod
+    def _notify(loop: asyncio.AbstractEventLoop | None, callback: Any, *args: Any) -> None:
+        # Worker futures complete on executor threads; scheduler state is only touched on the loop.
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            logger.debug("Event loop closed before a bot search finished")
+
+    def _unqueue(self, job: _Job) -> bool:
+        for index, entry in enumerate(self._queue):
+            if entry[2] is job:
+                self._queue.pop(index)
+                heapq.heapify(self._queue)
+                return True
+        return False
+
+    def ponder(
+        self,
+        game_id: str,
+        board: Board,
+        player: str,
+        difficulty: str,
+        *,
+        remaining_time: float | None = None,
+    ) -> bool:
+        """Start searching for ``player`` on the position after the predicted human reply.
+
+        Pondering only runs on an idle lane with nothing queued and at most ``PONDER_MAX_GAMES``
+        games ponder at once; any real search that needs the lane stops it first.
+        """
+        reply = self._predictions.pop(game_id, None)
+        if not PONDER_ENABLED or self.workers == 0 or difficulty not in PONDER_DIFFICULTIES or reply is None:
+            return False
+        self._stop_ponder(game_id)
+        lanes = self._ensure_lanes()
+        lane = self.lane_for(game_id) % len(lanes)
+        if self._queue or not self._lane_idle(lane) or len(self._active_ponders()) >= PONDER_MAX_GAMES:
+            return False
+        sequence = next(
+            (seq for seq in generate_turn_sequences(board, opponent(player)) if seq.steps == reply),
+            None,
+        )
+        if sequence is None:
+            return False
+        predicted = apply_sequence(board, sequence)
+        clock_expires = None if remaining_time is None else time.time() + remaining_time
+        slot = next(self._slots)
+        self._cancel_flags[slot] = 0
+        future = lanes[lane].submit(_run_ponder, slot, game_id, predicted, player, difficulty, clock_expires)
+        future.add_done_callback(lambda _: self._notify(self._loop, self._dispatch))
+        self._ponders[game_id] = _Ponder(position_hash(predicted, player), lane, slot, future)
+        return True
+
+    def ponder_reply(self, game_id: str, board: Board, player: str) -> bool:
+        """Called once the human's turn is complete; keeps the ponder search on a hit, stops it on a miss."""
+        ponder = self._ponders.get(game_id)
+        if ponder is None:
+            return False
+        if ponder.key == position_hash(board, player):
+            self._ponder_hits += 1
+            return True
+        self._ponder_misses += 1
+        self._stop_ponder(game_id)
+        return False
+
+    def _active_ponders(self) -> dict[str, _Ponder]:
+        for game_id in [game_id for game_id, ponder in self._ponders.items() if ponder.future.done()]:
+            del self._ponders[game_id]
+        return self._ponders
+
+    def _lane_idle(self, lane: int) -> bool:
+        if lane < len(self._running) and self._running[lane] is not None:
+            return False
+        return all(ponder.lane != lane for ponder in self._active_ponders().values())
+
+    def _stop_ponder(self, game_id: str) -> None:
+        ponder = self._ponders.pop(game_id, None)
+        if ponder is not None and not ponder.future.done():
+            self._cancel_flags[ponder.slot] = 1
+            ponder.future.cancel()
+
+    def _stop_lane_ponders(self, lane: int) -> None:
+        for game_id, ponder in list(self._active_ponders().items()):
+            if ponder.lane == lane:
+                self._stop_ponder(game_id)
+
+    def _yield_lane(self, game_id: str, board: Board, player: str) -> None:
+        lane = self.lane_for(game_id)
+        key = position_hash(board, player)
+        for other_id, ponder in list(self._active_ponders().items()):
+            if ponder.lane == lane and (other_id != game_id or ponder.key != key):
+                self._stop_ponder(other_id)
+
+    def cancel(self, game_id: str) -> int:
+        self._predictions.pop(game_id, None)
+        self._stop_ponder(game_id)
+        jobs = self._jobs.get(game_id, [])
+        for job in jobs:
+            self._cancel_flags[job.slot] = 1
+            if self._unqueue(job):
+                job.done.cancel()
+            elif job.future is not None:
+                job.future.cancel()
+        if jobs:
+            logger.info("Cancelled %d bot search(es) for game %s", len(jobs), game_id)
+        return len(jobs)
+
+    def release(self, game_id: str) -> None:
+        lanes = self._game_lanes.pop(game_id, set())
+        if not self._lanes:
+            return
+        lanes.add(self.lane_for(game_id) % len(self._lanes))
+        for lane in sorted(lanes):
+            try:
+                self._lanes[lane].submit(_release_game, game_id)
+            except RuntimeError:
+                logger.debug("Search lane is shut down, nothing to release for game %s", game_id)
+
+    def _forget(self, job: _Job) -> None:
+        jobs = self._jobs.get(job.game_id)
+        if not jobs:
+            return
+        if job in jobs:
+            jobs.remove(job)
+        if not jobs:
+            del self._jobs[job.game_id]
+
+    def _record(self, job: _Job, started: float, finished: float, *, cancelled: bool) -> None:
+        timing = SearchTiming(
+            game_id=job.game_id,
+            difficulty=job.difficulty,
+            queue_ms=round(max(0.0, started - job.submitted) * 1000, 2),
+            search_ms=round(max(0.0, finished - started) * 1000, 2),
+            cancelled=cancelled,
+            time_scale=job.time_scale,
+        )
+        self._timings.append(timing)
+        if cancelled:
+            self._cancelled += 1
+        else:
+            self._completed += 1
+        if timing.queue_ms >= QUEUE_WARN_SECONDS * 1000:
+            logger.warning(
+                "Bot search for game %s (%s) waited %.0f ms in queue, searched %.0f ms at %.0f%% time",
+                job.game_id,
+                job.difficulty,
+                timing.queue_ms,
+                timing.search_ms,
+                timing.time_scale * 100,
+            )
+        elif timing.search_ms >= 1000:
+            logger.info(
+                "Bot search for game %s (%s) took %.0f ms after %.0f ms in queue",
+                job.game_id,
+                job.difficulty,
+                timing.search_ms,
+                timing.queue_ms,
+            )
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    def metrics(self) -> dict[str, object]:
+        timings = [timing for timing in self._timings if not timing.cancelled]
+        search_times = sorted(timing.search_ms for timing in timings)
+        queue_times = [timing.queue_ms for timing in timings]
+        count = len(search_times)
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "active_games": len(self._jobs),
+            "queued": len(self._queue),
+            "queue_limit": self.queue_limit,
+            "time_scale": self.time_scale(),
+            "completed": self._completed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "degraded": self._degraded,
+            "pondering": len(self._active_ponders()),
+            "ponder_hits": self._ponder_hits,
+            "ponder_misses": self._ponder_misses,
+            "ponder_reused": self._ponder_reused,
+            "avg_search_ms": round(sum(search_times) / count, 2) if count else 0.0,
+            "p95_search_ms": search_times[min(count - 1, int(count * 0.95))] if count else 0.0,
+            "max_search_ms": search_times[-1] if count else 0.0,
+            "avg_queue_ms": round(sum(queue_times) / count, 2) if count else 0.0,
+            "max_queue_ms": max(queue_times) if count else 0.0,
+            "memory": self._memory_metrics,
+            "recent": [
+                {
+                    "game_id": timing.game_id,
+                    "difficulty": timing.difficulty,
+                    "queue_ms": timing.queue_ms,
+                    "search_ms": timing.search_ms,
+                    "cancelled": timing.cancelled,
+                    "time_scale": timing.time_scale,
+                }
+                for timing in list(self._timings)[-10:]
+            ],
+        }
+
+    def shutdown(self) -> None:
+        for lane in self._lanes:
+            lane.shutdown(wait=False, cancel_futures=True)
+        self._lanes = []
+        self._running = []
+        self._game_lanes = {}
+        shutdown_helpers()
+
+
+bot_executor = BotSearchExecutor()
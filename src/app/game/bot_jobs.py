@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+BOT_JOB_TTL_SECONDS = float(os.getenv("CHECKERS_BOT_JOB_TTL", "600"))
+MAX_BOT_JOBS = 2000
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class BotJobError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class BotJob:
+    job_id: str
+    game_id: str
+    ply: int
+    created: float
+    status: str = PENDING
+    result: Any = None
+    status_code: int | None = None
+    detail: str | None = None
+    finished: float | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "game_id": self.game_id,
+            "ply": self.ply,
+            "status": self.status,
+            "result": self.result,
+            "status_code": self.status_code,
+            "detail": self.detail,
+        }
+
+
+class BotJobRegistry:
+    """Bot moves run as background jobs; submissions for the same game and history length share one job."""
+
+    def __init__(self, ttl: float = BOT_JOB_TTL_SECONDS, max_jobs: int = MAX_BOT_JOBS) -> None:
+        self.ttl = ttl
+        self.max_jobs = max(1, max_jobs)
+        self._jobs: OrderedDict[str, BotJob] = OrderedDict()
+        self._by_turn: dict[tuple[str, int], str] = {}
+
+    def get(self, job_id: str) -> BotJob | None:
+        return self._jobs.get(job_id)
+
+    def for_turn(self, game_id: str, ply: int) -> BotJob | None:
+        job_id = self._by_turn.get((game_id, ply))
+        return None if job_id is None else self._jobs.get(job_id)
+
+    def submit(
+        self,
+        game_id: str,
+        ply: int,
+        run: Callable[[], Awaitable[Any]],
+        on_failure: Callable[[BotJob], Awaitable[None]] | None = None,
+    ) -> BotJob:
+        """Start ``run`` in the background unless a live or finished job already covers this turn."""
+        self._prune()
+        existing = self.for_turn(game_id, ply)
+        if existing is not None and existing.status != FAILED:
+            return existing
+        job = BotJob(job_id=uuid.uuid4().hex, game_id=game_id, ply=ply, created=time.time())
+        self._jobs[job.job_id] = job
+        self._by_turn[(game_id, ply)] = job.job_id
+        job.task = asyncio.create_task(self._run(job, run, on_failure))
+        return job
+
+    async def _run(
+        self,
+        job: BotJob,
+        run: Callable[[], Awaitable[Any]],
+        on_failure: Callable[[BotJob], Awaitable[None]] | None,
+    ) -> None:
+        try:
+            job.result = await run()
+            job.status = DONE
+        except BotJobError as exc:
+            job.status, job.status_code, job.detail = FAILED, exc.status_code, exc.detail
+        except Exception:
+            logger.exception("Bot move job %s for game %s failed", job.job_id, job.game_id)
+            job.status, job.status_code, job.detail = FAILED, 500, "Bot move failed"
+        finally:
+            job.finished = time.time()
+            job.task = None
+        if job.status == FAILED and on_failure is not None:
+            try:
+                await on_failure(job)
+            except Exception:
+                logger.exception("Could not report failed bot move job %s", job.job_id)
+
+    def _drop(self, job_id: str) -> None:
+        job = self._jobs.pop(job_id, None)
+        if job is not None and self._by_turn.get((job.game_id, job.ply)) == job_id:
+            del self._by_turn[(job.game_id, job.ply)]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) < self.max_jobs and job.created >= cutoff:
+                break
+            if job.task is None:
+                self._drop(job_id)
+
+    def metrics(self) -> dict[str, int]:
+        pending = sum(1 for job in self._jobs.values() if job.status == PENDING)
+        return {"jobs": len(self._jobs), "pending": pending}
+
+
+bot_jobs = BotJobRegistry()
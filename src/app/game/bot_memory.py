@@ -1,14 +1,58 @@
 from __future__ import annotations
 
+import argparse
 import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left
 from copy import deepcopy
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from .game_logic import Board, Move, format_move, owner
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.app.game.game_logic import Board, Move, format_move, owner, parse_move
+    from src.app.game.zobrist import board_hash, hash_key, memory_hash
+else:
+    from .game_logic import Board, Move, format_move, owner, parse_move
+    from .zobrist import board_hash, hash_key, memory_hash
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 DEFAULT_MEMORY_PATH = REPO_ROOT / "src/logs/bot_arena/hardcore-learning.json"
+SEARCH_MEMORY_PATH = os.getenv("CHECKERS_MEMORY", str(DEFAULT_MEMORY_PATH))
+MEMORY_RELOAD_CHECK_SECONDS = float(os.getenv("CHECKERS_MEMORY_RELOAD_CHECK", "2"))
+BIAS_PRIOR = 3
+
+JOURNAL_SUFFIX = ".journal"
+
+MAGIC = b"CKMM"
+BINARY_VERSION = 4
+# magic, version, reserved, records, positions, total updates, generation, metadata bytes
+HEADER = struct.Struct("<4sHHIIQII")
+# One column per field, each 8-byte aligned; key offsets has one entry more than there are records.
+COLUMNS = (
+    ("hashes", "Q"),
+    ("score_sums", "d"),
+    ("codes", "I"),
+    ("visits", "I"),
+    ("wins", "I"),
+    ("draws", "I"),
+    ("losses", "I"),
+    ("last_scores", "f"),
+    ("generations", "I"),
+    ("plies", "H"),
+    ("key_offsets", "I"),
+)
+
+logger = logging.getLogger(__name__)
 
 
 def project_path(path: str | Path) -> Path:
@@ -30,7 +74,7 @@ def _normalize_piece(piece: str, player: str) -> str:
     return "B" if piece.isupper() else "b"
 
 
-def board_memory_key(board: Board, player: str) -> str:
+def legacy_board_memory_key(board: Board, player: str) -> str:
     normalized = [["." for _ in range(8)] for _ in range(8)]
     for row in range(8):
         for col in range(8):
@@ -43,6 +87,37 @@ def board_memory_key(board: Board, player: str) -> str:
     return "v2|" + "/".join(rows)
 
 
+def board_memory_key(board: Board, player: str) -> str:
+    return hash_key(memory_hash(board, player))
+
+
+def _migrate_legacy_key(key: str) -> str:
+    if not key.startswith("v2|"):
+        return key
+    rows = key[3:].split("/")
+    board = [[None if cell == "." else cell for cell in row] for row in rows]
+    return hash_key(board_hash(board))
+
+
+def _migrate_positions(
+    positions: dict[str, dict[str, dict[str, float | int]]],
+) -> dict[str, dict[str, dict[str, float | int]]]:
+    if not any(key.startswith("v2|") for key in positions):
+        return positions
+    migrated: dict[str, dict[str, dict[str, float | int]]] = {}
+    for key, moves in positions.items():
+        target = migrated.setdefault(_migrate_legacy_key(key), {})
+        for move_key, stats in moves.items():
+            existing = target.get(move_key)
+            if existing is None:
+                target[move_key] = stats
+                continue
+            for field_name in ("visits", "score_sum", "wins", "draws", "losses"):
+                existing[field_name] = existing.get(field_name, 0) + stats.get(field_name, 0)
+            existing["last_score"] = stats.get("last_score", existing.get("last_score", 0.0))
+    return migrated
+
+
 def move_memory_key(steps: tuple[Move, ...], player: str = "white") -> str:
     normalized_steps = []
     for start, end in steps:
@@ -53,6 +128,20 @@ def move_memory_key(steps: tuple[Move, ...], player: str = "white") -> str:
     return " ".join(normalized_steps)
 
 
+def _pack_move_code(start: tuple[int, int], end: tuple[int, int], move_key: str) -> int:
+    return (
+        ((start[0] * 8 + start[1]) << 26)
+        | ((end[0] * 8 + end[1]) << 20)
+        | (zlib.crc32(move_key.encode("ascii")) & 0xFFFFF)
+    )
+
+
+def move_code(move_key: str) -> int:
+    """32-bit code for a move key: first square, last square and a digest of the full path."""
+    steps = move_key.split()
+    return _pack_move_code(parse_move(steps[0])[0], parse_move(steps[-1])[1], move_key)
+
+
 def _empty_move_stats() -> dict[str, float | int]:
     return {
         "visits": 0,
@@ -64,35 +153,209 @@ def _empty_move_stats() -> dict[str, float | int]:
     }
 
 
+def journal_path(path: str | Path) -> Path:
+    target = project_path(path)
+    return target.with_name(target.name + JOURNAL_SUFFIX)
+
+
+class MemoryJournal:
+    """Append-only JSON-lines log of memory updates made since the snapshot it belongs to.
+
+    The first line names the snapshot's ``journal_id``; a journal left over from an older
+    snapshot (say, after a crash during compaction) is ignored on load and replaced on open.
+    """
+
+    def __init__(self, path: str | Path, journal_id: str) -> None:
+        self.path = journal_path(path)
+        self.journal_id = journal_id
+        if read_journal_id(self.path) != journal_id:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("w", encoding="utf-8") as f:
+                f.write(json.dumps({"journal": journal_id}) + "\n")
+        else:
+            _trim_torn_line(self.path)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._held: list[str] | None = None
+
+    def append(self, entry: dict[str, object]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        if self._held is not None:
+            self._held.append(line)
+        else:
+            self._file.write(line)
+
+    def hold(self) -> None:
+        """Keep further entries in memory until ``release``; truncating or closing drops them."""
+        if self._held is None:
+            self._held = []
+
+    def release(self) -> None:
+        if self._held:
+            self._file.writelines(self._held)
+        self._held = None
+
+    def flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def offset(self) -> int:
+        self._file.flush()
+        return self._file.tell()
+
+    def truncate(self, offset: int) -> None:
+        self._held = None
+        self._file.flush()
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    def close(self) -> None:
+        self._held = None
+        self._file.close()
+
+
+def _trim_torn_line(path: Path, chunk: int = 4096) -> None:
+    """Cut a half-written last line so new entries are not appended onto it."""
+    with path.open("rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        keep = end
+        while keep > 0:
+            start = max(0, keep - chunk)
+            f.seek(start)
+            newline = f.read(keep - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            keep = start
+        if keep < end:
+            logger.warning("Dropping a torn line at the end of %s", path)
+            f.truncate(keep)
+
+
+def read_journal_id(path: Path) -> str | None:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            header = f.readline()
+    except FileNotFoundError:
+        return None
+    try:
+        return str(json.loads(header).get("journal"))
+    except (ValueError, AttributeError):
+        return None
+
+
 @dataclass
 class MoveMemory:
     positions: dict[str, dict[str, dict[str, float | int]]] = field(default_factory=dict)
     total_updates: int = 0
     metadata: dict[str, object] = field(default_factory=dict)
+    generation: int = 0
+    journal_id: str = ""
+    journal: MemoryJournal | None = field(default=None, repr=False, compare=False)
 
     @classmethod
     def load(cls, path: str | Path = DEFAULT_MEMORY_PATH) -> "MoveMemory":
         target = project_path(path)
         if not target.exists():
             return cls()
+        if is_binary_memory(target):
+            mapped = MappedMoveMemory(target)
+            try:
+                return mapped.to_memory()
+            finally:
+                mapped.close()
         with target.open("r", encoding="utf-8") as f:
             raw = json.load(f)
         if int(raw.get("version", 1)) != 2:
             return cls()
-        return cls(
-            positions=raw.get("positions", {}),
+        memory = cls(
+            positions=_migrate_positions(raw.get("positions", {})),
             total_updates=int(raw.get("total_updates", 0)),
             metadata=raw.get("metadata", {}),
+            generation=int(raw.get("generation", 0)),
+            journal_id=str(raw.get("journal_id", "")),
         )
+        memory.replay_journal(target)
+        return memory
+
+    def replay_journal(self, path: str | Path) -> int:
+        """Apply the updates journaled after this snapshot was written."""
+        source = journal_path(path)
+        if not self.journal_id or read_journal_id(source) != self.journal_id:
+            return 0
+        replayed = 0
+        with source.open("r", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write.
+                    break
+                if "meta" in entry:
+                    self.metadata.update(entry["meta"])
+                elif "gen" in entry:
+                    self.generation = int(entry["gen"])
+                else:
+                    self._apply(entry["p"], entry["m"], float(entry["s"]), entry.get("ply"))
+                replayed += 1
+        return replayed
+
+    def open_journal(self, path: str | Path = DEFAULT_MEMORY_PATH) -> MemoryJournal:
+        """Log further updates next to the snapshot at ``path`` instead of rewriting it."""
+        if not self.journal_id:
+            self.compact(path)
+        elif self.journal is None:
+            self.journal = MemoryJournal(path, self.journal_id)
+        assert self.journal is not None
+        return self.journal
+
+    def compact(self, path: str | Path = DEFAULT_MEMORY_PATH) -> None:
+        """Fold the journal into a fresh snapshot and start an empty journal for it."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.journal_id = uuid.uuid4().hex
+        self.save(path)
+        self.journal = MemoryJournal(path, self.journal_id)
+
+    def rollback(self, path: str | Path, offset: int) -> "MoveMemory":
+        """Drop everything journaled after ``offset`` and return the memory as it was then."""
+        if self.journal is None:
+            raise ValueError("rollback needs an open journal")
+        self.journal.truncate(offset)
+        self.journal.close()
+        memory = MoveMemory.load(path)
+        memory.open_journal(path)
+        return memory
+
+    def new_generation(self) -> int:
+        """Start a new learning generation; entries remember the generation they were last updated in."""
+        self.generation += 1
+        if self.journal is not None:
+            self.journal.append({"gen": self.generation})
+        return self.generation
+
+    def update_metadata(self, values: dict[str, object]) -> None:
+        self.metadata.update(values)
+        if self.journal is not None:
+            self.journal.append({"meta": values})
 
     def save(self, path: str | Path = DEFAULT_MEMORY_PATH) -> None:
         target = project_path(path)
+        if self.journal is not None and self.journal.path == journal_path(target):
+            # The snapshot would already contain the journaled updates, so start a new journal.
+            self.compact(target)
+            return
         target.parent.mkdir(parents=True, exist_ok=True)
-        with target.open("w", encoding="utf-8") as f:
+        # Written aside and renamed so a server reloading the file never sees half of it.
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
             json.dump(
                 {
                     "version": 2,
                     "total_updates": self.total_updates,
+                    "generation": self.generation,
+                    "journal_id": self.journal_id,
                     "metadata": self.metadata,
                     "positions": self.positions,
                 },
@@ -101,12 +364,14 @@ class MoveMemory:
                 indent=2,
             )
             f.write("\n")
+        tmp_path.replace(target)
 
     def clone(self) -> "MoveMemory":
         return MoveMemory(
             positions=deepcopy(self.positions),
             total_updates=self.total_updates,
             metadata=deepcopy(self.metadata),
+            generation=self.generation,
         )
 
     @property
@@ -137,8 +402,16 @@ class MoveMemory:
                     changed += 1
         return changed
 
-    def stats_for(self, board: Board, player: str, steps: tuple[Move, ...]) -> dict[str, float | int] | None:
-        return self.positions.get(board_memory_key(board, player), {}).get(move_memory_key(steps, player))
+    def stats_for(
+        self,
+        board: Board,
+        player: str,
+        steps: tuple[Move, ...],
+        *,
+        position_hash: int | None = None,
+    ) -> dict[str, float | int] | None:
+        position_key = board_memory_key(board, player) if position_hash is None else hash_key(position_hash)
+        return self.positions.get(position_key, {}).get(move_memory_key(steps, player))
 
     def average_score(self, board: Board, player: str, steps: tuple[Move, ...]) -> float | None:
         stats = self.stats_for(board, player, steps)
@@ -156,9 +429,10 @@ class MoveMemory:
         steps: tuple[Move, ...],
         *,
         strength: int = 700,
-        prior: int = 3,
+        prior: int = BIAS_PRIOR,
+        position_hash: int | None = None,
     ) -> int:
-        stats = self.stats_for(board, player, steps)
+        stats = self.stats_for(board, player, steps, position_hash=position_hash)
         if not stats:
             return 0
         visits = int(stats.get("visits", 0))
@@ -174,13 +448,27 @@ class MoveMemory:
         player: str,
         steps: tuple[Move, ...],
         score: float,
+        *,
+        ply: int | None = None,
     ) -> None:
+        self.apply_delta(board_memory_key(board, player), move_memory_key(steps, player), score, ply=ply)
+
+    def apply_delta(self, position_key: str, move_key: str, score: float, *, ply: int | None = None) -> None:
         bounded_score = max(-1.0, min(1.0, score))
-        position_key = board_memory_key(board, player)
-        move_key = move_memory_key(steps, player)
+        self._apply(position_key, move_key, bounded_score, ply)
+        if self.journal is not None:
+            entry: dict[str, object] = {"p": position_key, "m": move_key, "s": bounded_score}
+            if ply is not None:
+                entry["ply"] = ply
+            self.journal.append(entry)
+
+    def _apply(self, position_key: str, move_key: str, bounded_score: float, ply: int | None = None) -> None:
         moves = self.positions.setdefault(position_key, {})
         stats = moves.setdefault(move_key, _empty_move_stats())
 
+        stats["generation"] = self.generation
+        if ply is not None:
+            stats["ply"] = min(int(stats.get("ply", ply)), ply)
         stats["visits"] = int(stats["visits"]) + 1
         stats["score_sum"] = float(stats["score_sum"]) + bounded_score
         stats["last_score"] = bounded_score
@@ -192,6 +480,436 @@ class MoveMemory:
             stats["draws"] = int(stats["draws"]) + 1
         self.total_updates += 1
 
+    def prune(
+        self,
+        *,
+        min_visits: int = 1,
+        max_age: int | None = None,
+        max_ply: int | None = None,
+        max_moves: int | None = None,
+        prior: int = BIAS_PRIOR,
+    ) -> PruneReport:
+        """Evict entries by visits, age in generations and depth, then the weakest ones down to ``max_moves``.
+
+        Bias mass is the sum of |average score * confidence| the entries contribute through ``bias``.
+        Entries written before generations were tracked count as current, so they start ageing now.
+        """
+        positions_before, moves_before = self.position_count, self.move_count
+        removed = {"low_visits": 0, "stale": 0, "deep": 0, "budget": 0}
+        mass_before = 0.0
+        mass_lost = 0.0
+        kept: list[tuple[float, str, str]] = []
+        for position_key, moves in list(self.positions.items()):
+            for move_key, stats in list(moves.items()):
+                mass = bias_mass(stats, prior)
+                mass_before += mass
+                reason = None
+                if int(stats.get("visits", 0)) < min_visits:
+                    reason = "low_visits"
+                elif max_age is not None and self.generation - int(stats.setdefault("generation", self.generation)) > max_age:
+                    reason = "stale"
+                elif max_ply is not None and int(stats.get("ply", 0)) > max_ply:
+                    reason = "deep"
+                if reason is None:
+                    kept.append((mass, position_key, move_key))
+                    continue
+                removed[reason] += 1
+                mass_lost += mass
+                del moves[move_key]
+            if not moves:
+                del self.positions[position_key]
+        if max_moves is not None and len(kept) > max_moves:
+            kept.sort()
+            for mass, position_key, move_key in kept[: len(kept) - max_moves]:
+                moves = self.positions[position_key]
+                del moves[move_key]
+                if not moves:
+                    del self.positions[position_key]
+                removed["budget"] += 1
+                mass_lost += mass
+        return PruneReport(
+            positions_before=positions_before,
+            moves_before=moves_before,
+            positions_after=self.position_count,
+            moves_after=self.move_count,
+            removed=removed,
+            bias_mass_before=mass_before,
+            bias_mass_lost=mass_lost,
+        )
+
+
+MemoryDelta = tuple[str, str, float, int | None]
+
+
+@dataclass
+class DeltaMemory(MoveMemory):
+    """Reads like the memory it was made from but keeps record() calls aside for apply_delta later."""
+
+    deltas: list[MemoryDelta] = field(default_factory=list)
+
+    @classmethod
+    def over(cls, memory: MoveMemory) -> DeltaMemory:
+        return cls(
+            positions=memory.positions,
+            total_updates=memory.total_updates,
+            metadata=memory.metadata,
+            generation=memory.generation,
+        )
+
+    def record(
+        self,
+        board: Board,
+        player: str,
+        steps: tuple[Move, ...],
+        score: float,
+        *,
+        ply: int | None = None,
+    ) -> None:
+        self.deltas.append((board_memory_key(board, player), move_memory_key(steps, player), score, ply))
+
+
+def bias_mass(stats: dict[str, float | int], prior: int = BIAS_PRIOR) -> float:
+    visits = int(stats.get("visits", 0))
+    if visits <= 0:
+        return 0.0
+    return abs(float(stats.get("score_sum", 0.0))) / (visits + prior)
+
+
+@dataclass(frozen=True)
+class PruneReport:
+    positions_before: int
+    moves_before: int
+    positions_after: int
+    moves_after: int
+    removed: dict[str, int]
+    bias_mass_before: float
+    bias_mass_lost: float
+
+    @property
+    def lost_fraction(self) -> float:
+        return self.bias_mass_lost / self.bias_mass_before if self.bias_mass_before else 0.0
+
+
+def is_binary_memory(path: str | Path) -> bool:
+    with project_path(path).open("rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_binary_memory(memory: MoveMemory, path: str | Path) -> Path:
+    """Write ``memory`` in the binary layout: records sorted by position hash and move code."""
+    records = sorted(
+        (int(position_key, 16), move_code(move_key), move_key, stats)
+        for position_key, moves in memory.positions.items()
+        for move_key, stats in moves.items()
+    )
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    blob = bytearray()
+    for key, code, move_key, stats in records:
+        columns["hashes"].append(key)
+        columns["score_sums"].append(float(stats.get("score_sum", 0.0)))
+        columns["codes"].append(code)
+        columns["visits"].append(int(stats.get("visits", 0)))
+        columns["wins"].append(int(stats.get("wins", 0)))
+        columns["draws"].append(int(stats.get("draws", 0)))
+        columns["losses"].append(int(stats.get("losses", 0)))
+        columns["last_scores"].append(float(stats.get("last_score", 0.0)))
+        columns["generations"].append(int(stats.get("generation", memory.generation)))
+        columns["plies"].append(min(0xFFFF, int(stats.get("ply", 0))))
+        columns["key_offsets"].append(len(blob))
+        blob += move_key.encode("ascii")
+    columns["key_offsets"].append(len(blob))
+    metadata = json.dumps(memory.metadata, ensure_ascii=False).encode("utf-8")
+    positions = len({record[0] for record in records})
+    data = bytearray(
+        HEADER.pack(
+            MAGIC,
+            BINARY_VERSION,
+            0,
+            len(records),
+            positions,
+            memory.total_updates,
+            memory.generation,
+            len(metadata),
+        )
+    )
+    data += metadata
+    for name, _ in COLUMNS:
+        column = columns[name]
+        if sys.byteorder != "little":
+            column.byteswap()
+        data += bytes(-len(data) % 8)
+        data += column.tobytes()
+    data += blob
+    target = project_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(target)
+    return target
+
+
+class MappedMoveMemory(MoveMemory):
+    """Read-only binary memory served straight from a memory-mapped file.
+
+    Every process mapping the same file shares its pages, so server workers hold one physical copy.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = project_path(path)
+        self._columns: dict[str, memoryview] = {}
+        self._keys: memoryview | None = None
+        self._view: memoryview | None = None
+        with self.path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            total_updates, metadata, generation = self._map_columns()
+        except ValueError:
+            self._release_views()
+            self._data.close()
+            raise
+        self._hashes = self._columns["hashes"]
+        self._codes = self._columns["codes"]
+        super().__init__(positions={}, total_updates=total_updates, metadata=metadata, generation=generation)
+
+    def _map_columns(self) -> tuple[int, dict[str, object], int]:
+        size = len(self._data)
+        if size < HEADER.size:
+            raise ValueError(f"{self.path} is too short for a move memory header")
+        header = HEADER.unpack_from(self._data, 0)
+        magic, version, _, self.count, self.positions_total, total_updates, generation, metadata_size = header
+        if magic != MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{self.path} is not a version {BINARY_VERSION} move memory")
+        offset = HEADER.size
+        metadata = json.loads(bytes(self._data[offset : offset + metadata_size]) or b"{}")
+        offset += metadata_size
+        self._view = memoryview(self._data)
+        for name, typecode in COLUMNS:
+            offset += -offset % 8
+            length = (self.count + 1 if name == "key_offsets" else self.count) * array(typecode).itemsize
+            if offset + length > size:
+                raise ValueError(f"{self.path} is truncated")
+            self._columns[name] = self._view[offset : offset + length].cast(typecode)
+            offset += length
+        if offset + self._columns["key_offsets"][self.count] > size:
+            raise ValueError(f"{self.path} is truncated")
+        self._keys = self._view[offset:]
+        return total_updates, metadata, generation
+
+    def _release_views(self) -> None:
+        for column in self._columns.values():
+            column.release()
+        self._columns = {}
+        for view in (self._keys, self._view):
+            if view is not None:
+                view.release()
+        self._keys = self._view = None
+
+    @property
+    def position_count(self) -> int:
+        return self.positions_total
+
+    @property
+    def move_count(self) -> int:
+        return self.count
+
+    def _find(self, key: int, code: int, move_key: str) -> int | None:
+        hashes = self._hashes
+        index = bisect_left(hashes, key)
+        while index < self.count and hashes[index] == key:
+            # Codes only digest the path, so two capture paths can share one.
+            if self._codes[index] == code and self._move_key(index) == move_key:
+                return index
+            index += 1
+        return None
+
+    def _stats(self, index: int) -> dict[str, float | int]:
+        columns = self._columns
+        stats: dict[str, float | int] = {
+            "visits": columns["visits"][index],
+            "score_sum": columns["score_sums"][index],
+            "wins": columns["wins"][index],
+            "draws": columns["draws"][index],
+            "losses": columns["losses"][index],
+            "last_score": columns["last_scores"][index],
+            "generation": columns["generations"][index],
+        }
+        if columns["plies"][index]:
+            stats["ply"] = columns["plies"][index]
+        return stats
+
+    def _move_key(self, index: int) -> str:
+        offsets = self._columns["key_offsets"]
+        return bytes(self._keys[offsets[index] : offsets[index + 1]]).decode("ascii")
+
+    def stats_for(
+        self,
+        board: Board,
+        player: str,
+        steps: tuple[Move, ...],
+        *,
+        position_hash: int | None = None,
+    ) -> dict[str, float | int] | None:
+        key = memory_hash(board, player) if position_hash is None else position_hash
+        start, end = steps[0][0], steps[-1][1]
+        if player == "black":
+            start, end = _mirror_point(start), _mirror_point(end)
+        move_key = move_memory_key(steps, player)
+        index = self._find(key, _pack_move_code(start, end, move_key), move_key)
+        return None if index is None else self._stats(index)
+
+    def to_memory(self) -> MoveMemory:
+        positions: dict[str, dict[str, dict[str, float | int]]] = {}
+        for index in range(self.count):
+            positions.setdefault(hash_key(self._hashes[index]), {})[self._move_key(index)] = self._stats(index)
+        return MoveMemory(
+            positions=positions,
+            total_updates=self.total_updates,
+            metadata=deepcopy(self.metadata),
+            generation=self.generation,
+        )
+
+    def clone(self) -> MoveMemory:
+        return self.to_memory()
+
+    def save(self, path: str | Path = DEFAULT_MEMORY_PATH) -> None:
+        self.to_memory().save(path)
+
+    def record(
+        self,
+        board: Board,
+        player: str,
+        steps: tuple[Move, ...],
+        score: float,
+        *,
+        ply: int | None = None,
+    ) -> None:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def apply_draw_pressure(self, draw_score: float = -0.15) -> int:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def prune(self, **limits: int | None) -> PruneReport:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def apply_delta(self, position_key: str, move_key: str, score: float, *, ply: int | None = None) -> None:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def replay_journal(self, path: str | Path) -> int:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def open_journal(self, path: str | Path = DEFAULT_MEMORY_PATH) -> MemoryJournal:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def compact(self, path: str | Path = DEFAULT_MEMORY_PATH) -> None:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def rollback(self, path: str | Path, offset: int) -> MoveMemory:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def new_generation(self) -> int:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def update_metadata(self, values: dict[str, object]) -> None:
+        raise TypeError("memory-mapped move memory is read-only")
+
+    def close(self) -> None:
+        self._release_views()
+        self._data.close()
+
+
+def open_memory(path: str | Path = DEFAULT_MEMORY_PATH) -> MoveMemory:
+    """A read-only view for search: binary files are mapped, JSON files are parsed along with their journal."""
+    target = project_path(path)
+    if target.exists() and is_binary_memory(target):
+        return MappedMoveMemory(target)
+    return MoveMemory.load(target)
+
+
+class MoveMemoryCache:
+    """One read-only copy of a memory file per process, reloaded only when the file changes on disk."""
+
+    def __init__(self, path: str | Path = DEFAULT_MEMORY_PATH, check_interval: float = MEMORY_RELOAD_CHECK_SECONDS) -> None:
+        self.path = project_path(path)
+        self.check_interval = check_interval
+        self.memory = MoveMemory()
+        self.signature: tuple[int, int, int, int] | None = None
+        self.loads = 0
+        self.failures = 0
+        self.load_ms = 0.0
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> tuple[int, int, int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        try:
+            journal = journal_path(self.path).stat()
+        except FileNotFoundError:
+            return stat.st_mtime_ns, stat.st_size, 0, 0
+        return stat.st_mtime_ns, stat.st_size, journal.st_mtime_ns, journal.st_size
+
+    def get(self) -> MoveMemory:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self.refresh(now)
+        return self.memory
+
+    def refresh(self, now: float | None = None) -> bool:
+        with self._lock:
+            self._checked = time.monotonic() if now is None else now
+            signature = self._file_signature()
+            if signature == self.signature:
+                return False
+            started = time.perf_counter()
+            try:
+                memory = open_memory(self.path) if signature is not None else MoveMemory()
+            except (OSError, ValueError):
+                self.failures += 1
+                logger.exception("Could not reload move memory %s, keeping the previous copy", self.path)
+                return False
+            self.load_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.memory = memory
+            self.signature = signature
+            self.loads += 1
+            logger.info(
+                "Loaded move memory %s: %d positions, %d moves in %.0f ms",
+                self.path,
+                memory.position_count,
+                memory.move_count,
+                self.load_ms,
+            )
+            return True
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "path": str(self.path),
+            "positions": self.memory.position_count,
+            "moves": self.memory.move_count,
+            "updates": self.memory.total_updates,
+            "size_bytes": self.signature[1] + self.signature[3] if self.signature else 0,
+            "loads": self.loads,
+            "failures": self.failures,
+            "load_ms": self.load_ms,
+        }
+
+
+_memory_caches: dict[Path, MoveMemoryCache] = {}
+
+
+def shared_move_memory(path: str | Path = DEFAULT_MEMORY_PATH) -> MoveMemory:
+    """The process-wide copy of the memory at ``path``; callers must not modify it."""
+    return memory_cache(path).get()
+
+
+def memory_cache(path: str | Path = DEFAULT_MEMORY_PATH) -> MoveMemoryCache:
+    target = project_path(path)
+    cache = _memory_caches.get(target)
+    if cache is None:
+        cache = _memory_caches.setdefault(target, MoveMemoryCache(target))
+    return cache
+
 
 def outcome_score(status: str, player: str, *, draw_score: float = -0.15) -> float:
     if status == "draw":
@@ -199,3 +917,36 @@ def outcome_score(status: str, player: str, *, draw_score: float = -0.15) -> flo
     if status == f"{player}_win":
         return 1.0
     return -1.0
+
+
+def convert_memory(source: str | Path, target: str | Path) -> Path:
+    """Convert between formats; a ``.json`` target gets v2 JSON, anything else the binary layout."""
+    memory = MoveMemory.load(source)
+    if project_path(target).suffix == ".json":
+        memory.save(target)
+        return project_path(target)
+    return write_binary_memory(memory, target)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert bot move memory between JSON and the binary format.")
+    parser.add_argument("source", nargs="?", default=str(DEFAULT_MEMORY_PATH))
+    parser.add_argument("--out", default="", help="Target path; defaults to the source with a .bin suffix.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    source = project_path(args.source)
+    started = time.perf_counter()
+    target = convert_memory(source, args.out or source.with_suffix(".bin"))
+    memory = open_memory(target)
+    print(
+        f"positions={memory.position_count} moves={memory.move_count} "
+        f"{source.stat().st_size} -> {target.stat().st_size} bytes in {time.perf_counter() - started:.1f}s -> {target}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
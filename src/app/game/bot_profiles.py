@@ -1,10 +1,21 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Mapping
 
+from .game_logic import PieceSquareTable
+
+CENTER_SQUARES = frozenset({
+    (2, 1), (2, 3), (2, 5), (2, 7),
+    (3, 0), (3, 2), (3, 4), (3, 6),
+    (4, 1), (4, 3), (4, 5), (4, 7),
+    (5, 0), (5, 2), (5, 4), (5, 6),
+})
+
 
 @dataclass(frozen=True)
 class EvaluationWeights:
@@ -28,14 +39,30 @@ class EvaluationWeights:
     trapped_piece: int = 0
 
 
+@dataclass(frozen=True)
+class SearchSettings:
+    late_move_reductions: bool = True
+    lmr_min_depth: int = 3
+    lmr_full_moves: int = 3
+    delta_pruning: bool = True
+    delta_margin: int = 120
+    parallel_workers: int = 1
+    opening_book: bool = True
+    book_randomness: float = 0.5
+
+
 @dataclass(frozen=True)
 class BotProfile:
     name: str
     weights: EvaluationWeights
     description: str = ""
+    search: SearchSettings = SearchSettings()
 
 
 HARD_WEIGHTS = EvaluationWeights()
+DEFAULT_SEARCH = SearchSettings()
+HARD_SEARCH_WORKERS = int(os.getenv("CHECKERS_HARD_SEARCH_WORKERS", "1"))
+HARDCORE_SEARCH_WORKERS = int(os.getenv("CHECKERS_HARDCORE_SEARCH_WORKERS", "1"))
 
 HARDCORE_WEIGHTS = EvaluationWeights(
     king_value=330,
@@ -58,10 +85,20 @@ HARDCORE_WEIGHTS = EvaluationWeights(
 )
 
 PROFILES: dict[str, BotProfile] = {
-    "easy": BotProfile("easy", HARD_WEIGHTS, "Random bot with forced captures."),
-    "medium": BotProfile("medium", HARD_WEIGHTS, "Short tactical search."),
-    "hard": BotProfile("hard", HARD_WEIGHTS, "Stable alpha-beta profile."),
-    "hardcore": BotProfile("hardcore", HARDCORE_WEIGHTS, "Sharper positional profile for the strongest bot."),
+    "easy": BotProfile("easy", HARD_WEIGHTS, "Random bot with forced captures.", SearchSettings(opening_book=False)),
+    "medium": BotProfile("medium", HARD_WEIGHTS, "Short tactical search.", SearchSettings(book_randomness=1.0)),
+    "hard": BotProfile(
+        "hard",
+        HARD_WEIGHTS,
+        "Stable alpha-beta profile.",
+        SearchSettings(parallel_workers=HARD_SEARCH_WORKERS, book_randomness=0.5),
+    ),
+    "hardcore": BotProfile(
+        "hardcore",
+        HARDCORE_WEIGHTS,
+        "Sharper positional profile for the strongest bot.",
+        SearchSettings(parallel_workers=HARDCORE_SEARCH_WORKERS, book_randomness=0.15),
+    ),
 }
 
 PROFILE_ALIASES: dict[str, str] = {
@@ -89,6 +126,40 @@ TUNABLE_WEIGHT_FIELDS: tuple[str, ...] = (
 )
 
 
+@lru_cache(maxsize=64)
+def square_tables(weights: EvaluationWeights) -> PieceSquareTable:
+    # Scores are from white's side: black tables hold the negated values for the mirrored square.
+    white_man, white_king, black_man, black_king = [], [], [], []
+    for row in range(8):
+        for col in range(8):
+            center = weights.center if (row, col) in CENTER_SQUARES else 0
+            edge = weights.edge_penalty if col in (0, 7) else 0
+            king = weights.king_value + weights.king_count + center - edge
+            white_man.append(
+                weights.man_value
+                + center
+                - edge
+                + (7 - row) * weights.advancement
+                + (weights.back_rank if row == 7 else 0)
+                + (weights.promotion_ready if row <= 1 else 0)
+            )
+            black_man.append(
+                -weights.man_value
+                - center
+                + edge
+                - row * weights.advancement
+                - (weights.back_rank if row == 0 else 0)
+                - (weights.promotion_ready if row >= 6 else 0)
+            )
+            white_king.append(king)
+            black_king.append(-king)
+    return {"w": tuple(white_man), "W": tuple(white_king), "b": tuple(black_man), "B": tuple(black_king)}
+
+
+for _profile in PROFILES.values():
+    square_tables(_profile.weights)
+
+
 def profile_for_difficulty(difficulty: str) -> BotProfile:
     return PROFILES.get(normalize_difficulty(difficulty), PROFILES["hard"])
 
@@ -101,11 +172,16 @@ def weights_to_dict(weights: EvaluationWeights) -> dict[str, int]:
     return asdict(weights)
 
 
+def search_to_dict(search: SearchSettings) -> dict[str, object]:
+    return asdict(search)
+
+
 def profile_to_dict(profile: BotProfile) -> dict[str, object]:
     return {
         "name": profile.name,
         "description": profile.description,
         "weights": weights_to_dict(profile.weights),
+        "search": search_to_dict(profile.search),
     }
 
 
@@ -116,6 +192,18 @@ def weights_from_mapping(data: Mapping[str, object], base: EvaluationWeights = H
         if value is None:
             continue
         updates[field] = int(value)
+    weights = replace(base, **updates)
+    square_tables(weights)
+    return weights
+
+
+def search_from_mapping(data: Mapping[str, object], base: SearchSettings = DEFAULT_SEARCH) -> SearchSettings:
+    updates: dict[str, object] = {}
+    for field, default in asdict(base).items():
+        value = data.get(field)
+        if value is None:
+            continue
+        updates[field] = bool(value) if isinstance(default, bool) else type(default)(value)
     return replace(base, **updates)
 
 
@@ -126,10 +214,12 @@ def profile_from_mapping(data: Mapping[str, object], base: BotProfile | None = N
         raw_weights if isinstance(raw_weights, Mapping) else {},
         fallback.weights,
     )
+    raw_search = data.get("search")
     return BotProfile(
         name=str(data.get("name", fallback.name)),
         description=str(data.get("description", fallback.description)),
         weights=weights,
+        search=search_from_mapping(raw_search, fallback.search) if isinstance(raw_search, Mapping) else fallback.search,
     )
 
 
@@ -12,8 +12,11 @@ from .game_logic import (
     parse_move,
     piece_capture_moves,
 )
+from .zobrist import hash_key, position_hash
 
 LONG_DIAGONAL = {(row, 7 - row) for row in range(8)}
+REPETITION_LIMIT = 3
+KING_ONLY_MOVE_LIMIT = 15
 
 
 @dataclass(frozen=True)
@@ -34,8 +37,7 @@ class RegulationPattern:
 
 
 def position_key(board: Board, turn: str) -> str:
-    cells = "".join(cell or "." for row in board for cell in row)
-    return f"{turn}:{cells}"
+    return hash_key(position_hash(board, turn))
 
 
 def initial_draw_state(board: Board | None = None, turn: str = "white") -> dict[str, Any]:
@@ -126,6 +128,21 @@ def _regulation_pattern(board: Board) -> RegulationPattern | None:
     return None
 
 
+def draw_budget(board: Board, player: str) -> int | None:
+    """Plies ``player`` to move can play before a move-count rule draws, starting from fresh counters."""
+    materials = _materials(board)
+    limits: list[int] = []
+    if materials["white"].men == 0 and materials["black"].men == 0:
+        limits.append(KING_ONLY_MOVE_LIMIT)
+    no_progress_limit = _no_progress_limit(board)
+    if no_progress_limit is not None:
+        limits.append(no_progress_limit)
+    pattern = _regulation_pattern(board)
+    if pattern is not None:
+        limits.append(pattern.limit * 2 - (1 if player == pattern.attacker else 0))
+    return min(limits, default=None)
+
+
 def update_draw_state(
     state: dict[str, Any] | None,
     previous_board: Board,
@@ -180,9 +197,9 @@ def update_draw_state(
             "attacker_moves": attacker_moves,
         }
 
-    if position_counts[current_position] >= 3:
+    if position_counts[current_position] >= REPETITION_LIMIT:
         return draw_state, "draw"
-    if draw_state["king_only_moves"] >= 15:
+    if draw_state["king_only_moves"] >= KING_ONLY_MOVE_LIMIT:
         return draw_state, "draw"
     if no_progress_limit is not None and draw_state["no_progress_moves"] >= no_progress_limit:
         return draw_state, "draw"
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from functools import lru_cache
+from itertools import combinations, product
+from math import comb, prod
+from pathlib import Path
+from typing import Callable, Iterator, NamedTuple, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.app.game.bitboard import (
+        BITS,
+        SQUARES,
+        BitPosition,
+        from_board,
+        generate_turn_sequences,
+        has_legal_move,
+        to_board,
+    )
+    from src.app.game.bot_memory import REPO_ROOT, project_path
+    from src.app.game.draw_logic import draw_budget
+    from src.app.game.game_logic import Board, TurnSequence, apply_sequence, opponent
+else:
+    from .bitboard import BITS, SQUARES, BitPosition, from_board, generate_turn_sequences, has_legal_move, to_board
+    from .bot_memory import REPO_ROOT, project_path
+    from .draw_logic import draw_budget
+    from .game_logic import Board, TurnSequence, apply_sequence, opponent
+
+TABLEBASE_PATH = os.getenv("CHECKERS_TABLEBASE", str(REPO_ROOT / "src/logs/endgame/tablebase.bin"))
+
+MAGIC = b"CKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<4BQI")
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+WIN_FLAG = 0x80
+MAX_DISTANCE = 126
+NO_BUDGET = 255
+
+# (white men, white kings, black men, black kings)
+Signature = tuple[int, int, int, int]
+PIECE_POOLS = (range(4, SQUARES), range(SQUARES), range(SQUARES - 4), range(SQUARES))
+
+logger = logging.getLogger(__name__)
+
+
+class TablebaseResult(NamedTuple):
+    outcome: int
+    distance: int
+
+
+def signature_of(position: BitPosition) -> Signature:
+    return (
+        position.white_men.bit_count(),
+        position.white_kings.bit_count(),
+        position.black_men.bit_count(),
+        position.black_kings.bit_count(),
+    )
+
+
+def signature_size(signature: Signature) -> int:
+    return prod(comb(SQUARES, count) for count in signature)
+
+
+def _squares(mask: int) -> tuple[int, ...]:
+    squares = []
+    while mask:
+        low = mask & -mask
+        squares.append(low.bit_length() - 1)
+        mask ^= low
+    return tuple(squares)
+
+
+def position_index(position: BitPosition, signature: Signature) -> int:
+    index = 0
+    for mask, count in zip(position, signature):
+        rank = sum(comb(square, offset + 1) for offset, square in enumerate(_squares(mask)))
+        index = index * comb(SQUARES, count) + rank
+    return index
+
+
+def signatures(max_pieces: int) -> list[Signature]:
+    """Every signature with both sides on the board, ordered so captures and promotions lead to earlier ones."""
+    found = []
+    for total in range(2, max_pieces + 1):
+        for white in range(1, total):
+            for white_men, black_men in product(range(white + 1), range(total - white + 1)):
+                found.append((white_men, white - white_men, black_men, total - white - black_men))
+    return sorted(found, key=lambda signature: (sum(signature), signature[0] + signature[2]))
+
+
+def _positions(signature: Signature) -> Iterator[tuple[int, BitPosition]]:
+    total = sum(signature)
+    groups = [combinations(pool, count) for pool, count in zip(PIECE_POOLS, signature)]
+    for placement in product(*groups):
+        masks = tuple(sum(BITS[square] for square in squares) for squares in placement)
+        if (masks[0] | masks[1] | masks[2] | masks[3]).bit_count() != total:
+            continue
+        position = BitPosition(*masks)
+        yield position_index(position, signature), position
+
+
+def _encode(outcome: int, distance: int) -> int:
+    if outcome == DRAW:
+        return 0
+    return (distance + 1) | (WIN_FLAG if outcome == WIN else 0)
+
+
+def _decode(value: int) -> TablebaseResult:
+    if not value:
+        return TablebaseResult(DRAW, 0)
+    return TablebaseResult(WIN if value & WIN_FLAG else LOSS, (value & ~WIN_FLAG) - 1)
+
+
+def _status(position: BitPosition, player: str, player_can_move: bool | None = None) -> int | None:
+    """Terminal result for ``player`` to move, with ``game_status``'s rule that a stuck black side loses first."""
+    if player_can_move is None:
+        player_can_move = has_legal_move(position, player)
+    enemy_can_move = has_legal_move(position, opponent(player))
+    black_can_move, white_can_move = (
+        (enemy_can_move, player_can_move) if player == "white" else (player_can_move, enemy_can_move)
+    )
+    if not black_can_move:
+        winner = "white"
+    elif not white_can_move:
+        winner = "black"
+    else:
+        return None
+    return WIN if winner == player else LOSS
+
+
+def _known_value(
+    tables: dict[Signature, bytearray],
+    position: BitPosition,
+    signature: Signature,
+    player: str,
+) -> int:
+    if not (signature[0] + signature[1]) or not (signature[2] + signature[3]):
+        return _encode(_status(position, player) or DRAW, 0)
+    side = 0 if player == "white" else signature_size(signature)
+    return tables[signature][side + position_index(position, signature)]
+
+
+def solve_signature(signature: Signature, tables: dict[Signature, bytearray]) -> bytearray:
+    """Retrograde analysis of one signature; every signature it converts into must already be in ``tables``.
+
+    Values are distance-to-end in plies for the side to move. A result longer than the
+    position's ``draw_budget`` is stored as a draw, as the move-count rules would end it first.
+    """
+    size = signature_size(signature)
+    nodes = 2 * size
+    result = bytearray(nodes)
+    resolved = bytearray(nodes)
+    winning = bytearray(nodes)
+    blocked = bytearray(nodes)
+    longest = bytearray(nodes)
+    budget = bytearray(b"\xff") * nodes
+    pending = array("H", bytes(2 * nodes))
+    edges_from = array("I")
+    edges_to = array("I")
+    buckets: list[list[tuple[int, int]]] = [[] for _ in range(MAX_DISTANCE + 2)]
+
+    for index, position in _positions(signature):
+        board = to_board(position)
+        for side, player in ((0, "white"), (size, "black")):
+            node = side + index
+            budget[node] = min(draw_budget(board, player) or NO_BUDGET, NO_BUDGET)
+            sequences = generate_turn_sequences(position, player)
+            status = _status(position, player, bool(sequences))
+            if status is not None:
+                buckets[0].append((node, status))
+                continue
+
+            enemy = opponent(player)
+            enemy_side = size - side
+            children = set()
+            shortest_loss = MAX_DISTANCE
+            for sequence in sequences:
+                child = sequence.position
+                child_signature = signature_of(child)
+                if child_signature == signature:
+                    children.add(enemy_side + position_index(child, signature))
+                    continue
+                outcome, distance = _decode(_known_value(tables, child, child_signature, enemy))
+                if outcome == LOSS:
+                    shortest_loss = min(shortest_loss, distance)
+                    winning[node] = 1
+                elif outcome == WIN:
+                    longest[node] = max(longest[node], distance)
+                else:
+                    blocked[node] = 1
+            if winning[node]:
+                buckets[shortest_loss + 1].append((node, WIN))
+            elif not children and not blocked[node]:
+                buckets[longest[node] + 1].append((node, LOSS))
+            pending[node] = len(children)
+            for child_node in children:
+                edges_from.append(child_node)
+                edges_to.append(node)
+
+    starts = array("I", bytes(4 * (nodes + 1)))
+    for child_node in edges_from:
+        starts[child_node + 1] += 1
+    for node in range(nodes):
+        starts[node + 1] += starts[node]
+    parents = array("I", bytes(4 * len(edges_from)))
+    fill = array("I", starts)
+    for child_node, parent in zip(edges_from, edges_to):
+        parents[fill[child_node]] = parent
+        fill[child_node] += 1
+
+    for distance in range(MAX_DISTANCE + 1):
+        for node, outcome in buckets[distance]:
+            if resolved[node]:
+                continue
+            resolved[node] = 1
+            if distance > budget[node]:
+                continue
+            result[node] = _encode(outcome, distance)
+            for parent in parents[starts[node] : starts[node + 1]]:
+                if resolved[parent]:
+                    continue
+                if outcome == LOSS:
+                    winning[parent] = 1
+                    buckets[distance + 1].append((parent, WIN))
+                    continue
+                longest[parent] = max(longest[parent], distance)
+                pending[parent] -= 1
+                if not pending[parent] and not winning[parent] and not blocked[parent]:
+                    buckets[min(longest[parent] + 1, MAX_DISTANCE + 1)].append((parent, LOSS))
+    return result
+
+
+def build_tablebase(
+    max_pieces: int,
+    progress: Callable[[Signature, float], None] | None = None,
+) -> dict[Signature, bytearray]:
+    tables: dict[Signature, bytearray] = {}
+    for signature in signatures(max_pieces):
+        started = time.perf_counter()
+        tables[signature] = solve_signature(signature, tables)
+        if progress is not None:
+            progress(signature, time.perf_counter() - started)
+    return tables
+
+
+def write_tablebase(path: str | Path, tables: dict[Signature, bytearray]) -> Path:
+    target = project_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    offset = HEADER.size + ENTRY.size * len(tables)
+    index = bytearray(HEADER.pack(MAGIC, VERSION, len(tables)))
+    for signature, data in tables.items():
+        index += ENTRY.pack(*signature, offset, len(data) // 2)
+        offset += len(data)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(index)
+        for data in tables.values():
+            f.write(data)
+    tmp_path.replace(target)
+    return target
+
+
+class Tablebase:
+    """Read-only, memory-mapped view of a file written by ``write_tablebase``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = project_path(path)
+        with self.path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} tablebase")
+        self.tables: dict[Signature, tuple[int, int]] = {}
+        for number in range(count):
+            *signature, offset, size = ENTRY.unpack_from(self._data, HEADER.size + number * ENTRY.size)
+            self.tables[tuple(signature)] = (offset, size)
+        self.max_pieces = max((sum(signature) for signature in self.tables), default=0)
+
+    def covers(self, signature: Signature) -> bool:
+        return signature in self.tables
+
+    def probe(self, position: BitPosition, player: str, signature: Signature | None = None) -> TablebaseResult | None:
+        signature = signature or signature_of(position)
+        if not (signature[0] + signature[1]) or not (signature[2] + signature[3]):
+            return TablebaseResult(_status(position, player) or DRAW, 0)
+        table = self.tables.get(signature)
+        if table is None:
+            return None
+        offset, size = table
+        side = 0 if player == "white" else size
+        return _decode(self._data[offset + side + position_index(position, signature)])
+
+    def probe_board(self, board: Board, player: str, signature: Signature | None = None) -> TablebaseResult | None:
+        if signature is not None and signature not in self.tables:
+            return None
+        return self.probe(from_board(board), player, signature)
+
+    def best_sequence(self, board: Board, player: str, sequences: Sequence[TurnSequence]) -> TurnSequence | None:
+        """The quickest win, else a draw, else the longest loss; ``None`` if any reply is not covered."""
+        position = from_board(board)
+        if sum(signature_of(position)) > self.max_pieces:
+            return None
+        enemy = opponent(player)
+        best: TurnSequence | None = None
+        best_key: tuple[int, int] | None = None
+        for sequence in sequences:
+            child = sequence.board if sequence.board is not None else apply_sequence(board, sequence)
+            result = self.probe_board(child, enemy)
+            if result is None:
+                return None
+            outcome = -result.outcome
+            key = (outcome, -result.distance if outcome == WIN else result.distance)
+            if best_key is None or key > best_key:
+                best, best_key = sequence, key
+        return best
+
+    def close(self) -> None:
+        self._data.close()
+
+
+@lru_cache(maxsize=1)
+def default_tablebase() -> Tablebase | None:
+    path = project_path(TABLEBASE_PATH)
+    if not path.exists():
+        return None
+    try:
+        return Tablebase(path)
+    except (OSError, ValueError):
+        logger.exception("Could not open endgame tablebase %s", path)
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the endgame tablebase by retrograde analysis.")
+    parser.add_argument("--pieces", type=int, default=3, help="Largest total piece count to solve.")
+    parser.add_argument("--out", default=TABLEBASE_PATH)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    def report(signature: Signature, seconds: float) -> None:
+        print(f"solved {signature} in {seconds:.1f}s", flush=True)
+
+    tables = build_tablebase(args.pieces, report)
+    target = write_tablebase(args.out, tables)
+    print(f"wrote {len(tables)} tables to {target}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
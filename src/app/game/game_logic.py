@@ -5,8 +5,10 @@ import functools
 import logging
 import os
 import time
-from dataclasses import dataclass
-from typing import Collection, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Any, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .zobrist import MIRROR_KEYS, PIECE_KEYS, board_hashes, side_key
 
 os.makedirs("src/logs", exist_ok=True)
 logger = logging.getLogger("game_logic")
@@ -29,8 +31,9 @@ Move = Tuple[Point, Point]
 @dataclass(frozen=True)
 class TurnSequence:
     steps: tuple[Move, ...]
-    board: Board
+    board: Board | None = None
     captured_positions: tuple[Point, ...] = ()
+    alternatives: tuple[tuple[Move, ...], ...] = ()
 
     @property
     def is_capture(self) -> bool:
@@ -45,6 +48,22 @@ class TurnSequence:
         return self.steps[-1][1]
 
 
+@dataclass
+class LegalMoveTable:
+    player: str
+    must_capture: bool = False
+    forced_piece: Point | None = None
+    pieces: int = 0
+    moves: dict[Point, list[Point]] = field(default_factory=dict)
+
+    @property
+    def has_moves(self) -> bool:
+        return bool(self.moves)
+
+    def moves_for(self, pos: Point) -> list[Point]:
+        return list(self.moves.get(tuple(pos), ()))
+
+
 def log_time(func):
     if not PROFILE_GAME_LOGIC:
         return func
@@ -162,36 +181,31 @@ def _simple_king_moves(board: Board, pos: Point, blocked_positions: Collection[P
     return moves
 
 
-@log_time
-def piece_capture_moves(
+def _capture_targets(
     board: Board,
     pos: Point,
+    piece: str,
     player: str,
-    blocked_positions: Collection[Point] | None = None,
-) -> list[Point]:
-    piece = get_piece(board, pos)
-    if not piece or owner(piece) != player:
-        return []
-
-    blocked = normalize_blocked_positions(blocked_positions)
+    blocked: Collection[Point],
+) -> list[tuple[Point, Point]]:
     r, c = pos
-    captures: list[Point] = []
+    targets: list[tuple[Point, Point]] = []
 
     if piece.islower():
         for dr, dc in DIAGONALS:
-            middle = (r + dr, c + dc)
-            landing = (r + 2 * dr, c + 2 * dc)
-            if not (within_bounds(middle) and within_bounds(landing)):
+            mr, mc = r + dr, c + dc
+            lr, lc = r + 2 * dr, c + 2 * dc
+            if not (0 <= lr < 8 and 0 <= lc < 8):
                 continue
-            if landing in blocked or not is_empty(board, landing):
+            if (lr, lc) in blocked or board[lr][lc] is not None:
                 continue
-            if is_opponent(get_piece(board, middle), player):
-                captures.append(landing)
-        return captures
+            if is_opponent(board[mr][mc], player):
+                targets.append(((lr, lc), (mr, mc)))
+        return targets
 
     for dr, dc in DIAGONALS:
         i, j = r + dr, c + dc
-        while within_bounds((i, j)):
+        while 0 <= i < 8 and 0 <= j < 8:
             current = (i, j)
             if current in blocked:
                 break
@@ -204,18 +218,32 @@ def piece_capture_moves(
                 break
             i += dr
             j += dc
-            while within_bounds((i, j)):
+            while 0 <= i < 8 and 0 <= j < 8:
                 landing = (i, j)
                 if landing in blocked:
                     break
                 if board[i][j] is not None:
                     break
-                captures.append(landing)
+                targets.append((landing, current))
                 i += dr
                 j += dc
             break
 
-    return captures
+    return targets
+
+
+@log_time
+def piece_capture_moves(
+    board: Board,
+    pos: Point,
+    player: str,
+    blocked_positions: Collection[Point] | None = None,
+) -> list[Point]:
+    piece = get_piece(board, pos)
+    if not piece or owner(piece) != player:
+        return []
+    blocked = normalize_blocked_positions(blocked_positions)
+    return [landing for landing, _ in _capture_targets(board, pos, piece, player, blocked)]
 
 
 @log_time
@@ -262,6 +290,58 @@ def any_capture(
 
 
 
+def chain_blocked_positions(chain_state: Mapping[str, Any] | None) -> tuple[Point, ...]:
+    if not chain_state:
+        return ()
+    return tuple(tuple(pos) for pos in chain_state.get("captured_positions", []))
+
+
+def chain_forced_piece(chain_state: Mapping[str, Any] | None) -> Point | None:
+    if not chain_state:
+        return None
+    piece = chain_state.get("piece")
+    return tuple(piece) if piece else None
+
+
+@log_time
+def generate_legal_moves(
+    board: Board,
+    player: str,
+    chain_state: Mapping[str, Any] | None = None,
+    *,
+    blocked_positions: Collection[Point] | None = None,
+    forced_start: Point | None = None,
+) -> LegalMoveTable:
+    if chain_state and chain_state.get("player", player) == player:
+        blocked_positions = chain_blocked_positions(chain_state)
+        forced_start = chain_forced_piece(chain_state)
+    blocked = normalize_blocked_positions(blocked_positions)
+    table = LegalMoveTable(player=player, forced_piece=forced_start)
+    quiet: dict[Point, list[Point]] = {}
+
+    for row in range(8):
+        for col in range(8):
+            piece = board[row][col]
+            if not piece or owner(piece) != player:
+                continue
+            table.pieces += 1
+            pos = (row, col)
+            if forced_start is not None and pos != forced_start:
+                continue
+            captures = piece_capture_moves(board, pos, player, blocked_positions=blocked)
+            if captures:
+                table.must_capture = True
+                table.moves[pos] = captures
+            elif not table.must_capture and forced_start is None:
+                moves = _simple_man_moves(board, pos, player) if piece.islower() else _simple_king_moves(board, pos)
+                if moves:
+                    quiet[pos] = moves
+
+    if not table.must_capture:
+        table.moves = quiet
+    return table
+
+
 def legal_piece_moves(
     board: Board,
     pos: Point,
@@ -274,13 +354,13 @@ def legal_piece_moves(
         return []
     if forced_start is not None and pos != forced_start:
         return []
-
-    captures = piece_capture_moves(board, pos, player, blocked_positions=blocked_positions)
-    if forced_start is not None:
-        return captures
-    if any_capture(board, player, blocked_positions=blocked_positions):
-        return captures
-    return _simple_man_moves(board, pos, player) if piece.islower() else _simple_king_moves(board, pos)
+    table = generate_legal_moves(
+        board,
+        player,
+        blocked_positions=blocked_positions,
+        forced_start=forced_start,
+    )
+    return table.moves_for(pos)
 
 
 
@@ -329,6 +409,123 @@ def _promote_piece(piece: str, end: Point) -> str:
     return piece
 
 
+def final_piece(piece: str, steps: Sequence[Move]) -> str:
+    for _, end in steps:
+        piece = _promote_piece(piece, end)
+    return piece
+
+
+@dataclass(frozen=True)
+class UndoRecord:
+    start: Point
+    end: Point
+    piece: str
+    captured: tuple[tuple[Point, str], ...]
+    hash: int
+    mirror_hash: int
+    square_score: int = 0
+
+
+PieceSquareTable = Dict[str, Tuple[int, ...]]
+
+
+class SearchPosition:
+    __slots__ = ("board", "player", "hash", "mirror_hash", "square_table", "square_score", "counts", "_undo")
+
+    def __init__(self, board: Board, player: str, square_table: PieceSquareTable | None = None) -> None:
+        self.board: Board = [row[:] for row in board]
+        self.player = player
+        self.hash, self.mirror_hash = board_hashes(self.board)
+        self.square_table = square_table
+        self.counts = {"w": 0, "W": 0, "b": 0, "B": 0}
+        self.square_score = 0
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece is not None:
+                    self.counts[piece] += 1
+                    if square_table is not None:
+                        self.square_score += square_table[piece][row * 8 + col]
+        self._undo: list[UndoRecord] = []
+
+    @property
+    def ply(self) -> int:
+        return len(self._undo)
+
+    @property
+    def key(self) -> int:
+        return self.hash ^ side_key(self.player)
+
+    @property
+    def last_move(self) -> tuple[Point, Point] | None:
+        if not self._undo:
+            return None
+        record = self._undo[-1]
+        return record.start, record.end
+
+    def memory_key(self, player: str) -> int:
+        return self.hash if player == "white" else self.mirror_hash
+
+    def make(self, sequence: TurnSequence) -> None:
+        board = self.board
+        sr, sc = sequence.steps[0][0]
+        er, ec = sequence.steps[-1][1]
+        piece = board[sr][sc]
+        moved = final_piece(piece, sequence.steps)
+        captured = tuple((pos, board[pos[0]][pos[1]]) for pos in sequence.captured_positions)
+        self._undo.append(
+            UndoRecord((sr, sc), (er, ec), piece, captured, self.hash, self.mirror_hash, self.square_score)
+        )
+
+        start_square = sr * 8 + sc
+        end_square = er * 8 + ec
+        counts = self.counts
+        table = self.square_table
+        value = self.hash ^ PIECE_KEYS[piece][start_square] ^ PIECE_KEYS[moved][end_square]
+        mirrored = self.mirror_hash ^ MIRROR_KEYS[piece][start_square] ^ MIRROR_KEYS[moved][end_square]
+        if table is not None:
+            self.square_score += table[moved][end_square] - table[piece][start_square]
+        counts[piece] -= 1
+        counts[moved] += 1
+        board[sr][sc] = None
+        for (r, c), captured_piece in captured:
+            board[r][c] = None
+            value ^= PIECE_KEYS[captured_piece][r * 8 + c]
+            mirrored ^= MIRROR_KEYS[captured_piece][r * 8 + c]
+            counts[captured_piece] -= 1
+            if table is not None:
+                self.square_score -= table[captured_piece][r * 8 + c]
+        board[er][ec] = moved
+        self.hash = value
+        self.mirror_hash = mirrored
+        self.player = opponent(self.player)
+
+    def unmake(self) -> None:
+        record = self._undo.pop()
+        board = self.board
+        counts = self.counts
+        end_row, end_col = record.end
+        counts[board[end_row][end_col]] -= 1
+        counts[record.piece] += 1
+        board[end_row][end_col] = None
+        board[record.start[0]][record.start[1]] = record.piece
+        for (r, c), piece in record.captured:
+            board[r][c] = piece
+            counts[piece] += 1
+        self.hash = record.hash
+        self.mirror_hash = record.mirror_hash
+        self.square_score = record.square_score
+        self.player = opponent(self.player)
+
+
+def apply_sequence(board: Board, sequence: TurnSequence) -> Board:
+    if sequence.board is not None:
+        return sequence.board
+    position = SearchPosition(board, "white")
+    position.make(sequence)
+    return position.board
+
+
 
 def apply_move(
     board: Board,
@@ -351,17 +548,17 @@ def apply_move(
     if forced_start is not None and start != forced_start:
         raise ValueError("Нужно продолжить взятие той же шашкой")
 
-    possible_moves = legal_piece_moves(
+    table = generate_legal_moves(
         board,
-        start,
         player,
         blocked_positions=blocked_positions,
         forced_start=forced_start,
     )
+    possible_moves = table.moves_for(start)
     if not possible_moves:
         if forced_start is not None:
             raise ValueError("Нужно продолжить взятие")
-        if any_capture(board, player, blocked_positions=blocked_positions):
+        if table.must_capture:
             raise ValueError("Обязательное взятие")
         raise ValueError("Неверный ход")
     if end not in possible_moves:
@@ -398,63 +595,92 @@ def validate_move(
 
 
 
-def _generate_capture_sequences(
+def _capture_chains(
     board: Board,
     pos: Point,
+    piece: str,
     player: str,
-    blocked_positions: tuple[Point, ...] = (),
-) -> list[TurnSequence]:
-    capture_moves = piece_capture_moves(board, pos, player, blocked_positions=blocked_positions)
-    if not capture_moves:
-        return []
-
-    results: list[TurnSequence] = []
-    for dest in capture_moves:
-        new_board, captured = apply_move(
-            board,
-            pos,
-            dest,
-            player,
-            blocked_positions=blocked_positions,
-            forced_start=pos,
-        )
-        if captured is None:
-            continue
-        next_blocked = blocked_positions + (captured,)
-        next_sequences = _generate_capture_sequences(new_board, dest, player, blocked_positions=next_blocked)
-        if next_sequences:
-            for seq in next_sequences:
-                results.append(
-                    TurnSequence(
-                        steps=((pos, dest),) + seq.steps,
-                        board=seq.board,
-                        captured_positions=(captured,) + seq.captured_positions,
-                    )
-                )
-        else:
+    blocked: set[Point],
+    steps: list[Move],
+    captured: list[Point],
+    results: list[TurnSequence],
+    with_boards: bool,
+) -> None:
+    targets = _capture_targets(board, pos, piece, player, blocked)
+    if not targets:
+        if steps:
             results.append(
                 TurnSequence(
-                    steps=((pos, dest),),
-                    board=new_board,
-                    captured_positions=(captured,),
+                    steps=tuple(steps),
+                    board=[row[:] for row in board] if with_boards else None,
+                    captured_positions=tuple(captured),
                 )
             )
-    return results
+        return
 
-
-
-def generate_turn_sequences(board: Board, player: str) -> list[TurnSequence]:
+    r, c = pos
+    for landing, jumped in targets:
+        lr, lc = landing
+        jr, jc = jumped
+        jumped_piece = board[jr][jc]
+        moved = _promote_piece(piece, landing)
+        board[r][c] = None
+        board[jr][jc] = None
+        board[lr][lc] = moved
+        blocked.add(jumped)
+        steps.append((pos, landing))
+        captured.append(jumped)
+
+        _capture_chains(board, landing, moved, player, blocked, steps, captured, results, with_boards)
+
+        captured.pop()
+        steps.pop()
+        blocked.discard(jumped)
+        board[lr][lc] = None
+        board[jr][jc] = jumped_piece
+        board[r][c] = piece
+
+
+
+def sequence_result_key(board: Board, sequence: TurnSequence) -> tuple:
+    start = sequence.steps[0][0]
+    piece = board[start[0]][start[1]]
+    return start, sequence.steps[-1][1], frozenset(sequence.captured_positions), final_piece(piece, sequence.steps)
+
+
+def dedupe_sequences(board: Board, sequences: list[TurnSequence]) -> list[TurnSequence]:
+    if len(sequences) < 2 or not sequences[0].is_capture:
+        return sequences
+    groups: dict[tuple, list[TurnSequence]] = {}
+    for sequence in sequences:
+        groups.setdefault(sequence_result_key(board, sequence), []).append(sequence)
+    if len(groups) == len(sequences):
+        return sequences
+    return [
+        replace(group[0], alternatives=tuple(seq.steps for seq in group[1:])) if len(group) > 1 else group[0]
+        for group in groups.values()
+    ]
+
+
+def generate_turn_sequences(
+    board: Board,
+    player: str,
+    *,
+    with_boards: bool = True,
+    dedupe: bool = False,
+) -> list[TurnSequence]:
     capture_sequences: list[TurnSequence] = []
+    work_board = [row[:] for row in board]
 
     for row in range(8):
         for col in range(8):
-            piece = board[row][col]
+            piece = work_board[row][col]
             if not piece or owner(piece) != player:
                 continue
-            capture_sequences.extend(_generate_capture_sequences(board, (row, col), player))
+            _capture_chains(work_board, (row, col), piece, player, set(), [], [], capture_sequences, with_boards)
 
     if capture_sequences:
-        return capture_sequences
+        return dedupe_sequences(board, capture_sequences) if dedupe else capture_sequences
 
     quiet_sequences: list[TurnSequence] = []
     for row in range(8):
@@ -464,41 +690,31 @@ def generate_turn_sequences(board: Board, player: str) -> list[TurnSequence]:
                 continue
             simple_moves = _simple_man_moves(board, (row, col), player) if piece.islower() else _simple_king_moves(board, (row, col))
             for dest in simple_moves:
+                if not with_boards:
+                    quiet_sequences.append(TurnSequence(steps=(((row, col), dest),)))
+                    continue
                 new_board, _ = apply_move(board, (row, col), dest, player)
                 quiet_sequences.append(TurnSequence(steps=(((row, col), dest),), board=new_board))
 
     return quiet_sequences
 
 
-@log_time
-def game_status(board: Board) -> Optional[str]:
-    white_has_piece = False
-    black_has_piece = False
-    white_can_move = False
-    black_can_move = False
-
-    for row in range(8):
-        for col in range(8):
-            piece = board[row][col]
-            if not piece:
-                continue
-            piece_owner = owner(piece)
-            if piece_owner == "white":
-                white_has_piece = True
-                if not white_can_move and legal_piece_moves(board, (row, col), "white"):
-                    white_can_move = True
-            else:
-                black_has_piece = True
-                if not black_can_move and legal_piece_moves(board, (row, col), "black"):
-                    black_can_move = True
-
-    if not black_has_piece or not black_can_move:
+def status_from_tables(white: LegalMoveTable, black: LegalMoveTable) -> Optional[str]:
+    if not black.has_moves:
         return "white_win"
-    if not white_has_piece or not white_can_move:
+    if not white.has_moves:
         return "black_win"
     return None
 
 
+@log_time
+def game_status(board: Board) -> Optional[str]:
+    return status_from_tables(
+        generate_legal_moves(board, "white"),
+        generate_legal_moves(board, "black"),
+    )
+
+
 
 def rebuild_board_from_moves(moves: Sequence[Move]) -> Board:
     board = create_initial_board()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from .game_logic import Move, Point
+
+MOVE_SLOTS = 64 * 64
+KILLER_SLOTS = 2
+MAX_PLY = 128
+
+
+def move_index(start: Point, end: Point) -> int:
+    return (start[0] * 8 + start[1]) * 64 + end[0] * 8 + end[1]
+
+
+def sequence_index(steps: tuple[Move, ...]) -> int:
+    return move_index(steps[0][0], steps[-1][1])
+
+
+def _side(player: str) -> int:
+    return 0 if player == "white" else MOVE_SLOTS
+
+
+class MoveOrdering:
+    """Killer slots per ply, counter moves and a from/to history table, all keyed by small integers."""
+
+    __slots__ = ("history", "counters", "killers")
+
+    def __init__(self) -> None:
+        self.history = [0] * (2 * MOVE_SLOTS)
+        self.counters = [0] * (2 * MOVE_SLOTS)
+        self.killers = [[0] * KILLER_SLOTS for _ in range(MAX_PLY)]
+
+    def history_score(self, player: str, index: int) -> int:
+        return self.history[_side(player) + index]
+
+    def killers_at(self, ply: int) -> list[int]:
+        if ply >= MAX_PLY:
+            return []
+        return self.killers[ply]
+
+    def counter_for(self, player: str, previous: tuple[Point, Point] | None) -> int:
+        if previous is None:
+            return 0
+        return self.counters[_side(player) + move_index(*previous)]
+
+    def record_cutoff(
+        self,
+        player: str,
+        steps: tuple[Move, ...],
+        packed: int,
+        depth: int,
+        *,
+        ply: int,
+        previous: tuple[Point, Point] | None,
+        quiet: bool,
+    ) -> None:
+        self.history[_side(player) + sequence_index(steps)] += depth * depth
+        if not quiet:
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != packed:
+                killers[1] = killers[0]
+                killers[0] = packed
+        if previous is not None:
+            self.counters[_side(player) + move_index(*previous)] = packed
+
+    def age(self) -> None:
+        self.history = [value >> 1 for value in self.history]
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.app.game.bot_memory import REPO_ROOT, project_path
+    from src.app.game.game_logic import (
+        Board,
+        Move,
+        TurnSequence,
+        apply_move,
+        create_initial_board,
+        opponent,
+        parse_move,
+        piece_capture_moves,
+    )
+    from src.app.game.move_ordering import sequence_index
+    from src.app.game.zobrist import position_hash
+else:
+    from .bot_memory import REPO_ROOT, project_path
+    from .game_logic import (
+        Board,
+        Move,
+        TurnSequence,
+        apply_move,
+        create_initial_board,
+        opponent,
+        parse_move,
+        piece_capture_moves,
+    )
+    from .move_ordering import sequence_index
+    from .zobrist import position_hash
+
+OPENING_BOOK_PATH = os.getenv("CHECKERS_OPENING_BOOK", str(REPO_ROOT / "src/logs/opening/book.bin"))
+DEFAULT_REPORTS = "src/logs/bot_arena/*.json"
+
+MAGIC = b"CKOB"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+# position hash, book move (from/to index and path digest), games, half-points for the side that played it
+RECORD = struct.Struct("<QIHH")
+COUNT_LIMIT = 0xFFFF
+RESULT_POINTS = {"win": 2, "draw": 1, "loss": 0}
+
+logger = logging.getLogger(__name__)
+
+
+class BookMove(NamedTuple):
+    move: int
+    games: int
+    points: int
+
+    @property
+    def score(self) -> float:
+        return (self.points + 1) / (2 * self.games + 2)
+
+
+def book_move(steps: tuple[Move, ...]) -> int:
+    """From/to index plus a digest of every square on the path, so capture paths with the same ends stay apart."""
+    path = bytes(coordinate for step in steps for point in step for coordinate in point)
+    return (sequence_index(steps) << 20) | (zlib.crc32(path) & 0xFFFFF)
+
+
+def game_turns(history: Sequence[str]) -> Iterator[tuple[Board, str, tuple[Move, ...]]]:
+    """Replay step notation and yield each whole turn with the position it was played from."""
+    board = create_initial_board()
+    player = "white"
+    turn_board = board
+    steps: list[Move] = []
+    blocked: tuple[tuple[int, int], ...] = ()
+    for notation in history:
+        start, end = parse_move(notation)
+        board, captured = apply_move(
+            board,
+            start,
+            end,
+            player,
+            blocked_positions=blocked,
+            forced_start=steps[-1][1] if steps else None,
+        )
+        steps.append((start, end))
+        if captured is not None:
+            blocked = blocked + (captured,)
+            if piece_capture_moves(board, end, player, blocked_positions=blocked):
+                continue
+        yield turn_board, player, tuple(steps)
+        player = opponent(player)
+        turn_board = board
+        steps = []
+        blocked = ()
+
+
+def _result_for(status: str, player: str) -> str | None:
+    if status == "draw":
+        return "draw"
+    if status in ("white_win", "black_win"):
+        return "win" if status == f"{player}_win" else "loss"
+    return None
+
+
+def collect_book(
+    games: Iterable[tuple[Sequence[str], str]],
+    *,
+    max_plies: int,
+) -> dict[tuple[int, int], list[int]]:
+    counts: dict[tuple[int, int], list[int]] = {}
+    for history, status in games:
+        if _result_for(status, "white") is None:
+            continue
+        try:
+            for ply, (board, player, steps) in enumerate(game_turns(history)):
+                if ply >= max_plies:
+                    break
+                entry = counts.setdefault((position_hash(board, player), book_move(steps)), [0, 0])
+                entry[0] += 1
+                entry[1] += RESULT_POINTS[_result_for(status, player)]
+        except (ValueError, IndexError):
+            logger.warning("Skipping unreadable game history")
+    return counts
+
+
+def arena_games(paths: Iterable[str | Path]) -> Iterator[tuple[list[str], str]]:
+    for path in paths:
+        with project_path(path).open("r", encoding="utf-8") as f:
+            report = json.load(f)
+        for game in report.get("games", []):
+            if game.get("moves"):
+                yield list(game["moves"]), str(game.get("status"))
+
+
+def recorded_games(rows: Iterable[dict[str, object]]) -> Iterator[tuple[list[str], str]]:
+    for row in rows:
+        history = row.get("history")
+        if isinstance(history, str):
+            history = json.loads(history)
+        if history:
+            yield list(history), str(row.get("result"))
+
+
+def write_book(path: str | Path, counts: dict[tuple[int, int], list[int]], *, min_games: int = 1) -> Path:
+    records = sorted(
+        (key, move, min(games, COUNT_LIMIT), min(points, COUNT_LIMIT))
+        for (key, move), (games, points) in counts.items()
+        if games >= min_games
+    )
+    target = project_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    data = bytearray(HEADER.pack(MAGIC, VERSION, len(records)))
+    for record in records:
+        data += RECORD.pack(*record)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(target)
+    return target
+
+
+class OpeningBook:
+    """Memory-mapped records sorted by position hash; lookups are a binary search over the file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = project_path(path)
+        with self.path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} opening book")
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from("<Q", self._data, HEADER.size + index * RECORD.size)[0]
+
+    def moves(self, key: int) -> list[BookMove]:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.count:
+            record_key, move, games, points = RECORD.unpack_from(self._data, HEADER.size + low * RECORD.size)
+            if record_key != key:
+                break
+            found.append(BookMove(move, games, points))
+            low += 1
+        return found
+
+    def choose(
+        self,
+        board: Board,
+        player: str,
+        sequences: Sequence[TurnSequence],
+        randomness: float,
+        rng: random.Random | None = None,
+    ) -> TurnSequence | None:
+        """Pick a book move: ``randomness`` 0 plays the best-scoring move, higher values spread over played ones."""
+        by_move = {}
+        for sequence in sequences:
+            by_move.setdefault(book_move(sequence.steps), sequence)
+        candidates = [
+            (entry, by_move[entry.move])
+            for entry in self.moves(position_hash(board, player))
+            if entry.move in by_move
+        ]
+        if not candidates:
+            return None
+        if randomness <= 0:
+            return max(candidates, key=lambda item: (item[0].score, item[0].games))[1]
+        weights = [entry.games * entry.score ** (1 / randomness) for entry, _ in candidates]
+        return (rng or random).choices([sequence for _, sequence in candidates], weights=weights)[0]
+
+    def close(self) -> None:
+        self._data.close()
+
+
+@lru_cache(maxsize=1)
+def default_opening_book() -> OpeningBook | None:
+    path = project_path(OPENING_BOOK_PATH)
+    if not path.exists():
+        return None
+    try:
+        return OpeningBook(path)
+    except (OSError, ValueError):
+        logger.exception("Could not open opening book %s", path)
+        return None
+
+
+def _database_games(limit: int) -> list[dict[str, object]]:
+    from src.base import postgres
+
+    async def load() -> list[dict[str, object]]:
+        await postgres.init_db()
+        return await postgres.get_recorded_histories(limit=limit)
+
+    return asyncio.run(load())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the opening book from recorded games and arena reports.")
+    parser.add_argument("--reports", nargs="*", default=[DEFAULT_REPORTS], help="Arena report JSON paths or globs.")
+    parser.add_argument("--recorded", nargs="*", default=[], help="JSON exports of recorded_games rows.")
+    parser.add_argument("--database", action="store_true", help="Also read recorded_games from Postgres.")
+    parser.add_argument("--database-limit", type=int, default=50_000)
+    parser.add_argument("--plies", type=int, default=16, help="How many opening turns of each game to keep.")
+    parser.add_argument("--min-games", type=int, default=2)
+    parser.add_argument("--out", default=OPENING_BOOK_PATH)
+    return parser.parse_args()
+
+
+def _expand(patterns: Iterable[str]) -> list[Path]:
+    paths: list[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_absolute():
+            paths.extend(sorted(path.parent.glob(path.name)))
+        else:
+            paths.extend(sorted(REPO_ROOT.glob(pattern)))
+    return paths
+
+
+def main() -> None:
+    args = parse_args()
+    games: list[tuple[list[str], str]] = list(arena_games(_expand(args.reports)))
+    for path in _expand(args.recorded):
+        with path.open("r", encoding="utf-8") as f:
+            games.extend(recorded_games(json.load(f)))
+    if args.database:
+        games.extend(recorded_games(_database_games(args.database_limit)))
+    counts = collect_book(games, max_plies=args.plies)
+    target = write_book(args.out, counts, min_games=args.min_games)
+    kept = sum(1 for games_played, _ in counts.values() if games_played >= args.min_games)
+    print(f"games={len(games)} moves={len(counts)} kept={kept} -> {target}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing.util import Finalize
+from typing import Callable
+
+from .bot_memory import MoveMemory
+from .bot_profiles import DEFAULT_SEARCH, EvaluationWeights, HARD_WEIGHTS, SearchSettings, square_tables
+from .endgame import Tablebase, default_tablebase
+from .game_logic import Board, Move, TurnSequence, dedupe_sequences
+from .single_logic import (
+    DEFAULT_MEMORY_STRENGTH,
+    SearchContext,
+    iterative_search,
+    ordered_turn_sequences,
+    root_memory_bonuses,
+)
+from .time_manager import TimeManager
+from .transposition import TT_MAX_GAMES, TT_MEGABYTES, SharedTranspositionTable
+
+SMP_START_METHOD = os.getenv("CHECKERS_SMP_START_METHOD", "spawn")
+HELPER_GRACE_SECONDS = 0.5
+
+logger = logging.getLogger(__name__)
+
+_helper_pool: ProcessPoolExecutor | None = None
+_helper_pool_size = 0
+_attached_tables: OrderedDict[str, SharedTranspositionTable] = OrderedDict()
+
+
+def _close_attached_tables() -> None:
+    while _attached_tables:
+        _, table = _attached_tables.popitem()
+        table.close()
+
+
+def _attached_table(name: str, megabytes: float) -> SharedTranspositionTable:
+    table = _attached_tables.get(name)
+    if table is not None:
+        _attached_tables.move_to_end(name)
+        return table
+    if not _attached_tables:
+        Finalize(None, _close_attached_tables, exitpriority=10)
+    while len(_attached_tables) >= max(1, TT_MAX_GAMES):
+        _, stale = _attached_tables.popitem(last=False)
+        stale.close()
+    table = SharedTranspositionTable.attach(name, megabytes)
+    _attached_tables[name] = table
+    return table
+
+
+def _helper_search(
+    table_name: str,
+    megabytes: float,
+    board: Board,
+    player: str,
+    weights: EvaluationWeights,
+    search: SearchSettings,
+    root_bonuses: dict[tuple[Move, ...], int],
+    max_depth: int,
+    deadline: float,
+    start_depth: int,
+) -> tuple[int, tuple[Move, ...] | None]:
+    table = _attached_table(table_name, megabytes)
+    table.new_search()
+    sequences = dedupe_sequences(board, ordered_turn_sequences(board, player))
+    if not sequences:
+        return 0, None
+    ctx = SearchContext(
+        deadline=time.perf_counter() + max(0.0, deadline - time.time()),
+        weights=weights,
+        search=search,
+        root_bonuses=root_bonuses,
+        tt=table,
+        square_table=square_tables(weights),
+        tablebase=default_tablebase(),
+        should_stop=lambda: table.stop_requested,
+    )
+    sequence, depth = iterative_search(board, player, sequences, ctx, max_depth=max_depth, start_depth=start_depth)
+    return depth, sequence.steps
+
+
+def _helpers(count: int) -> ProcessPoolExecutor:
+    global _helper_pool, _helper_pool_size
+    if _helper_pool is not None and _helper_pool_size < count:
+        _helper_pool.shutdown(wait=False, cancel_futures=True)
+        _helper_pool = None
+    if _helper_pool is None:
+        _helper_pool = ProcessPoolExecutor(
+            max_workers=count,
+            mp_context=multiprocessing.get_context(SMP_START_METHOD),
+        )
+        _helper_pool_size = count
+    return _helper_pool
+
+
+def shutdown_helpers() -> None:
+    global _helper_pool, _helper_pool_size
+    if _helper_pool is not None:
+        _helper_pool.shutdown(wait=False, cancel_futures=True)
+        _helper_pool = None
+        _helper_pool_size = 0
+
+
+def parallel_search_best_turn(
+    board: Board,
+    player: str,
+    sequences: list[TurnSequence],
+    *,
+    workers: int,
+    max_depth: int,
+    time_limit: float,
+    weights: EvaluationWeights = HARD_WEIGHTS,
+    search: SearchSettings = DEFAULT_SEARCH,
+    memory: MoveMemory | None = None,
+    memory_strength: int = DEFAULT_MEMORY_STRENGTH,
+    should_stop: Callable[[], bool] | None = None,
+    tt: SharedTranspositionTable | None = None,
+    tablebase: Tablebase | None = None,
+    time_manager: TimeManager | None = None,
+) -> TurnSequence:
+    """Lazy SMP: helpers search the same root at staggered depths into one shared table.
+
+    The calling process searches too, and the deepest completed iteration wins.
+    """
+    sequences = dedupe_sequences(board, sequences)
+    if len(sequences) == 1:
+        return sequences[0]
+
+    table = tt if tt is not None else SharedTranspositionTable.create(TT_MEGABYTES)
+    table.reset_stop()
+    table.new_search()
+    root_bonuses = root_memory_bonuses(board, player, sequences, memory, memory_strength)
+    deadline = time.time() + time_limit
+    futures: list[Future] = []
+    try:
+        pool = _helpers(workers - 1)
+        for helper in range(workers - 1):
+            futures.append(
+                pool.submit(
+                    _helper_search,
+                    table.name,
+                    table.megabytes,
+                    board,
+                    player,
+                    weights,
+                    search,
+                    root_bonuses,
+                    max_depth,
+                    deadline,
+                    2 + helper % 2,
+                )
+            )
+
+        def stop() -> bool:
+            return table.stop_requested or (should_stop is not None and should_stop())
+
+        ctx = SearchContext(
+            deadline=time.perf_counter() + time_limit,
+            weights=weights,
+            search=search,
+            root_bonuses=root_bonuses,
+            tt=table,
+            square_table=square_tables(weights),
+            tablebase=tablebase,
+            time_manager=time_manager,
+            should_stop=stop,
+        )
+        best_sequence, best_depth = iterative_search(board, player, sequences, ctx, max_depth=max_depth)
+        table.request_stop()
+
+        by_steps = {sequence.steps: sequence for sequence in sequences}
+        for future in futures:
+            try:
+                depth, steps = future.result(timeout=HELPER_GRACE_SECONDS)
+            except FutureTimeout:
+                logger.warning("Search helper did not stop in time for %s", player)
+                continue
+            except Exception:
+                logger.exception("Search helper failed for %s", player)
+                continue
+            if depth > best_depth and steps in by_steps:
+                best_sequence, best_depth = by_steps[steps], depth
+        return best_sequence
+    finally:
+        table.request_stop()
+        for future in futures:
+            future.cancel()
+        if tt is None:
+            table.close()
@@ -1,81 +1,86 @@
 from __future__ import annotations
 
+import asyncio
 import math
 import random
 import time
 import logging
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Tuple
+from dataclasses import dataclass, field, replace
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
 
 from .game_logic import (
     Board,
     Move,
+    PieceSquareTable,
+    Point,
+    SearchPosition,
     TurnSequence,
     DIAGONALS,
+    apply_sequence,
+    dedupe_sequences,
+    final_piece,
     generate_turn_sequences,
     game_status,
     legal_piece_moves,
     opponent,
     owner,
 )
-from .bot_memory import DEFAULT_MEMORY_PATH, MoveMemory
-from .bot_profiles import EvaluationWeights, HARD_WEIGHTS, normalize_difficulty, profile_for_difficulty
+from .bot_memory import SEARCH_MEMORY_PATH, MoveMemory, shared_move_memory
+from .endgame import DRAW, WIN, Tablebase, default_tablebase
+from .move_ordering import MoveOrdering, sequence_index
+from .opening_book import default_opening_book
+from .time_manager import EASY_MOVE_DEPTH, EASY_MOVE_MARGIN, TimeManager, budget_for_move
+from .transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    SharedTranspositionTable,
+    TranspositionTable,
+    pack_move,
+    table_for_game,
+)
+from .zobrist import memory_hash, position_hash
+from .bot_profiles import (
+    CENTER_SQUARES,
+    DEFAULT_SEARCH,
+    EvaluationWeights,
+    HARD_WEIGHTS,
+    SearchSettings,
+    normalize_difficulty,
+    profile_for_difficulty,
+    square_tables,
+)
 
 WIN_SCORE = 1_000_000
 MAN_VALUE = 100
 KING_VALUE = 320
 DEFAULT_MEMORY_STRENGTH = 240
 MAX_ROOT_MEMORY_BONUS = 220
+LAZY_EVAL_MARGIN = 450
+ASPIRATION_WINDOW = 60
 logger = logging.getLogger(__name__)
-CENTER_SQUARES = {
-    (2, 1), (2, 3), (2, 5), (2, 7),
-    (3, 0), (3, 2), (3, 4), (3, 6),
-    (4, 1), (4, 3), (4, 5), (4, 7),
-    (5, 0), (5, 2), (5, 4), (5, 6),
-}
 
 
 class SearchTimeout(Exception):
     pass
 
 
-@dataclass
-class TTEntry:
-    depth: int
-    score: int
-    flag: str
-    best_steps: tuple[Move, ...] | None = None
-
-
 @dataclass
 class SearchContext:
     deadline: float
     weights: EvaluationWeights = HARD_WEIGHTS
+    search: SearchSettings = DEFAULT_SEARCH
     memory: MoveMemory | None = None
     memory_strength: int = DEFAULT_MEMORY_STRENGTH
-    cache: dict[tuple, TTEntry] = field(default_factory=dict)
-    history: dict[tuple[str, tuple[Move, ...]], int] = field(default_factory=dict)
+    root_bonuses: dict[tuple[Move, ...], int] | None = None
+    tt: TranspositionTable = field(default_factory=TranspositionTable)
+    square_table: PieceSquareTable | None = None
+    ordering: MoveOrdering = field(default_factory=MoveOrdering)
+    tablebase: Tablebase | None = None
+    time_manager: TimeManager | None = None
     nodes: int = 0
-
-
-@dataclass(frozen=True)
-class PieceStats:
-    men: int
-    kings: int
-    center: int
-    advancement: int
-    back_rank: int
-    edge: int
-    connected: int
-    promotion_ready: int
-    activity: int
-    king_mobility: int
-    trapped: int
-
-    @property
-    def total(self) -> int:
-        return self.men + self.kings
-
+    should_stop: Callable[[], bool] | None = None
 
 
 def legal_moves(
@@ -96,15 +101,13 @@ def legal_moves(
 
 
 
-def board_signature(board: Board, current: str) -> tuple:
-    return tuple(tuple(cell or "." for cell in row) for row in board), current
-
-
-
 def _check_timeout(ctx: SearchContext) -> None:
     ctx.nodes += 1
-    if ctx.nodes & 511 == 0 and time.perf_counter() >= ctx.deadline:
-        raise SearchTimeout
+    if ctx.nodes & 511 == 0:
+        if time.perf_counter() >= ctx.deadline:
+            raise SearchTimeout
+        if ctx.should_stop is not None and ctx.should_stop():
+            raise SearchTimeout
 
 
 
@@ -127,55 +130,6 @@ def _piece_activity(board: Board, row: int, col: int, piece: str, player: str) -
     return activity
 
 
-def piece_stats(board: Board, player: str) -> PieceStats:
-    men = kings = center = advancement = back_rank = edge = connected = promotion_ready = 0
-    activity = king_mobility = trapped = 0
-    for row in range(8):
-        for col in range(8):
-            piece = board[row][col]
-            if not piece or owner(piece) != player:
-                continue
-            piece_activity = _piece_activity(board, row, col, piece, player)
-            activity += piece_activity
-            if piece_activity == 0:
-                trapped += 1
-            if piece.isupper():
-                kings += 1
-                king_mobility += piece_activity
-            else:
-                men += 1
-                advancement += (7 - row) if player == "white" else row
-                if (player == "white" and row == 7) or (player == "black" and row == 0):
-                    back_rank += 1
-                if (player == "white" and row <= 1) or (player == "black" and row >= 6):
-                    promotion_ready += 1
-            if (row, col) in CENTER_SQUARES:
-                center += 1
-            if col in (0, 7):
-                edge += 1
-            for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < 8 and 0 <= nc < 8:
-                    neighbor = board[nr][nc]
-                    if neighbor and owner(neighbor) == player:
-                        connected += 1
-                        break
-    return PieceStats(
-        men=men,
-        kings=kings,
-        center=center,
-        advancement=advancement,
-        back_rank=back_rank,
-        edge=edge,
-        connected=connected,
-        promotion_ready=promotion_ready,
-        activity=activity,
-        king_mobility=king_mobility,
-        trapped=trapped,
-    )
-
-
-
 def threatened_positions(sequences: Iterable[TurnSequence]) -> set[tuple[int, int]]:
     threatened: set[tuple[int, int]] = set()
     for sequence in sequences:
@@ -219,11 +173,56 @@ def best_capture_length(sequences: Iterable[TurnSequence]) -> int:
 
 
 
-def evaluate_board(
+def _piece_terms(board: Board, pieces: list[tuple[int, int, str]], player: str) -> tuple[int, int, int, int]:
+    connected = activity = king_mobility = trapped = 0
+    for row, col, piece in pieces:
+        if owner(piece) != player:
+            continue
+        piece_activity = _piece_activity(board, row, col, piece, player)
+        activity += piece_activity
+        if piece_activity == 0:
+            trapped += 1
+        if piece.isupper():
+            king_mobility += piece_activity
+        for dr, dc in DIAGONALS:
+            nr, nc = row + dr, col + dc
+            if 0 <= nr < 8 and 0 <= nc < 8:
+                neighbor = board[nr][nc]
+                if neighbor and owner(neighbor) == player:
+                    connected += 1
+                    break
+    return connected, activity, king_mobility, trapped
+
+
+
+def _score_position(
     board: Board,
     player: str,
-    weights: EvaluationWeights = HARD_WEIGHTS,
+    weights: EvaluationWeights,
+    square_score: int,
+    counts: dict[str, int],
+    alpha: float,
+    beta: float,
 ) -> int:
+    white_kings = counts["W"]
+    black_kings = counts["B"]
+    white_total = counts["w"] + white_kings
+    black_total = counts["b"] + black_kings
+    if not white_total or not black_total:
+        won = bool(white_total) == (player == "white")
+        return WIN_SCORE if won else -WIN_SCORE
+
+    score = square_score
+    total_pieces = white_total + black_total
+    if total_pieces <= 10:
+        score += (white_kings - black_kings) * weights.endgame_king_bonus
+    if total_pieces <= 8:
+        score += (white_kings - black_kings) * weights.endgame_king_count
+    if player == "black":
+        score = -score
+    if score + LAZY_EVAL_MARGIN <= alpha or score - LAZY_EVAL_MARGIN >= beta:
+        return score
+
     status = game_status(board)
     if status == f"{player}_win":
         return WIN_SCORE
@@ -231,57 +230,76 @@ def evaluate_board(
         return -WIN_SCORE
 
     enemy = opponent(player)
-    my_sequences = generate_turn_sequences(board, player)
-    opp_sequences = generate_turn_sequences(board, enemy)
-
-    my_stats = piece_stats(board, player)
-    opp_stats = piece_stats(board, enemy)
-    total_pieces = my_stats.total + opp_stats.total
-    endgame_king_bonus = weights.endgame_king_bonus if total_pieces <= 10 else 0
-    king_value = weights.king_value + endgame_king_bonus
-
-    my_material = my_stats.men * weights.man_value + my_stats.kings * king_value
-    opp_material = opp_stats.men * weights.man_value + opp_stats.kings * king_value
-
+    my_sequences = generate_turn_sequences(board, player, with_boards=False)
+    opp_sequences = generate_turn_sequences(board, enemy, with_boards=False)
+    pieces = [(row, col, piece) for row in range(8) for col, piece in enumerate(board[row]) if piece]
+    my_connected, my_activity, my_king_mobility, my_trapped = _piece_terms(board, pieces, player)
+    opp_connected, opp_activity, opp_king_mobility, opp_trapped = _piece_terms(board, pieces, enemy)
     my_threatened = threatened_positions(seq for seq in opp_sequences if seq.is_capture)
     opp_threatened = threatened_positions(seq for seq in my_sequences if seq.is_capture)
+    mobility = len(my_sequences) - len(opp_sequences)
+
+    score += (my_connected - opp_connected) * weights.connected
+    score += mobility * weights.mobility
+    score += (best_capture_length(my_sequences) - best_capture_length(opp_sequences)) * weights.capture_pressure
+    score += (
+        threatened_material(board, opp_threatened, enemy, weights)
+        - threatened_material(board, my_threatened, player, weights)
+    ) * weights.threatened_material
+    score += (my_activity - opp_activity) * weights.piece_activity
+    score += (my_king_mobility - opp_king_mobility) * weights.king_mobility
+    score += (opp_trapped - my_trapped) * weights.trapped_piece
+    if total_pieces <= 8:
+        score += mobility * weights.endgame_mobility
+    return score
 
-    my_threatened_material = threatened_material(board, my_threatened, player, weights)
-    opp_threatened_material = threatened_material(board, opp_threatened, enemy, weights)
 
-    my_capture_pressure = best_capture_length(my_sequences)
-    opp_capture_pressure = best_capture_length(opp_sequences)
 
-    score = 0
-    score += my_material - opp_material
-    score += (my_stats.center - opp_stats.center) * weights.center
-    score += (my_stats.advancement - opp_stats.advancement) * weights.advancement
-    score += (my_stats.back_rank - opp_stats.back_rank) * weights.back_rank
-    score += (my_stats.connected - opp_stats.connected) * weights.connected
-    score += (my_stats.promotion_ready - opp_stats.promotion_ready) * weights.promotion_ready
-    score += (len(my_sequences) - len(opp_sequences)) * weights.mobility
-    score += (my_capture_pressure - opp_capture_pressure) * weights.capture_pressure
-    score += (opp_threatened_material - my_threatened_material) * weights.threatened_material
-    score += (my_stats.kings - opp_stats.kings) * weights.king_count
-    score += (opp_stats.edge - my_stats.edge) * weights.edge_penalty
-    score += (my_stats.activity - opp_stats.activity) * weights.piece_activity
-    score += (my_stats.king_mobility - opp_stats.king_mobility) * weights.king_mobility
-    score += (opp_stats.trapped - my_stats.trapped) * weights.trapped_piece
+def evaluate_board(
+    board: Board,
+    player: str,
+    weights: EvaluationWeights = HARD_WEIGHTS,
+) -> int:
+    table = square_tables(weights)
+    counts = {"w": 0, "W": 0, "b": 0, "B": 0}
+    square_score = 0
+    for row in range(8):
+        cells = board[row]
+        base = row * 8
+        for col in range(8):
+            piece = cells[col]
+            if piece is not None:
+                counts[piece] += 1
+                square_score += table[piece][base + col]
+    return _score_position(board, player, weights, square_score, counts, -math.inf, math.inf)
 
-    if total_pieces <= 8:
-        score += (my_stats.kings - opp_stats.kings) * weights.endgame_king_count
-        score += (len(my_sequences) - len(opp_sequences)) * weights.endgame_mobility
 
-    return score
+
+def evaluate_position(
+    position: SearchPosition,
+    player: str,
+    weights: EvaluationWeights = HARD_WEIGHTS,
+    alpha: float = -math.inf,
+    beta: float = math.inf,
+) -> int:
+    if position.square_table is None:
+        return evaluate_board(position.board, player, weights)
+    return _score_position(
+        position.board,
+        player,
+        weights,
+        position.square_score,
+        position.counts,
+        alpha,
+        beta,
+    )
 
 
 
 def sequence_promotes(board: Board, sequence: TurnSequence) -> bool:
     start = sequence.steps[0][0]
-    end = sequence.steps[-1][1]
     start_piece = board[start[0]][start[1]]
-    final_piece = sequence.board[end[0]][end[1]]
-    return bool(start_piece and final_piece and start_piece.islower() and final_piece.isupper())
+    return bool(start_piece and start_piece.islower() and final_piece(start_piece, sequence.steps).isupper())
 
 
 
@@ -289,26 +307,40 @@ def move_priority(
     board: Board,
     sequence: TurnSequence,
     player: str,
-    history: dict[tuple[str, tuple[Move, ...]], int] | None = None,
-    tt_steps: tuple[Move, ...] | None = None,
+    ordering: MoveOrdering | None = None,
+    tt_move: int = 0,
+    *,
+    killers: Sequence[int] = (),
+    counter: int = 0,
 ) -> int:
-    start = sequence.steps[0][0]
-    end = sequence.steps[-1][1]
-    moved_piece = sequence.board[end[0]][end[1]]
+    steps = sequence.steps
+    start = steps[0][0]
+    end = steps[-1][1]
+    start_piece = board[start[0]][start[1]]
+    moved_piece = final_piece(start_piece, steps) if start_piece else None
     advancement = (start[0] - end[0]) if player == "white" else (end[0] - start[0])
     score = 0
-    if tt_steps is not None and sequence.steps == tt_steps:
-        score += 1_000_000
+    if tt_move or counter or any(killers):
+        packed = pack_move(steps)
+        if packed == tt_move:
+            score += 1_000_000
+        elif not sequence.is_capture:
+            if killers and packed == killers[0]:
+                score += 5_000
+            elif packed in killers:
+                score += 4_000
+            if packed == counter:
+                score += 3_000
     score += len(sequence.captured_positions) * 10_000
     if moved_piece and moved_piece.isupper():
         score += 750
-    if sequence_promotes(board, sequence):
-        score += 1_200
+        if start_piece.islower():
+            score += 1_200
     score += advancement * 45
     if end in CENTER_SQUARES:
         score += 120
-    if history is not None:
-        score += history.get((player, sequence.steps), 0)
+    if ordering is not None:
+        score += ordering.history_score(player, sequence_index(steps))
     return score
 
 
@@ -325,16 +357,32 @@ def root_memory_bonus(
     sequence: TurnSequence,
     memory: MoveMemory | None,
     strength: int,
+    *,
+    position_hash: int | None = None,
 ) -> int:
     if memory is None or strength <= 0:
         return 0
-    raw_bonus = memory.bias(board, player, sequence.steps, strength=strength)
+    raw_bonus = memory.bias(board, player, sequence.steps, strength=strength, position_hash=position_hash)
     if raw_bonus == 0:
         return 0
     limit = max(60, min(MAX_ROOT_MEMORY_BONUS, strength // 3))
     return max(-limit, min(limit, raw_bonus))
 
 
+def root_memory_bonuses(
+    board: Board,
+    player: str,
+    sequences: Iterable[TurnSequence],
+    memory: MoveMemory | None,
+    strength: int,
+) -> dict[tuple[Move, ...], int]:
+    memory_key = memory_hash(board, player) if memory is not None else None
+    return {
+        seq.steps: root_memory_bonus(board, player, seq, memory, strength, position_hash=memory_key)
+        for seq in sequences
+    }
+
+
 def root_safety_penalty(
     board_after: Board,
     player: str,
@@ -344,7 +392,7 @@ def root_safety_penalty(
     own_capture_count: int = 0,
 ) -> int:
     enemy = opponent(player)
-    enemy_sequences = generate_turn_sequences(board_after, enemy)
+    enemy_sequences = generate_turn_sequences(board_after, enemy, with_boards=False)
     if not enemy_sequences:
         return 0
 
@@ -371,64 +419,71 @@ def root_safety_penalty(
 def ordered_turn_sequences(
     board: Board,
     player: str,
-    history: dict[tuple[str, tuple[Move, ...]], int] | None = None,
-    tt_steps: tuple[Move, ...] | None = None,
+    ordering: MoveOrdering | None = None,
+    tt_move: int = 0,
+    *,
+    ply: int = 0,
+    previous: tuple[Point, Point] | None = None,
+    with_boards: bool = True,
+    dedupe: bool = False,
 ) -> list[TurnSequence]:
-    sequences = generate_turn_sequences(board, player)
-    sequences.sort(
-        key=lambda seq: move_priority(board, seq, player, history=history, tt_steps=tt_steps),
-        reverse=True,
-    )
-    return sequences
+    sequences = generate_turn_sequences(board, player, with_boards=with_boards, dedupe=dedupe)
+    killers: Sequence[int] = ()
+    counter = 0
+    if ordering is not None:
+        killers = ordering.killers_at(ply)
+        counter = ordering.counter_for(player, previous)
+    scored = [
+        (move_priority(board, seq, player, ordering, tt_move, killers=killers, counter=counter), seq)
+        for seq in sequences
+    ]
+    scored.sort(key=itemgetter(0), reverse=True)
+    return [seq for _, seq in scored]
 
 
 
 def quiescence(
-    board: Board,
-    current: str,
-    root_player: str,
+    position: SearchPosition,
     alpha: int,
     beta: int,
     ctx: SearchContext,
     depth: int = 0,
 ) -> int:
     _check_timeout(ctx)
-    stand_pat = evaluate_board(board, root_player, ctx.weights)
-    if depth >= 8:
-        return stand_pat
-
-    maximizing = current == root_player
-    if maximizing:
-        if stand_pat >= beta:
-            return stand_pat
-        alpha = max(alpha, stand_pat)
-    else:
-        if stand_pat <= alpha:
-            return stand_pat
-        beta = min(beta, stand_pat)
-
-    capture_sequences = [seq for seq in ordered_turn_sequences(board, current, ctx.history) if seq.is_capture]
-    if not capture_sequences:
+    board = position.board
+    current = position.player
+    stand_pat = evaluate_position(position, current, ctx.weights, alpha, beta)
+    if depth >= 8 or stand_pat >= beta:
         return stand_pat
+    alpha = max(alpha, stand_pat)
 
-    next_player = opponent(current)
-    if maximizing:
-        best_score = stand_pat
-        for sequence in capture_sequences:
-            score = quiescence(sequence.board, next_player, root_player, alpha, beta, ctx, depth + 1)
-            if score > best_score:
-                best_score = score
-            alpha = max(alpha, best_score)
-            if alpha >= beta:
-                break
-        return int(best_score)
-
+    capture_sequences = [
+        seq
+        for seq in ordered_turn_sequences(
+            board,
+            current,
+            ctx.ordering,
+            ply=position.ply,
+            previous=position.last_move,
+            with_boards=False,
+            dedupe=True,
+        )
+        if seq.is_capture
+    ]
     best_score = stand_pat
+    delta_pruning = ctx.search.delta_pruning
+    enemy = opponent(current)
     for sequence in capture_sequences:
-        score = quiescence(sequence.board, next_player, root_player, alpha, beta, ctx, depth + 1)
-        if score < best_score:
+        if delta_pruning:
+            gain = captured_material(board, sequence.captured_positions, enemy, ctx.weights)
+            if stand_pat + gain + ctx.search.delta_margin <= alpha:
+                continue
+        position.make(sequence)
+        score = -quiescence(position, -beta, -alpha, ctx, depth + 1)
+        position.unmake()
+        if score > best_score:
             best_score = score
-        beta = min(beta, best_score)
+        alpha = max(alpha, best_score)
         if alpha >= beta:
             break
     return int(best_score)
@@ -436,96 +491,104 @@ def quiescence(
 
 
 def alpha_beta(
-    board: Board,
-    current: str,
-    root_player: str,
+    position: SearchPosition,
     depth: int,
     alpha: int,
     beta: int,
     ctx: SearchContext,
 ) -> int:
+    """Negamax principal variation search; the score is from the side to move's point of view."""
     _check_timeout(ctx)
+    board = position.board
+    current = position.player
     status = game_status(board)
-    if status == f"{root_player}_win":
+    if status == f"{current}_win":
         return WIN_SCORE + depth
-    if status == f"{opponent(root_player)}_win":
+    if status is not None:
         return -WIN_SCORE - depth
+    if ctx.tablebase is not None:
+        counts = position.counts
+        known = ctx.tablebase.probe_board(board, current, (counts["w"], counts["W"], counts["b"], counts["B"]))
+        if known is not None:
+            if known.outcome == DRAW:
+                return 0
+            score = WIN_SCORE + depth - known.distance
+            return score if known.outcome == WIN else -score
     if depth <= 0:
-        return quiescence(board, current, root_player, alpha, beta, ctx)
+        return quiescence(position, alpha, beta, ctx)
 
     alpha_orig = alpha
-    beta_orig = beta
-    key = board_signature(board, current)
-    entry = ctx.cache.get(key)
-    tt_steps = None
-    if entry and entry.depth >= depth:
-        tt_steps = entry.best_steps
-        if entry.flag == "exact":
-            return entry.score
-        if entry.flag == "lower":
-            alpha = max(alpha, entry.score)
-        elif entry.flag == "upper":
-            beta = min(beta, entry.score)
-        if alpha >= beta:
-            return entry.score
-    elif entry:
-        tt_steps = entry.best_steps
+    key = position.key
+    entry = ctx.tt.probe(key)
+    tt_move = 0
+    if entry is not None:
+        tt_move = entry.move
+        if entry.depth >= depth:
+            if entry.flag == EXACT:
+                return entry.score
+            if entry.flag == LOWER:
+                alpha = max(alpha, entry.score)
+            elif entry.flag == UPPER:
+                beta = min(beta, entry.score)
+            if alpha >= beta:
+                return entry.score
 
-    sequences = ordered_turn_sequences(board, current, ctx.history, tt_steps)
+    ply = position.ply
+    previous = position.last_move
+    sequences = ordered_turn_sequences(
+        board,
+        current,
+        ctx.ordering,
+        tt_move,
+        ply=ply,
+        previous=previous,
+        with_boards=False,
+        dedupe=True,
+    )
     if not sequences:
-        return evaluate_board(board, root_player, ctx.weights)
+        return evaluate_position(position, current, ctx.weights)
 
-    maximizing = current == root_player
-    next_player = opponent(current)
+    best_score = -math.inf
     best_steps: tuple[Move, ...] | None = None
-
-    if maximizing:
-        best_score = -math.inf
-        for sequence in sequences:
-            extension = 1 if depth <= 3 and (sequence.is_capture or sequence_promotes(board, sequence)) else 0
-            score = alpha_beta(
-                sequence.board,
-                next_player,
-                root_player,
-                depth - 1 + extension,
-                alpha,
-                beta,
-                ctx,
-            )
-            if score > best_score:
-                best_score = score
-                best_steps = sequence.steps
-            alpha = max(alpha, best_score)
-            if alpha >= beta:
-                ctx.history[(current, sequence.steps)] = ctx.history.get((current, sequence.steps), 0) + depth * depth
-                break
-    else:
-        best_score = math.inf
-        for sequence in sequences:
-            extension = 1 if depth <= 3 and (sequence.is_capture or sequence_promotes(board, sequence)) else 0
-            score = alpha_beta(
-                sequence.board,
-                next_player,
-                root_player,
-                depth - 1 + extension,
-                alpha,
-                beta,
-                ctx,
+    settings = ctx.search
+    can_reduce = settings.late_move_reductions and depth >= settings.lmr_min_depth
+    for index, sequence in enumerate(sequences):
+        tactical = sequence.is_capture or sequence_promotes(board, sequence)
+        extension = 1 if depth <= 3 and tactical else 0
+        reduction = 1 if can_reduce and not tactical and index >= settings.lmr_full_moves else 0
+        child_depth = depth - 1 + extension
+        position.make(sequence)
+        if index == 0:
+            score = -alpha_beta(position, child_depth, -beta, -alpha, ctx)
+        else:
+            score = -alpha_beta(position, child_depth - reduction, -alpha - 1, -alpha, ctx)
+            if reduction and score > alpha:
+                score = -alpha_beta(position, child_depth, -alpha - 1, -alpha, ctx)
+            if alpha < score < beta:
+                score = -alpha_beta(position, child_depth, -beta, -alpha, ctx)
+        position.unmake()
+        if score > best_score:
+            best_score = score
+            best_steps = sequence.steps
+        alpha = max(alpha, best_score)
+        if alpha >= beta:
+            ctx.ordering.record_cutoff(
+                current,
+                sequence.steps,
+                pack_move(sequence.steps),
+                depth,
+                ply=ply,
+                previous=previous,
+                quiet=not sequence.is_capture,
             )
-            if score < best_score:
-                best_score = score
-                best_steps = sequence.steps
-            beta = min(beta, best_score)
-            if alpha >= beta:
-                ctx.history[(current, sequence.steps)] = ctx.history.get((current, sequence.steps), 0) + depth * depth
-                break
+            break
 
-    flag = "exact"
+    flag = EXACT
     if best_score <= alpha_orig:
-        flag = "upper"
-    elif best_score >= beta_orig:
-        flag = "lower"
-    ctx.cache[key] = TTEntry(depth=depth, score=int(best_score), flag=flag, best_steps=best_steps)
+        flag = UPPER
+    elif best_score >= beta:
+        flag = LOWER
+    ctx.tt.store(key, depth, int(best_score), flag, pack_move(best_steps))
     return int(best_score)
 
 
@@ -537,13 +600,16 @@ def search_root(
     sequences: list[TurnSequence],
     ctx: SearchContext,
     preferred_steps: tuple[Move, ...] | None = None,
-) -> tuple[TurnSequence, int]:
-    tt_entry = ctx.cache.get(board_signature(board, player))
-    tt_steps = preferred_steps or (tt_entry.best_steps if tt_entry else None)
+    alpha: int = -WIN_SCORE,
+    beta: int = WIN_SCORE,
+) -> tuple[TurnSequence, int, int]:
+    root_key = position_hash(board, player)
+    tt_entry = ctx.tt.probe(root_key)
+    tt_move = pack_move(preferred_steps) or (tt_entry.move if tt_entry else 0)
     ordered = list(sequences)
     safety_penalties = {
         seq.steps: root_safety_penalty(
-            seq.board,
+            apply_sequence(board, seq),
             player,
             ctx.weights,
             own_capture_value=captured_material(
@@ -556,11 +622,14 @@ def search_root(
         )
         for seq in ordered
     }
+    memory_bonuses = ctx.root_bonuses
+    if memory_bonuses is None:
+        memory_bonuses = root_memory_bonuses(board, player, ordered, ctx.memory, ctx.memory_strength)
     ordered.sort(
         key=lambda seq: (
-            move_priority(board, seq, player, history=ctx.history, tt_steps=tt_steps)
+            move_priority(board, seq, player, ctx.ordering, tt_move)
             + root_tactical_bonus(seq, ctx.weights)
-            + root_memory_bonus(board, player, seq, ctx.memory, ctx.memory_strength)
+            + memory_bonuses.get(seq.steps, 0)
             - safety_penalties[seq.steps]
         ),
         reverse=True,
@@ -569,25 +638,24 @@ def search_root(
     best_sequence = ordered[0]
     best_score = -math.inf
     best_raw_score = -math.inf
-    alpha = -WIN_SCORE
-    beta = WIN_SCORE
-    next_player = opponent(player)
+    alpha_orig = alpha
+    position = SearchPosition(board, player, ctx.square_table)
 
-    for sequence in ordered:
+    for index, sequence in enumerate(ordered):
         extension = 1 if depth <= 2 and (sequence.is_capture or sequence_promotes(board, sequence)) else 0
-        raw_score = alpha_beta(
-            sequence.board,
-            next_player,
-            player,
-            depth - 1 + extension,
-            alpha,
-            beta,
-            ctx,
-        )
+        child_depth = depth - 1 + extension
+        position.make(sequence)
+        if index == 0:
+            raw_score = -alpha_beta(position, child_depth, -beta, -alpha, ctx)
+        else:
+            raw_score = -alpha_beta(position, child_depth, -alpha - 1, -alpha, ctx)
+            if alpha < raw_score < beta:
+                raw_score = -alpha_beta(position, child_depth, -beta, -alpha, ctx)
+        position.unmake()
         score = raw_score
         if abs(raw_score) < WIN_SCORE // 2:
             score += root_tactical_bonus(sequence, ctx.weights)
-            score += root_memory_bonus(board, player, sequence, ctx.memory, ctx.memory_strength)
+            score += memory_bonuses.get(sequence.steps, 0)
             score -= safety_penalties[sequence.steps]
         if score > best_score:
             best_score = score
@@ -595,14 +663,111 @@ def search_root(
             best_sequence = sequence
         if raw_score > alpha:
             alpha = raw_score
+        if raw_score >= beta:
+            best_raw_score = max(best_raw_score, raw_score)
+            break
 
-    ctx.cache[board_signature(board, player)] = TTEntry(
-        depth=depth,
-        score=int(best_raw_score),
-        flag="exact",
-        best_steps=best_sequence.steps,
-    )
-    return best_sequence, int(best_score)
+    flag = EXACT
+    if best_raw_score <= alpha_orig:
+        flag = UPPER
+    elif best_raw_score >= beta:
+        flag = LOWER
+    ctx.tt.store(root_key, depth, int(best_raw_score), flag, pack_move(best_sequence.steps))
+    return best_sequence, int(best_score), int(best_raw_score)
+
+
+
+def only_sensible_reply(
+    board: Board,
+    player: str,
+    sequences: list[TurnSequence],
+    best: TurnSequence,
+    score: int,
+    depth: int,
+    ctx: SearchContext,
+) -> bool:
+    """True when a shallow null-window search shows every alternative is far worse than ``best``."""
+    threshold = score - EASY_MOVE_MARGIN
+    position = SearchPosition(board, player, ctx.square_table)
+    for sequence in sequences:
+        if sequence.steps == best.steps:
+            continue
+        position.make(sequence)
+        try:
+            value = -alpha_beta(position, depth // 2, -threshold - 1, -threshold, ctx)
+        finally:
+            position.unmake()
+        if value > threshold:
+            return False
+    return True
+
+
+
+def iterative_search(
+    board: Board,
+    player: str,
+    sequences: list[TurnSequence],
+    ctx: SearchContext,
+    *,
+    max_depth: int,
+    start_depth: int = 1,
+) -> tuple[TurnSequence, int]:
+    best_sequence = sequences[0]
+    root_entry = ctx.tt.probe(position_hash(board, player))
+    if root_entry is not None:
+        best_sequence = next(
+            (seq for seq in sequences if pack_move(seq.steps) == root_entry.move),
+            best_sequence,
+        )
+    preferred_steps = best_sequence.steps
+    previous_score: int | None = None
+    completed_depth = 0
+
+    for depth in range(max(1, start_depth), max_depth + 1):
+        ctx.ordering.age()
+        alpha, beta = -WIN_SCORE, WIN_SCORE
+        if previous_score is not None and depth > 2 and abs(previous_score) < WIN_SCORE // 2:
+            alpha = previous_score - ASPIRATION_WINDOW
+            beta = previous_score + ASPIRATION_WINDOW
+        try:
+            while True:
+                candidate, _, raw_score = search_root(
+                    board,
+                    player,
+                    depth,
+                    sequences,
+                    ctx,
+                    preferred_steps=preferred_steps,
+                    alpha=alpha,
+                    beta=beta,
+                )
+                if raw_score <= alpha and alpha > -WIN_SCORE:
+                    alpha = -WIN_SCORE
+                elif raw_score >= beta and beta < WIN_SCORE:
+                    beta = WIN_SCORE
+                    preferred_steps = candidate.steps
+                else:
+                    break
+        except SearchTimeout:
+            break
+        best_sequence = candidate
+        preferred_steps = candidate.steps
+        previous_score = raw_score
+        completed_depth = depth
+
+        manager = ctx.time_manager
+        if manager is None:
+            continue
+        manager.record_iteration(candidate.steps, raw_score)
+        if depth == EASY_MOVE_DEPTH and abs(raw_score) < WIN_SCORE // 2:
+            try:
+                manager.easy_move = only_sensible_reply(board, player, sequences, candidate, raw_score, depth, ctx)
+            except SearchTimeout:
+                break
+        if manager.should_stop():
+            break
+
+    return best_sequence, completed_depth
 
 
 
@@ -614,36 +779,32 @@ def search_best_turn(
     max_depth: int,
     time_limit: float,
     weights: EvaluationWeights = HARD_WEIGHTS,
+    search: SearchSettings = DEFAULT_SEARCH,
     memory: MoveMemory | None = None,
     memory_strength: int = DEFAULT_MEMORY_STRENGTH,
+    should_stop: Callable[[], bool] | None = None,
+    tt: TranspositionTable | None = None,
+    tablebase: Tablebase | None = None,
+    time_manager: TimeManager | None = None,
 ) -> TurnSequence:
+    sequences = dedupe_sequences(board, sequences)
     if len(sequences) == 1:
         return sequences[0]
 
     ctx = SearchContext(
         deadline=time.perf_counter() + time_limit,
         weights=weights,
+        search=search,
         memory=memory,
         memory_strength=memory_strength,
+        tt=tt if tt is not None else TranspositionTable(),
+        square_table=square_tables(weights),
+        tablebase=tablebase,
+        time_manager=time_manager,
+        should_stop=should_stop,
     )
-    best_sequence = sequences[0]
-    preferred_steps = best_sequence.steps
-
-    for depth in range(1, max_depth + 1):
-        try:
-            candidate, _ = search_root(
-                board,
-                player,
-                depth,
-                sequences,
-                ctx,
-                preferred_steps=preferred_steps,
-            )
-        except SearchTimeout:
-            break
-        best_sequence = candidate
-        preferred_steps = candidate.steps
-
+    ctx.tt.new_search()
+    best_sequence, _ = iterative_search(board, player, sequences, ctx, max_depth=max_depth)
     return best_sequence
 
 
@@ -661,25 +822,30 @@ def select_medium_turn(
     sequences: list[TurnSequence],
     *,
     weights: EvaluationWeights = HARD_WEIGHTS,
+    search: SearchSettings = DEFAULT_SEARCH,
     time_limit: float = 0.2,
+    should_stop: Callable[[], bool] | None = None,
+    tt: TranspositionTable | None = None,
 ) -> TurnSequence:
-    ctx = SearchContext(deadline=time.perf_counter() + time_limit, weights=weights)
+    ctx = SearchContext(
+        deadline=time.perf_counter() + time_limit,
+        weights=weights,
+        search=search,
+        tt=tt if tt is not None else TranspositionTable(),
+        square_table=square_tables(weights),
+        should_stop=should_stop,
+    )
+    ctx.tt.new_search()
     scored: list[tuple[int, TurnSequence]] = []
     for sequence in sequences:
+        position = SearchPosition(board, player, ctx.square_table)
+        position.make(sequence)
         try:
-            score = alpha_beta(
-                sequence.board,
-                opponent(player),
-                player,
-                2,
-                -WIN_SCORE,
-                WIN_SCORE,
-                ctx,
-            )
+            score = -alpha_beta(position, 2, -WIN_SCORE, WIN_SCORE, ctx)
         except SearchTimeout:
             if scored:
                 break
-            score = evaluate_board(sequence.board, player, weights)
+            score = evaluate_board(apply_sequence(board, sequence), player, weights)
         score += len(sequence.captured_positions) * 14
         scored.append((score, sequence))
     scored.sort(key=lambda item: item[0], reverse=True)
@@ -696,12 +862,18 @@ def select_hard_turn(
     sequences: list[TurnSequence],
     *,
     weights: EvaluationWeights = HARD_WEIGHTS,
+    search: SearchSettings = DEFAULT_SEARCH,
     max_depth: int | None = None,
     time_limit: float | None = None,
     memory: MoveMemory | None = None,
     memory_strength: int = DEFAULT_MEMORY_STRENGTH,
+    should_stop: Callable[[], bool] | None = None,
+    tt: TranspositionTable | None = None,
+    remaining_time: float | None = None,
+    time_scale: float = 1.0,
 ) -> TurnSequence:
     piece_count = sum(1 for row in board for piece in row if piece)
+    time_manager = None
     if max_depth is None or time_limit is None:
         if piece_count > 18:
             default_depth = 12
@@ -716,7 +888,37 @@ def select_hard_turn(
             default_depth = 16
             default_time = 12.0
         max_depth = default_depth if max_depth is None else max_depth
-        time_limit = default_time if time_limit is None else time_limit
+        if time_limit is None and remaining_time is None:
+            # Without a clock the bot keeps the old fixed thinking time.
+            time_limit = default_time * time_scale
+        elif time_limit is None:
+            time_manager = TimeManager(budget_for_move(default_time * time_scale, piece_count, remaining_time))
+            time_limit = time_manager.budget.hard
+    tablebase = default_tablebase()
+    if tablebase is not None and piece_count <= tablebase.max_pieces:
+        known = tablebase.best_sequence(board, player, sequences)
+        if known is not None:
+            return known
+    if search.parallel_workers > 1:
+        # Imported here because parallel_search builds on this module's search functions.
+        from .parallel_search import parallel_search_best_turn
+
+        return parallel_search_best_turn(
+            board,
+            player,
+            sequences,
+            workers=search.parallel_workers,
+            max_depth=max_depth,
+            time_limit=time_limit,
+            weights=weights,
+            search=search,
+            memory=memory,
+            memory_strength=memory_strength,
+            should_stop=should_stop,
+            tt=tt if isinstance(tt, SharedTranspositionTable) else None,
+            tablebase=tablebase,
+            time_manager=time_manager,
+        )
     return search_best_turn(
         board,
         player,
@@ -724,8 +926,13 @@ def select_hard_turn(
         max_depth=max_depth,
         time_limit=time_limit,
         weights=weights,
+        search=search,
         memory=memory,
         memory_strength=memory_strength,
+        should_stop=should_stop,
+        tt=tt,
+        tablebase=tablebase,
+        time_manager=time_manager,
     )
 
 
@@ -738,19 +945,33 @@ def choose_turn(
     max_depth: int | None = None,
     time_limit: float | None = None,
     weights: EvaluationWeights | None = None,
+    search: SearchSettings | None = None,
     memory: MoveMemory | None = None,
     memory_strength: int = DEFAULT_MEMORY_STRENGTH,
     use_default_memory: bool = True,
+    should_stop: Callable[[], bool] | None = None,
+    tt: TranspositionTable | None = None,
+    remaining_time: float | None = None,
+    time_scale: float = 1.0,
 ) -> TurnSequence | None:
     profile = profile_for_difficulty(difficulty)
     normalized_difficulty = normalize_difficulty(difficulty)
     active_weights = weights or profile.weights
+    active_search = search or profile.search
+    if time_scale < 1.0 and active_search.parallel_workers > 1:
+        # A loaded server has no spare cores for Lazy SMP helpers.
+        active_search = replace(active_search, parallel_workers=1)
     active_memory = memory
     if active_memory is None and use_default_memory and normalized_difficulty == "hardcore":
-        active_memory = MoveMemory.load(DEFAULT_MEMORY_PATH)
+        active_memory = shared_move_memory(SEARCH_MEMORY_PATH)
     sequences = ordered_turn_sequences(board, player)
     if not sequences:
         return None
+    book = default_opening_book() if active_search.opening_book else None
+    if book is not None:
+        book_move = book.choose(board, player, sequences, active_search.book_randomness)
+        if book_move is not None:
+            return book_move
     if difficulty == "easy":
         return select_easy_turn(sequences)
     if difficulty == "medium":
@@ -759,27 +980,66 @@ def choose_turn(
             player,
             sequences,
             weights=active_weights,
+            search=active_search,
             time_limit=time_limit or 0.2,
+            should_stop=should_stop,
+            tt=tt,
         )
     return select_hard_turn(
         board,
         player,
         sequences,
         weights=active_weights,
+        search=active_search,
         max_depth=max_depth,
         time_limit=time_limit,
         memory=active_memory,
         memory_strength=memory_strength,
+        should_stop=should_stop,
+        tt=tt,
+        remaining_time=remaining_time,
+        time_scale=time_scale,
     )
 
 
-async def bot_turn(
+def predicted_reply(board: Board, player: str, tt: TranspositionTable | None) -> tuple[Move, ...] | None:
+    """The reply the last search expects from ``player``, read from the transposition table."""
+    if tt is None:
+        return None
+    entry = tt.probe(position_hash(board, player))
+    if entry is None or not entry.move:
+        return None
+    for sequence in generate_turn_sequences(board, player, with_boards=False):
+        if pack_move(sequence.steps) == entry.move:
+            return sequence.steps
+    return None
+
+
+def play_bot_turn(
     board: Board,
     player: str,
     difficulty: str = "easy",
+    *,
+    should_stop: Callable[[], bool] | None = None,
+    game_id: str | None = None,
+    clock_expires: float | None = None,
+    time_scale: float = 1.0,
 ) -> tuple[Board, list[tuple[int, int]], list[tuple[int, int]]]:
+    remaining_time = None if clock_expires is None else max(0.0, clock_expires - time.time())
+    tt = None
+    if game_id is not None and difficulty != "easy":
+        parallel = profile_for_difficulty(difficulty).search.parallel_workers > 1
+        tt = table_for_game(game_id, shared=parallel)
     try:
-        sequence = choose_turn(board, player, difficulty)
+        sequence = choose_turn(
+            board,
+            player,
+            difficulty,
+            should_stop=should_stop,
+            tt=tt,
+            remaining_time=remaining_time,
+            time_scale=time_scale,
+        )
     except SearchTimeout:
         logger.warning("Bot search timed out for %s difficulty=%s, falling back to best ordered move", player, difficulty)
         fallback_sequences = ordered_turn_sequences(board, player)
@@ -788,4 +1048,12 @@ async def bot_turn(
         return board, [], []
     starts = [start for start, _ in sequence.steps]
     ends = [end for _, end in sequence.steps]
-    return sequence.board, starts, ends
+    return apply_sequence(board, sequence), starts, ends
+
+
+async def bot_turn(
+    board: Board,
+    player: str,
+    difficulty: str = "easy",
+) -> tuple[Board, list[tuple[int, int]], list[tuple[int, int]]]:
+    return await asyncio.to_thread(play_bot_turn, board, player, difficulty)
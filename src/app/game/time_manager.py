@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+
+from .game_logic import Move
+
+CLOCK_RESERVE_SECONDS = float(os.getenv("CHECKERS_CLOCK_RESERVE", "1.5"))
+MIN_MOVE_SECONDS = 0.2
+HARD_LIMIT_FACTOR = 3.0
+HARD_CLOCK_FRACTION = 0.2
+ITERATION_GROWTH = 2.0
+STABLE_ITERATIONS = 3
+STABLE_FACTOR = 0.5
+SCORE_DROP = 40
+SCORE_DROP_FACTOR = 2.0
+EASY_MOVE_DEPTH = 4
+EASY_MOVE_MARGIN = 250
+
+
+@dataclass(frozen=True)
+class TimeBudget:
+    soft: float
+    hard: float
+
+
+def expected_moves_left(piece_count: int) -> int:
+    return 8 + piece_count
+
+
+def budget_for_move(cap: float, piece_count: int, remaining: float | None = None) -> TimeBudget:
+    """Soft and hard limits for one move; without a clock the old fixed cap is both."""
+    if remaining is None:
+        return TimeBudget(cap, cap)
+    usable = max(0.0, remaining - CLOCK_RESERVE_SECONDS)
+    soft = min(cap, max(MIN_MOVE_SECONDS, usable / expected_moves_left(piece_count)))
+    hard = min(cap * 2, soft * HARD_LIMIT_FACTOR, max(soft, usable * HARD_CLOCK_FRACTION))
+    return TimeBudget(soft, hard)
+
+
+class TimeManager:
+    """Decides after each completed iteration whether another one is worth starting."""
+
+    def __init__(self, budget: TimeBudget, started: float | None = None) -> None:
+        self.budget = budget
+        self.started = time.perf_counter() if started is None else started
+        self.best_steps: tuple[Move, ...] | None = None
+        self.stable_iterations = 0
+        self.last_score: int | None = None
+        self.score_dropped = False
+        self.easy_move = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def soft_limit(self) -> float:
+        limit = self.budget.soft
+        if self.score_dropped:
+            limit *= SCORE_DROP_FACTOR
+        elif self.stable_iterations >= STABLE_ITERATIONS:
+            limit *= STABLE_FACTOR
+        return min(limit, self.budget.hard)
+
+    def record_iteration(self, steps: tuple[Move, ...], score: int) -> None:
+        if steps == self.best_steps:
+            self.stable_iterations += 1
+        else:
+            self.best_steps = steps
+            self.stable_iterations = 1
+        self.score_dropped = self.last_score is not None and score < self.last_score - SCORE_DROP
+        self.last_score = score
+
+    def should_stop(self) -> bool:
+        if self.easy_move:
+            return True
+        return self.elapsed * ITERATION_GROWTH >= self.soft_limit
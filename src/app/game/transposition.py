@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import os
+from array import array
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+from .game_logic import Move
+
+TT_MEGABYTES = int(os.getenv("CHECKERS_TT_MB", "8"))
+TT_MAX_GAMES = int(os.getenv("CHECKERS_TT_GAMES", "8"))
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+ENTRY_BYTES = 16
+HEADER_BYTES = 64
+SCORE_BITS = 22
+SCORE_BIAS = 1 << (SCORE_BITS - 1)
+SCORE_MASK = (1 << SCORE_BITS) - 1
+DEPTH_MASK = 0x7F
+MOVE_BITS = 30
+MOVE_MASK = (1 << MOVE_BITS) - 1
+GENERATIONS = 8
+KEY_MASK = (1 << 64) - 1
+
+# data word layout: score:22 | depth:7 | flag:2 | generation:3 | move:30
+DEPTH_SHIFT = SCORE_BITS
+FLAG_SHIFT = DEPTH_SHIFT + 7
+GENERATION_SHIFT = FLAG_SHIFT + 2
+MOVE_SHIFT = GENERATION_SHIFT + 3
+
+
+def bucket_count(megabytes: float) -> int:
+    entries = max(2, int(megabytes * 1024 * 1024) // ENTRY_BYTES)
+    return 1 << max(0, (entries // 2).bit_length() - 1)
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    score: int
+    flag: int
+    move: int
+
+
+def pack_move(steps: tuple[Move, ...] | None) -> int:
+    if not steps:
+        return 0
+    start_row, start_col = steps[0][0]
+    end_row, end_col = steps[-1][1]
+    start = start_row * 8 + start_col
+    end = end_row * 8 + end_col
+    return (start << 24) | (end << 18) | (hash(steps) & 0x3FFFF)
+
+
+class TranspositionTable:
+    """Fixed-size two-way bucketed table: slot 0 keeps the deepest entry, slot 1 always takes the newest.
+
+    Keys are stored xor-ed with their data word, so an entry torn by a concurrent
+    writer in another process simply fails to match instead of returning garbage.
+    """
+
+    def __init__(self, megabytes: float = TT_MEGABYTES, buffer: memoryview | None = None) -> None:
+        buckets = bucket_count(megabytes)
+        self.bucket_mask = buckets - 1
+        if buffer is None:
+            self.slots = array("Q", bytes(buckets * 2 * ENTRY_BYTES))
+        else:
+            self.slots = buffer[: buckets * 2 * ENTRY_BYTES].cast("Q")
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.slots) // 2
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.slots) * self.slots.itemsize
+
+    def new_search(self) -> None:
+        self.generation = (self.generation + 1) % GENERATIONS
+
+    def clear(self) -> None:
+        self.slots[:] = array("Q", bytes(len(self.slots) * self.slots.itemsize))
+        self.generation = 0
+
+    def probe(self, key: int) -> TTEntry | None:
+        key &= KEY_MASK
+        slots = self.slots
+        index = (key & self.bucket_mask) << 2
+        self.probes += 1
+        data = slots[index + 1]
+        if not data or slots[index] ^ data != key:
+            data = slots[index + 3]
+            if not data or slots[index + 2] ^ data != key:
+                return None
+        self.hits += 1
+        return TTEntry(
+            depth=(data >> DEPTH_SHIFT) & DEPTH_MASK,
+            score=(data & SCORE_MASK) - SCORE_BIAS,
+            flag=(data >> FLAG_SHIFT) & 3,
+            move=data >> MOVE_SHIFT,
+        )
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: int = 0) -> None:
+        key &= KEY_MASK
+        depth = max(1, min(DEPTH_MASK, depth))
+        score = max(-SCORE_BIAS, min(SCORE_BIAS - 1, int(score)))
+        data = (
+            (score + SCORE_BIAS)
+            | (depth << DEPTH_SHIFT)
+            | (flag << FLAG_SHIFT)
+            | (self.generation << GENERATION_SHIFT)
+            | ((move & MOVE_MASK) << MOVE_SHIFT)
+        )
+        slots = self.slots
+        index = (key & self.bucket_mask) << 2
+        stored_key = slots[index]
+        stored = slots[index + 1]
+        same_key = bool(stored) and stored_key ^ stored == key
+        if (
+            same_key
+            or not stored
+            or (stored >> DEPTH_SHIFT) & DEPTH_MASK <= depth
+            or (stored >> GENERATION_SHIFT) & (GENERATIONS - 1) != self.generation
+        ):
+            if stored and not same_key:
+                slots[index + 2] = stored_key
+                slots[index + 3] = stored
+            slots[index] = key ^ data
+            slots[index + 1] = data
+        else:
+            slots[index + 2] = key ^ data
+            slots[index + 3] = data
+        self.stores += 1
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "capacity": self.capacity,
+            "size_bytes": self.size_bytes,
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+        }
+
+    def close(self) -> None:
+        pass
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """A table living in ``multiprocessing.shared_memory`` so helper processes can search into it.
+
+    The first word of the segment is a stop flag the owner raises to end helper searches early.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, megabytes: float, *, owner: bool) -> None:
+        self.shm = shm
+        self.megabytes = megabytes
+        self.owner = owner
+        self._control = shm.buf[:HEADER_BYTES].cast("Q")
+        super().__init__(megabytes, shm.buf[HEADER_BYTES:])
+
+    @classmethod
+    def create(cls, megabytes: float = TT_MEGABYTES) -> SharedTranspositionTable:
+        size = HEADER_BYTES + bucket_count(megabytes) * 2 * ENTRY_BYTES
+        return cls(shared_memory.SharedMemory(create=True, size=size), megabytes, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, megabytes: float) -> SharedTranspositionTable:
+        return cls(shared_memory.SharedMemory(name=name), megabytes, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def stop_requested(self) -> bool:
+        return bool(self._control[0])
+
+    def request_stop(self) -> None:
+        self._control[0] = 1
+
+    def reset_stop(self) -> None:
+        self._control[0] = 0
+
+    def close(self) -> None:
+        self.slots.release()
+        self._control.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_game_tables: OrderedDict[str, TranspositionTable] = OrderedDict()
+
+
+def table_for_game(
+    game_id: str,
+    megabytes: float = TT_MEGABYTES,
+    *,
+    shared: bool = False,
+) -> TranspositionTable:
+    table = _game_tables.get(game_id)
+    if table is not None and isinstance(table, SharedTranspositionTable) != shared:
+        release_game_table(game_id)
+        table = None
+    if table is None:
+        while len(_game_tables) >= max(1, TT_MAX_GAMES):
+            _, evicted = _game_tables.popitem(last=False)
+            evicted.close()
+        table = SharedTranspositionTable.create(megabytes) if shared else TranspositionTable(megabytes)
+        _game_tables[game_id] = table
+    else:
+        _game_tables.move_to_end(game_id)
+    return table
+
+
+def game_table(game_id: str) -> TranspositionTable | None:
+    return _game_tables.get(game_id)
+
+
+def release_game_table(game_id: str) -> bool:
+    table = _game_tables.pop(game_id, None)
+    if table is None:
+        return False
+    table.close()
+    return True
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+from typing import List, Optional
+
+Board = List[List[Optional[str]]]
+
+ZOBRIST_SEED = 0x5EED_C4EC
+PIECES = ("w", "W", "b", "B")
+SWAPPED = {"w": "b", "W": "B", "b": "w", "B": "W"}
+
+
+def _build_keys() -> tuple[dict[str, tuple[int, ...]], int]:
+    rng = random.Random(ZOBRIST_SEED)
+    keys = {piece: tuple(rng.getrandbits(64) for _ in range(64)) for piece in PIECES}
+    return keys, rng.getrandbits(64)
+
+
+PIECE_KEYS, SIDE_KEY = _build_keys()
+MIRROR_KEYS: dict[str, tuple[int, ...]] = {
+    piece: tuple(PIECE_KEYS[SWAPPED[piece]][63 - square] for square in range(64))
+    for piece in PIECES
+}
+
+
+def piece_key(piece: str, row: int, col: int) -> int:
+    return PIECE_KEYS[piece][row * 8 + col]
+
+
+def mirror_piece_key(piece: str, row: int, col: int) -> int:
+    return MIRROR_KEYS[piece][row * 8 + col]
+
+
+def side_key(player: str) -> int:
+    return SIDE_KEY if player == "black" else 0
+
+
+def board_hashes(board: Board) -> tuple[int, int]:
+    value = mirrored = 0
+    for row in range(8):
+        cells = board[row]
+        base = row * 8
+        for col in range(8):
+            piece = cells[col]
+            if piece is not None:
+                value ^= PIECE_KEYS[piece][base + col]
+                mirrored ^= MIRROR_KEYS[piece][base + col]
+    return value, mirrored
+
+
+def board_hash(board: Board) -> int:
+    value = 0
+    for row in range(8):
+        cells = board[row]
+        base = row * 8
+        for col in range(8):
+            piece = cells[col]
+            if piece is not None:
+                value ^= PIECE_KEYS[piece][base + col]
+    return value
+
+
+def position_hash(board: Board, player: str) -> int:
+    return board_hash(board) ^ side_key(player)
+
+
+def memory_hash(board: Board, player: str) -> int:
+    if player == "white":
+        return board_hash(board)
+    return board_hashes(board)[1]
+
+
+def hash_key(value: int) -> str:
+    return f"{value:016x}"
@@ -55,13 +55,12 @@ from src.base.redis import (
 )
 from src.base.lobby_redis import clear_lobby_board
 from src.app.game.game_logic import (
+    LegalMoveTable,
     apply_move,
     format_move,
-    legal_piece_moves,
+    generate_legal_moves,
     piece_capture_moves,
-    game_status,
-    man_moves,
-    king_moves,
+    status_from_tables,
     opponent,
     owner,
     create_initial_board
@@ -114,23 +113,13 @@ Point = Tuple[int, int]
 
 board_router = APIRouter()
 
-def determine_win_reason(board: Board, winner: str) -> str:
+def determine_win_reason(board: Board, winner: str, table: LegalMoveTable | None = None) -> str:
     opponent = "black" if winner == "white" else "white"
-    has_piece = False
-    can_move = False
-    for r in range(8):
-        for c in range(8):
-            p = board[r][c]
-            if not p or owner(p) != opponent:
-                continue
-            has_piece = True
-            moves = man_moves(board, (r, c), opponent) if p.islower() else king_moves(board, (r, c), opponent)
-            if moves:
-                can_move = True
-                break
-    if not has_piece:
+    if table is None or table.player != opponent:
+        table = generate_legal_moves(board, opponent)
+    if not table.pieces:
         return "no_pieces"
-    if not can_move:
+    if not table.has_moves:
         return "no_moves"
     return "unknown"
 
@@ -354,18 +343,10 @@ async def api_get_moves(board_id: str, row: int, col: int, player: str):
     if timers and timers.get("turn") != player:
         return []
     chain_state = await get_chain_state(board_id)
-    forced_piece = _forced_piece(chain_state)
-    blocked_positions = _blocked_positions(chain_state)
     p = board[row][col] if 0 <= row < 8 and 0 <= col < 8 else None
     if not p or owner(p) != player:
         return []
-    return legal_piece_moves(
-        board,
-        (row, col),
-        player,
-        blocked_positions=blocked_positions,
-        forced_start=forced_piece,
-    )
+    return generate_legal_moves(board, player, chain_state).moves_for((row, col))
 
 @board_router.get("/api/captures/{board_id}", response_model=List[Point])
 async def api_get_captures(board_id: str, row: int, col: int, player: str):
@@ -485,7 +466,10 @@ async def api_make_move(request: Request, board_id: str, req: MoveRequest):
     await pipe2.execute()
 
     history_list.append(move_notation)
-    status = None if more_captures else game_status(new_board)
+    move_tables: dict[str, LegalMoveTable] = {}
+    if not more_captures:
+        move_tables = {color: generate_legal_moves(new_board, color) for color in ("white", "black")}
+    status = status_from_tables(move_tables["white"], move_tables["black"]) if move_tables else None
     if not more_captures and status is None:
         draw_state, draw_status = update_draw_state(
             draw_state,
@@ -500,7 +484,10 @@ async def api_make_move(request: Request, board_id: str, req: MoveRequest):
         await save_draw_state(board_id, draw_state)
         if draw_status:
             status = draw_status
-    reason = determine_win_reason(new_board, status.split("_")[0]) if status in ("white_win", "black_win") else None
+    reason = None
+    if status in ("white_win", "black_win"):
+        winner = status.split("_")[0]
+        reason = determine_win_reason(new_board, winner, move_tables.get(opponent(winner)))
     timers_out = timers.copy()
     timers_out.pop("last_ts", None)
     rating_change = None
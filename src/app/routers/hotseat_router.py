@@ -11,7 +11,7 @@ from src.app.game.draw_logic import (
     rebuild_draw_state_from_history,
     update_draw_state,
 )
-from src.app.game.game_logic import apply_move, format_move, game_status, legal_piece_moves, opponent, piece_capture_moves
+from src.app.game.game_logic import apply_move, format_move, game_status, generate_legal_moves, opponent, piece_capture_moves
 from src.base.redis import (
     assign_user_hotseat,
     get_user_board,
@@ -244,13 +244,7 @@ async def api_hotseat_moves(board_id: str, row: int, col: int, player: str):
     if timers and timers.get("turn") != player:
         return []
     chain_state = await get_chain_state(board_id)
-    return legal_piece_moves(
-        board,
-        (row, col),
-        player,
-        blocked_positions=_blocked_positions(chain_state),
-        forced_start=_forced_piece(chain_state),
-    )
+    return generate_legal_moves(board, player, chain_state).moves_for((row, col))
 
 
 @hotseat_router.get("/api/hotseat/captures/{board_id}", response_model=List[Point])
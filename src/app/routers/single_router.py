@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import uuid
 import logging
 from fastapi import Request, APIRouter, HTTPException
@@ -16,11 +17,13 @@ from src.app.game.game_logic import (
     apply_move,
     format_move,
     game_status,
+    generate_legal_moves,
     opponent,
     piece_capture_moves,
 )
 from src.app.routers.ws_router import single_board_manager
-from src.app.game.single_logic import bot_turn, legal_moves
+from src.app.game.bot_executor import BotSearchCancelled, BotSearchRejected, bot_executor
+from src.app.game.bot_jobs import DONE, BotJob, BotJobError, bot_jobs
 from src.base.single_redis import (
     clear_chain_state,
     game_exists,
@@ -55,6 +58,7 @@ Board = List[List[Optional[str]]]
 Point = Tuple[int, int]
 
 single_router = APIRouter()
+BOT_RETRY_AFTER = "2"
 game_difficulties: dict[str, str] = {}
 game_colors: dict[str, str] = {}
 
@@ -121,7 +125,20 @@ async def _run_bot_turn(
 ) -> MoveResult:
     difficulty = normalize_difficulty(game_difficulties.get(game_id, "easy"))
     bot_start_board = board
-    bot_board, starts, ends = await bot_turn(board, bot_color, difficulty)
+    clock = await get_current_timers(game_id, create=False)
+    remaining_time = float(clock[bot_color]) if clock and clock.get("turn") == bot_color else None
+    try:
+        bot_board, starts, ends = await bot_executor.run(
+            game_id,
+            board,
+            bot_color,
+            difficulty,
+            remaining_time=remaining_time,
+        )
+    except BotSearchCancelled:
+        raise HTTPException(status_code=409, detail="Game finished")
+    except BotSearchRejected:
+        raise HTTPException(status_code=503, detail="Bot is busy", headers={"Retry-After": BOT_RETRY_AFTER})
     timers = await get_current_timers(game_id, create=False) or await get_current_timers(game_id)
 
     for index, (start, end) in enumerate(zip(starts, ends)):
@@ -167,6 +184,7 @@ async def _run_bot_turn(
         await expire_board(game_id, delay=600)
     else:
         timers = await get_current_timers(game_id)
+        bot_executor.ponder(game_id, bot_board, bot_color, difficulty, remaining_time=timers[bot_color])
 
     result = MoveResult(board=bot_board, status=status, history=history, timers=timers)
     await single_board_manager.broadcast(game_id, result.json())
@@ -174,6 +192,8 @@ async def _run_bot_turn(
 
 
 async def _log_game_result(game_id: str, status: str):
+    bot_executor.cancel(game_id)
+    bot_executor.release(game_id)
     user = await get_game_user(game_id)
     if not user or is_guest(str(user)):
         game_difficulties.pop(game_id, None)
@@ -244,6 +264,14 @@ class MoveResult(BaseModel):
     forced_moves: List[Point] = Field(default_factory=list)
 
 
+class BotMoveJob(BaseModel):
+    job_id: Optional[str] = None
+    status: str
+    result: Optional[MoveResult] = None
+    status_code: Optional[int] = None
+    detail: Optional[str] = None
+
+
 class PlayerAction(BaseModel):
     player: str
 
@@ -327,7 +355,12 @@ async def api_get_board(game_id: str):
     if color == "black" and not history:
         difficulty = normalize_difficulty(game_difficulties.get(game_id, "easy"))
         start_board = board
-        board, starts, ends = await bot_turn(board, "white", difficulty)
+        try:
+            board, starts, ends = await bot_executor.run(game_id, board, "white", difficulty)
+        except BotSearchCancelled:
+            raise HTTPException(status_code=409, detail="Game finished")
+        except BotSearchRejected:
+            raise HTTPException(status_code=503, detail="Bot is busy", headers={"Retry-After": BOT_RETRY_AFTER})
         for index, (start, end) in enumerate(zip(starts, ends)):
             await append_history(game_id, format_move(start, end))
             if index + 1 < len(starts):
@@ -398,13 +431,7 @@ async def api_get_moves(game_id: str, row: int, col: int, player: str):
     if timers and timers.get("turn") != player:
         return []
     chain_state = await get_chain_state(game_id)
-    return legal_moves(
-        board,
-        (row, col),
-        player,
-        blocked_positions=_blocked_positions(chain_state),
-        forced_start=_forced_piece(chain_state),
-    )
+    return generate_legal_moves(board, player, chain_state).moves_for((row, col))
 
 
 @single_router.get("/api/single/captures/{game_id}", response_model=List[Point])
@@ -558,13 +585,14 @@ async def api_make_move(game_id: str, req: MoveRequest):
         await single_board_manager.broadcast(game_id, result.json())
         return result
 
+    bot_executor.ponder_reply(game_id, new_board, opponent(req.player))
     result = MoveResult(board=new_board, status=None, history=history, timers=await get_current_timers(game_id))
     await single_board_manager.broadcast(game_id, result.json())
     return result
 
 
-@single_router.post("/api/single/bot_move/{game_id}", response_model=MoveResult)
-async def api_single_bot_move(game_id: str):
+async def _current_bot_turn(game_id: str) -> tuple[Board, list[str], str, str] | MoveResult:
+    """The position the bot has to move from, or the unchanged state when it is not the bot's turn."""
     if not await game_exists(game_id):
         raise HTTPException(status_code=404)
     human_color = game_colors.get(game_id, "white")
@@ -581,8 +609,59 @@ async def api_single_bot_move(game_id: str):
     chain_state = await get_chain_state(game_id)
     if chain_state:
         return MoveResult(board=board, status=None, history=history, timers=timers)
-    draw_state = await _load_draw_state(game_id, history)
-    return await _run_bot_turn(game_id, board, history, draw_state, bot_color, human_color)
+    return board, history, bot_color, human_color
+
+
+async def _bot_move_job(game_id: str) -> MoveResult:
+    try:
+        turn = await _current_bot_turn(game_id)
+        if isinstance(turn, MoveResult):
+            return turn
+        board, history, bot_color, human_color = turn
+        draw_state = await _load_draw_state(game_id, history)
+        return await _run_bot_turn(game_id, board, history, draw_state, bot_color, human_color)
+    except HTTPException as exc:
+        raise BotJobError(exc.status_code, str(exc.detail))
+
+
+async def _report_failed_bot_job(job: BotJob) -> None:
+    await single_board_manager.broadcast(job.game_id, json.dumps({"bot_job": _job_payload(job)}))
+
+
+def _job_payload(job: BotJob) -> dict:
+    payload = job.payload()
+    payload.pop("game_id")
+    payload.pop("ply")
+    return payload
+
+
+@single_router.post("/api/single/bot_move/{game_id}", response_model=BotMoveJob, status_code=202)
+async def api_single_bot_move(game_id: str):
+    """Queue the bot's reply; the finished move is pushed on /ws/single/{game_id} and kept for polling."""
+    turn = await _current_bot_turn(game_id)
+    if isinstance(turn, MoveResult):
+        return BotMoveJob(status=DONE, result=turn)
+    _, history, _, _ = turn
+    job = bot_jobs.submit(
+        game_id,
+        len(history),
+        lambda: _bot_move_job(game_id),
+        on_failure=_report_failed_bot_job,
+    )
+    return BotMoveJob(**_job_payload(job))
+
+
+@single_router.get("/api/single/bot_move/{game_id}/{job_id}", response_model=BotMoveJob)
+async def api_single_bot_move_status(game_id: str, job_id: str):
+    job = bot_jobs.get(job_id)
+    if job is None or job.game_id != game_id:
+        raise HTTPException(status_code=404)
+    return BotMoveJob(**_job_payload(job))
+
+
+@single_router.get("/api/single/bot_metrics")
+async def api_single_bot_metrics():
+    return JSONResponse({**bot_executor.metrics(), "jobs": bot_jobs.metrics()})
 
 
 @single_router.get("/api/single/snapshot/{game_id}/{index}", response_model=Board)
@@ -21,6 +21,8 @@ const MOVE_CHAIN_PAUSE_MS = 60;
 const MOVE_MODE_KEY = 'checkerMoveMode';
 const HISTORY_SCROLL_TOLERANCE = 8;
 const HISTORY_SCROLL_SETTLE_MS = 420;
+const BOT_JOB_POLL_MS = 1000;
+const BOT_RETRY_MS = 2000;
 let dragState = null;
 let moveInputMode = normalizeMoveInputMode(
     typeof window.checkerMoveMode === 'string' ? window.checkerMoveMode : readFallbackMoveInputMode()
@@ -99,6 +101,8 @@ let viewedMoveIndex = 0;
 let isPerformingAutoMove = false;
 let pendingMove = false;
 let pendingBotMove = false;
+let activeBotJob = null;
+let wakeBotJobWaiter = null;
 let animatingBoard = false;
 let timeoutCheckPending = false;
 let lastHistoryLen = 0;
@@ -722,7 +726,13 @@ async function requestBotMove() {
             showNotification(data.detail || 'Ошибка хода бота', 'error');
             return;
         }
-        await queueHandleUpdate(data);
+        const job = await waitForBotJob(data);
+        if (!job) return;
+        if (job.status === 'failed') {
+            await handleBotJobFailure(job);
+            return;
+        }
+        if (job.result) await queueHandleUpdate(job.result);
     } catch (error) {
         showNotification('Ошибка соединения', 'error');
     } finally {
@@ -731,6 +741,43 @@ async function requestBotMove() {
     }
 }
 
+async function waitForBotJob(job) {
+    // The move normally arrives over the websocket, which clears activeBotJob; polling covers a dropped socket.
+    activeBotJob = job.job_id;
+    while (job.status === 'pending') {
+        await new Promise(resolve => {
+            wakeBotJobWaiter = resolve;
+            setTimeout(resolve, BOT_JOB_POLL_MS);
+        });
+        wakeBotJobWaiter = null;
+        if (activeBotJob !== job.job_id) return null;
+        const res = await fetch(`/api/single/bot_move/${boardId}/${job.job_id}`);
+        if (!res.ok) {
+            activeBotJob = null;
+            return null;
+        }
+        job = await res.json();
+    }
+    activeBotJob = null;
+    return job;
+}
+
+function wakeBotJob() {
+    // Lets requestBotMove finish right away instead of at its next poll.
+    if (wakeBotJobWaiter) wakeBotJobWaiter();
+}
+
+async function handleBotJobFailure(job) {
+    if (job.status_code === 503) {
+        setTimeout(requestBotMove, BOT_RETRY_MS);
+        return;
+    }
+    if (job.status_code === 409) {
+        await fetchBoard();
+    }
+    showNotification(job.detail || 'Ошибка хода бота', 'error');
+}
+
 async function performMove(startR, startC, endR, endC, isCapture) {
     if (pendingMove) return;
     pendingMove = true;
@@ -1088,7 +1135,20 @@ function setupWebSocket() {
     const ws = new WebSocket(buildWsUrl());
     ws.addEventListener('message', async (e) => {
         const data = JSON.parse(e.data);
+        if (data.bot_job) {
+            if (activeBotJob === data.bot_job.job_id) {
+                activeBotJob = null;
+                await handleBotJobFailure(data.bot_job);
+                wakeBotJob();
+            }
+            return;
+        }
+        const botJobDone = activeBotJob && (data.status || (data.timers && data.timers.turn === myColor));
+        if (botJobDone) {
+            activeBotJob = null;
+        }
         await queueHandleUpdate(data);
+        if (botJobDone) wakeBotJob();
         await maybeRequestBotMove(data);
     });
     ws.addEventListener('close', () => {
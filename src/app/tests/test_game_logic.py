@@ -1,18 +1,64 @@
 import asyncio
+import os
+import time
+from dataclasses import replace
 
 from src.app.game.draw_logic import initial_draw_state, update_draw_state
 from src.app.game.game_logic import (
+    SearchPosition,
     apply_move,
+    create_initial_board,
     game_status,
+    generate_legal_moves,
     generate_turn_sequences,
     opponent,
     piece_capture_moves,
     rebuild_board_from_moves,
 )
+from src.app.game.bitboard import board_game_status, board_turn_sequences, from_board, to_board
 from src.app.game.bot_arena import ArenaBot, run_match
-from src.app.game.bot_memory import MoveMemory, outcome_score
-from src.app.game.bot_profiles import profile_for_difficulty
-from src.app.game.single_logic import bot_turn, choose_turn, evaluate_board
+from src.app.game.bot_executor import BotSearchCancelled, BotSearchExecutor, BotSearchRejected
+from src.app.game.bot_jobs import BotJobError, BotJobRegistry
+from src.app.game import bot_memory
+from src.app.game.bot_memory import (
+    MappedMoveMemory,
+    MoveMemory,
+    MoveMemoryCache,
+    is_binary_memory,
+    legacy_board_memory_key,
+    open_memory,
+    outcome_score,
+    write_binary_memory,
+)
+from src.app.game.zobrist import memory_hash, position_hash
+from src.app.game.bot_profiles import (
+    profile_for_difficulty,
+    profile_from_mapping,
+    profile_to_dict,
+    square_tables,
+    weights_from_mapping,
+)
+from src.app.game.endgame import WIN, Tablebase, TablebaseResult, build_tablebase, write_tablebase
+from src.app.game.opening_book import OpeningBook, book_move, collect_book, game_turns, write_book
+from src.app.game.parallel_search import parallel_search_best_turn, shutdown_helpers
+from src.app.game.move_ordering import MoveOrdering, sequence_index
+from src.app.game import single_logic
+from src.app.game.single_logic import (
+    bot_turn,
+    choose_turn,
+    evaluate_board,
+    evaluate_position,
+    ordered_turn_sequences,
+)
+from src.app.game.time_manager import TimeBudget, TimeManager, budget_for_move
+from src.app.game.transposition import (
+    EXACT,
+    LOWER,
+    SharedTranspositionTable,
+    TranspositionTable,
+    pack_move,
+    table_for_game,
+)
 
 
 def empty_board():
@@ -82,6 +128,28 @@ def test_forced_chain_must_continue_with_same_piece():
         raise AssertionError('switching to another piece during a capture chain must be rejected')
 
 
+def test_legal_move_table_marks_mandatory_capture_for_whole_side():
+    board = board_with((5, 0, 'w'), (5, 4, 'w'), (4, 1, 'b'), (0, 7, 'b'))
+
+    table = generate_legal_moves(board, 'white')
+
+    assert table.must_capture
+    assert table.pieces == 2
+    assert table.moves == {(5, 0): [(3, 2)]}
+    assert table.moves_for((5, 4)) == []
+
+
+def test_legal_move_table_respects_chain_state():
+    board = board_with((3, 2, 'w'), (5, 4, 'w'), (2, 3, 'b'), (4, 5, 'b'))
+    chain_state = {'player': 'white', 'piece': [3, 2], 'captured_positions': [[4, 1]]}
+
+    table = generate_legal_moves(board, 'white', chain_state)
+
+    assert table.forced_piece == (3, 2)
+    assert list(table.moves) == [(3, 2)]
+    assert table.moves_for((3, 2)) == [(1, 4)]
+
+
 def test_king_cannot_move_through_square_of_already_captured_piece():
     board = empty_board()
     board[5][2] = 'W'
@@ -99,6 +167,94 @@ def test_king_cannot_move_through_square_of_already_captured_piece():
     ) == []
 
 
+def test_bitboard_engine_matches_board_engine_on_king_chains():
+    board = board_with(
+        (7, 0, 'W'),
+        (5, 2, 'b'),
+        (2, 5, 'b'),
+        (1, 4, 'b'),
+        (4, 5, 'B'),
+        (6, 5, 'w'),
+        (1, 0, 'w'),
+    )
+
+    for player in ('white', 'black'):
+        expected = [(seq.steps, seq.board, seq.captured_positions) for seq in generate_turn_sequences(board, player)]
+        actual = [(seq.steps, seq.board, seq.captured_positions) for seq in board_turn_sequences(board, player)]
+        assert actual == expected
+    assert to_board(from_board(board)) == board
+    assert board_game_status(board) == game_status(board)
+
+
+def test_capture_chain_promotes_and_continues_as_flying_king():
+    board = board_with((2, 1, 'w'), (1, 2, 'b'), (2, 5, 'b'), (7, 0, 'b'))
+
+    sequences = generate_turn_sequences(board, 'white')
+
+    assert [seq.steps for seq in sequences] == [
+        (((2, 1), (0, 3)), ((0, 3), (3, 6))),
+        (((2, 1), (0, 3)), ((0, 3), (4, 7))),
+    ]
+    assert all(seq.captured_positions == ((1, 2), (2, 5)) for seq in sequences)
+    assert sequences[0].board[3][6] == 'W'
+    assert sequences[0].board[1][2] is None and sequences[0].board[2][5] is None
+    assert board[2][1] == 'w' and board[1][2] == 'b'
+
+
+def test_dedupe_keeps_one_capture_sequence_per_resulting_position():
+    board = board_with((7, 6, 'W'), (3, 2, 'b'), (1, 6, 'b'), (6, 7, 'b'), (6, 5, 'B'))
+
+    sequences = generate_turn_sequences(board, 'white')
+    deduped = generate_turn_sequences(board, 'white', dedupe=True)
+
+    assert len(sequences) == 5
+    assert [seq.steps[-1][1] for seq in deduped] == [(2, 1), (1, 0), (0, 7)]
+    assert deduped[0].alternatives == ((((7, 6), (4, 3)), ((4, 3), (2, 1))),)
+    represented = {seq.steps for seq in deduped} | {alt for seq in deduped for alt in seq.alternatives}
+    assert represented == {seq.steps for seq in sequences}
+
+
+def test_search_position_make_unmake_restores_board():
+    board = board_with((2, 1, 'w'), (1, 2, 'b'), (3, 4, 'b'), (6, 1, 'B'))
+    expected = [seq.board for seq in generate_turn_sequences(board, 'white')]
+    position = SearchPosition(board, 'white')
+
+    for sequence, expected_board in zip(generate_turn_sequences(board, 'white', with_boards=False), expected):
+        assert sequence.board is None
+        position.make(sequence)
+        assert position.board == expected_board
+        assert position.player == 'black'
+        assert position.key == position_hash(expected_board, 'black')
+        assert position.memory_key('black') == memory_hash(expected_board, 'black')
+        position.unmake()
+        assert position.board == board
+        assert position.player == 'white'
+        assert position.key == position_hash(board, 'white')
+
+
+def test_incremental_evaluation_matches_full_evaluation():
+    weights = profile_for_difficulty('hardcore').weights
+    board = board_with((2, 1, 'w'), (5, 2, 'w'), (7, 4, 'W'), (1, 2, 'b'), (3, 4, 'b'), (6, 1, 'B'))
+    position = SearchPosition(board, 'white', square_tables(weights))
+
+    for sequence in generate_turn_sequences(board, 'white', with_boards=False):
+        position.make(sequence)
+        for player in ('white', 'black'):
+            assert evaluate_position(position, player, weights) == evaluate_board(position.board, player, weights)
+        position.unmake()
+    assert position.square_score == SearchPosition(board, 'white', square_tables(weights)).square_score
+
+
+def test_square_tables_are_compiled_once_per_weights():
+    hard = profile_for_difficulty('hard').weights
+    tuned = weights_from_mapping({'center': 40}, hard)
+    table = square_tables(tuned)
+
+    assert table is square_tables(weights_from_mapping({'center': 40}, hard))
+    assert table['w'][3 * 8 + 2] - square_tables(hard)['w'][3 * 8 + 2] == 32
+    assert table['b'][4 * 8 + 5] == -table['w'][3 * 8 + 2]
+
+
 def test_rebuild_board_replays_history_from_initial_position():
     moves = [
         ((5, 0), (4, 1)),
@@ -129,6 +285,224 @@ def test_hard_bot_prefers_longer_capture_sequence():
     assert final_board[3][6] is None
 
 
+def test_endgame_tablebase_solves_two_piece_positions(tmp_path):
+    path = write_tablebase(tmp_path / 'tablebase.bin', build_tablebase(2))
+    tablebase = Tablebase(path)
+    try:
+        board = board_with((5, 2, 'W'), (4, 3, 'b'))
+        assert tablebase.probe_board(board, 'white') == TablebaseResult(WIN, 1)
+        assert tablebase.probe_board(board, 'black') == TablebaseResult(WIN, 1)
+
+        board = board_with((7, 0, 'W'), (1, 6, 'b'))
+        sequences = ordered_turn_sequences(board, 'white')
+        best = tablebase.best_sequence(board, 'white', sequences)
+        assert tablebase.probe_board(best.board, 'black').outcome != WIN
+        assert tablebase.probe_board(board_with((7, 0, 'W'), (1, 6, 'b'), (1, 0, 'b')), 'white') is None
+    finally:
+        tablebase.close()
+
+
+def test_opening_book_prefers_the_most_successful_recorded_move(tmp_path):
+    games = [
+        (['C3->D4', 'F6->E5', 'D4->F6'], 'white_win'),
+        (['C3->D4', 'F6->G5'], 'white_win'),
+        (['C3->B4', 'F6->E5'], 'black_win'),
+        (['E3->F4', 'B6->A5'], 'draw'),
+    ]
+    turns = list(game_turns(games[0][0]))
+    assert [steps for _, _, steps in turns] == [
+        (((5, 2), (4, 3)),),
+        (((2, 5), (3, 4)),),
+        (((4, 3), (2, 5)),),
+    ]
+
+    book = OpeningBook(write_book(tmp_path / 'book.bin', collect_book(games, max_plies=2)))
+    try:
+        board = create_initial_board()
+        sequences = ordered_turn_sequences(board, 'white')
+        assert len(book.moves(position_hash(board, 'white'))) == 3
+        assert book.choose(board, 'white', sequences, 0).steps == (((5, 2), (4, 3)),)
+        assert book.choose(board, 'black', ordered_turn_sequences(board, 'black'), 0) is None
+    finally:
+        book.close()
+
+
+def test_opening_book_keeps_capture_paths_with_the_same_ends_apart(tmp_path):
+    board = board_with((6, 3, 'w'), (5, 2, 'b'), (3, 2, 'b'), (5, 4, 'b'), (3, 4, 'b'), (0, 7, 'b'))
+    sequences = generate_turn_sequences(board, 'white')
+    first, second = sequences
+    assert (first.steps[0][0], first.steps[-1][1]) == (second.steps[0][0], second.steps[-1][1])
+
+    counts = {(position_hash(board, 'white'), book_move(second.steps)): [3, 6]}
+    book = OpeningBook(write_book(tmp_path / 'book.bin', counts))
+    try:
+        assert book.choose(board, 'white', sequences, 0).steps == second.steps
+    finally:
+        book.close()
+
+
+def test_time_manager_scales_budget_with_clock_and_stability():
+    assert budget_for_move(6.0, 24) == TimeBudget(6.0, 6.0)
+    short = budget_for_move(6.0, 24, remaining=30.0)
+    assert short.soft < 1.0 < short.hard <= 3 * short.soft
+
+    manager = TimeManager(TimeBudget(4.0, 8.0), started=time.perf_counter() - 1.5)
+    manager.record_iteration((((5, 0), (4, 1)),), 10)
+    assert not manager.should_stop()
+    manager.record_iteration((((5, 0), (4, 1)),), 12)
+    manager.record_iteration((((5, 0), (4, 1)),), 11)
+    assert manager.should_stop()
+    manager.record_iteration((((5, 2), (4, 3)),), -60)
+    assert manager.score_dropped and manager.soft_limit == 8.0
+    assert not manager.should_stop()
+
+
+def test_search_without_a_clock_uses_the_full_fixed_time():
+    search = replace(profile_for_difficulty('hard').search, opening_book=False, parallel_workers=1)
+    started = time.perf_counter()
+    choose_turn(create_initial_board(), 'white', 'hard', search=search, use_default_memory=False, time_scale=0.2)
+
+    assert time.perf_counter() - started >= 1.0
+
+
+def test_transposition_table_keeps_deep_entry_and_replaces_newest():
+    table = TranspositionTable(megabytes=0.001)
+    move = pack_move((((5, 0), (4, 1)),))
+    colliding = 7 + (table.bucket_mask + 1)
+
+    table.store(7, 6, -1234, LOWER, move)
+    table.store(colliding, 2, 55, EXACT)
+    table.store(colliding + (table.bucket_mask + 1), 1, 99, EXACT)
+
+    assert table.probe(7) == (6, -1234, LOWER, move)
+    assert table.probe(colliding) is None
+    assert table.probe(colliding + (table.bucket_mask + 1)).score == 99
+
+
+def test_killer_and_counter_moves_are_ordered_first():
+    board = board_with((5, 0, 'w'), (5, 4, 'w'), (6, 7, 'w'), (0, 1, 'b'))
+    ordering = MoveOrdering()
+    killer = (((6, 7), (5, 6)),)
+    counter = (((5, 0), (4, 1)),)
+    previous = ((1, 2), (0, 1))
+
+    ordering.record_cutoff('white', killer, pack_move(killer), 3, ply=2, previous=None, quiet=True)
+    ordering.record_cutoff('white', counter, pack_move(counter), 1, ply=5, previous=previous, quiet=True)
+
+    at_killer_ply = ordered_turn_sequences(board, 'white', ordering, ply=2)
+    after_previous = ordered_turn_sequences(board, 'white', ordering, ply=0, previous=previous)
+    assert at_killer_ply[0].steps == killer
+    assert after_previous[0].steps == counter
+
+    ordering.age()
+    assert ordering.history_score('white', sequence_index(killer)) == 4
+
+
+def test_search_pruning_is_configured_per_profile():
+    hardcore = profile_for_difficulty('hardcore')
+    data = profile_to_dict(hardcore)
+    data['search'] = {'late_move_reductions': False, 'delta_margin': 200}
+    profile = profile_from_mapping(data)
+    board = board_with((5, 0, 'w'), (5, 2, 'w'), (6, 5, 'w'), (2, 1, 'b'), (2, 5, 'b'), (1, 6, 'b'), (0, 3, 'b'))
+
+    assert not profile.search.late_move_reductions
+    assert profile.search.delta_pruning
+    assert profile.search.delta_margin == 200
+    assert profile_from_mapping(profile_to_dict(profile)) == profile
+    sequence = choose_turn(board, 'white', 'hard', max_depth=5, time_limit=5, search=profile.search)
+    assert sequence is not None
+
+
+def test_hard_search_reuses_game_transposition_table():
+    board = board_with((5, 0, 'w'), (5, 2, 'w'), (6, 5, 'w'), (2, 1, 'b'), (2, 5, 'b'), (1, 6, 'b'))
+    table = table_for_game('tt-game')
+
+    choose_turn(board, 'white', 'hard', max_depth=3, time_limit=5, tt=table)
+
+    assert table.stores > 0
+    assert table_for_game('tt-game') is table
+    choose_turn(board, 'white', 'hard', max_depth=3, time_limit=5, tt=table)
+    assert table.hits > 0
+
+
+def test_parallel_search_shares_table_with_helper_processes():
+    board = board_with((5, 0, 'w'), (5, 2, 'w'), (6, 5, 'w'), (2, 1, 'b'), (2, 5, 'b'), (1, 6, 'b'))
+    sequences = ordered_turn_sequences(board, 'white')
+    table = SharedTranspositionTable.create(1)
+    try:
+        turn = parallel_search_best_turn(board, 'white', sequences, workers=2, max_depth=4, time_limit=5, tt=table)
+        assert turn.steps in {sequence.steps for sequence in sequences}
+        assert table.stop_requested
+        assert table.stores > 0
+    finally:
+        table.close()
+        shutdown_helpers()
+
+
+def test_bot_executor_runs_search_in_worker_process():
+    board = board_with((5, 0, 'w'), (0, 7, 'b'))
+    executor = BotSearchExecutor(workers=1)
+
+    try:
+        final_board, starts, ends = asyncio.run(executor.run('game', board, 'white', 'hard'))
+    finally:
+        executor.shutdown()
+
+    assert starts == [(5, 0)]
+    assert ends == [(4, 1)]
+    assert final_board[4][1] == 'w'
+    metrics = executor.metrics()
+    assert metrics['completed'] == 1
+    assert metrics['queue_depth'] == 0
+
+
+def test_bot_executor_ponders_after_bot_move():
+    board = board_with((5, 0, 'w'), (5, 4, 'w'), (2, 3, 'b'), (1, 6, 'b'))
+    executor = BotSearchExecutor(workers=1)
+
+    async def scenario():
+        after, _, _ = await executor.run('game', board, 'white', 'hard', remaining_time=20)
+        predicted = executor._predictions['game']
+        assert executor.ponder('game', after, 'white', 'hard', remaining_time=20)
+        assert executor.metrics()['pondering'] == 1
+        reply = next(seq for seq in generate_turn_sequences(after, 'black') if seq.steps == predicted)
+        assert executor.ponder_reply('game', reply.board, 'white')
+        await executor.run('game', reply.board, 'white', 'hard', remaining_time=20)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics['completed'] == 2
+    assert (metrics['ponder_hits'], metrics['ponder_misses'], metrics['ponder_reused']) == (1, 0, 1)
+
+
+def test_bot_executor_cancels_search_when_game_ends():
+    executor = BotSearchExecutor(workers=0)
+
+    async def scenario():
+        from src.app.game.game_logic import create_initial_board
+
+        task = asyncio.ensure_future(executor.run('game', create_initial_board(), 'white', 'hardcore'))
+        await asyncio.sleep(0.2)
+        assert executor.queue_depth == 1
+        assert executor.cancel('game') == 1
+        try:
+            await asyncio.wait_for(task, timeout=3)
+        except BotSearchCancelled:
+            return True
+        return False
+
+    try:
+        assert asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert executor.metrics()['cancelled'] == 1
+
+
 def test_hard_bot_avoids_simple_hanging_move():
     board = empty_board()
     board[5][2] = 'w'
@@ -214,6 +588,21 @@ def test_move_memory_shares_mirrored_black_and_white_positions():
     assert memory.average_score(black_board, 'black', black_steps) == 1.0
 
 
+def test_move_memory_migrates_legacy_board_keys(tmp_path):
+    board = board_with((2, 5, 'b'), (5, 2, 'w'))
+    steps = (((2, 5), (3, 4)),)
+    legacy_key = legacy_board_memory_key(board, 'black')
+    path = tmp_path / 'memory.json'
+    path.write_text(
+        '{"version": 2, "positions": {"%s": {"C3->D4": {"visits": 2, "score_sum": 1.0}}}}' % legacy_key,
+        encoding='utf-8',
+    )
+
+    memory = MoveMemory.load(path)
+
+    assert memory.average_score(board, 'black', steps) == 0.5
+
+
 def test_move_memory_cannot_force_simple_hanging_move():
     board = board_with((5, 2, 'w'), (3, 0, 'b'))
     memory = MoveMemory()
@@ -301,6 +690,35 @@ def test_bot_arena_updates_learning_memory():
     assert memory.position_count > 0
 
 
+def test_parallel_arena_matches_are_independent_of_worker_count():
+    smp = profile_for_difficulty('hardcore')
+    smp = replace(smp, search=replace(smp.search, parallel_workers=2))
+
+    def play(workers):
+        memory = MoveMemory()
+        candidate = ArenaBot('candidate', 'hardcore', smp, 1, 5.0, memory, exploration=0.3)
+        baseline = ArenaBot('baseline', 'hard', profile_for_difficulty('hard'), 1, 5.0)
+        report = run_match(candidate, baseline, games=3, max_plies=6, seed=11, workers=workers)
+        games = [{key: value for key, value in game.items() if key != 'duration_ms'} for game in report['games']]
+        return games, memory.positions, memory.total_updates
+
+    in_process = play(1)
+
+    assert in_process[2] > 0
+    assert play(2) == in_process
+
+
+def test_arena_bots_do_not_play_from_the_opening_book(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(single_logic, 'default_opening_book', lambda: lookups.append(1))
+    hardcore = ArenaBot('candidate', 'hardcore', profile_for_difficulty('hardcore'), max_depth=1, time_limit=0.02)
+    hard = ArenaBot('baseline', 'hard', profile_for_difficulty('hard'), max_depth=1, time_limit=0.02)
+
+    run_match(hardcore, hard, games=1, max_plies=2, seed=7, record_moves=False, opening_plies=0)
+
+    assert lookups == []
+
+
 def test_draws_are_a_small_learning_penalty():
     assert outcome_score('draw', 'white') < 0
     assert outcome_score('white_win', 'white') > 0
@@ -450,3 +868,283 @@ def test_draw_after_five_long_diagonal_attacker_moves():
     )
 
     assert status == 'draw'
+
+
+def test_bot_executor_schedules_by_clock_and_rejects_overflow():
+    executor = BotSearchExecutor(workers=0, queue_limit=2)
+    board = board_with((5, 0, 'w'), (5, 4, 'w'), (2, 3, 'b'), (1, 6, 'b'))
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run('blocker', create_initial_board(), 'white', 'hardcore'))
+        await asyncio.sleep(0.2)
+        relaxed = asyncio.ensure_future(executor.run('relaxed', board, 'white', 'easy'))
+        urgent = asyncio.ensure_future(executor.run('urgent', board, 'white', 'easy', remaining_time=30))
+        await asyncio.sleep(0)
+        assert executor.metrics()['queued'] == 2
+        try:
+            await executor.run('overflow', board, 'white', 'easy')
+        except BotSearchRejected:
+            pass
+        else:
+            raise AssertionError('a full queue must reject new searches')
+        executor.cancel('blocker')
+        await asyncio.gather(blocker, return_exceptions=True)
+        await asyncio.gather(relaxed, urgent)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics['rejected'] == 1
+    finished = [(entry['game_id'], entry['time_scale']) for entry in metrics['recent'] if not entry['cancelled']]
+    assert finished == [('urgent', 0.6), ('relaxed', 1.0)]
+
+
+def test_bot_executor_remembers_stolen_lanes_for_release():
+    executor = BotSearchExecutor(workers=2)
+    board = board_with((5, 0, 'w'), (5, 4, 'w'), (2, 3, 'b'), (1, 6, 'b'))
+    home = executor.lane_for('blocker')
+    stray = next(f'stray-{n}' for n in range(100) if executor.lane_for(f'stray-{n}') == home)
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run('blocker', create_initial_board(), 'white', 'hardcore'))
+        await asyncio.sleep(0.2)
+        await executor.run(stray, board, 'white', 'easy')
+        executor.cancel('blocker')
+        await asyncio.gather(blocker, return_exceptions=True)
+
+    try:
+        asyncio.run(scenario())
+        assert executor._game_lanes[stray] == {1 - home}
+        executor.release(stray)
+        assert stray not in executor._game_lanes
+    finally:
+        executor.shutdown()
+
+
+def test_bot_jobs_deduplicate_submissions_for_the_same_turn():
+    registry = BotJobRegistry()
+    calls = []
+    failures = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'moved'
+
+    async def busy():
+        raise BotJobError(503, 'Bot is busy')
+
+    async def report(job):
+        failures.append(job.status_code)
+
+    async def scenario():
+        first = registry.submit('game', 4, search)
+        second = registry.submit('game', 4, search)
+        assert first is second and first.status == 'pending'
+        await asyncio.sleep(0.1)
+        assert registry.get(first.job_id).payload()['result'] == 'moved'
+        assert registry.submit('game', 4, search) is first
+        failed = registry.submit('game', 6, busy, on_failure=report)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert failed.status == 'failed'
+        retried = registry.submit('game', 6, search)
+        assert retried is not failed
+        await asyncio.sleep(0.1)
+        return retried.status
+
+    assert asyncio.run(scenario()) == 'done'
+    assert len(calls) == 2
+    assert failures == [503]
+
+
+def test_move_memory_cache_reloads_only_when_the_file_changes(tmp_path):
+    path = tmp_path / 'memory.json'
+    board = board_with((5, 0, 'w'), (2, 3, 'b'))
+    steps = (((5, 0), (4, 1)),)
+    memory = MoveMemory()
+    memory.record(board, 'white', steps, 1.0)
+    memory.save(path)
+    cache = MoveMemoryCache(path, check_interval=0)
+
+    first = cache.get()
+    assert cache.get() is first
+    assert cache.loads == 1
+
+    memory.record(board, 'white', steps, 1.0)
+    memory.save(path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = cache.get()
+
+    assert reloaded is not first
+    assert reloaded.stats_for(board, 'white', steps)['visits'] == 2
+    assert first.stats_for(board, 'white', steps)['visits'] == 1
+    assert cache.metrics()['loads'] == 2
+
+
+def test_binary_move_memory_matches_json_memory(tmp_path):
+    memory = MoveMemory(metadata={'best_validation_score': 0.5})
+    board = create_initial_board()
+    for sequence in generate_turn_sequences(board, 'white'):
+        memory.record(board, 'white', sequence.steps, 1.0)
+        for reply in generate_turn_sequences(sequence.board, 'black')[:2]:
+            memory.record(sequence.board, 'black', reply.steps, -1.0)
+            memory.record(sequence.board, 'black', reply.steps, 1.0)
+    path = write_binary_memory(memory, tmp_path / 'memory.bin')
+
+    mapped = open_memory(path)
+    try:
+        assert isinstance(mapped, MappedMoveMemory)
+        assert (mapped.position_count, mapped.move_count) == (memory.position_count, memory.move_count)
+        for sequence in generate_turn_sequences(board, 'white'):
+            assert mapped.bias(board, 'white', sequence.steps) == memory.bias(board, 'white', sequence.steps)
+            for reply in generate_turn_sequences(sequence.board, 'black'):
+                assert mapped.stats_for(sequence.board, 'black', reply.steps) == memory.stats_for(
+                    sequence.board, 'black', reply.steps
+                )
+        assert mapped.to_memory().positions == memory.positions
+        assert MoveMemory.load(path).metadata == {'best_validation_score': 0.5}
+        for mutate in (
+            lambda: mapped.apply_delta('0', '5,0-4,1', 1.0),
+            mapped.new_generation,
+            lambda: mapped.update_metadata({'best_validation_score': 1.0}),
+            lambda: mapped.compact(path),
+        ):
+            try:
+                mutate()
+            except TypeError:
+                pass
+            else:
+                raise AssertionError('memory-mapped move memory must be read-only')
+        assert is_binary_memory(path)
+    finally:
+        mapped.close()
+
+
+def test_binary_move_memory_checks_full_keys_and_rejects_truncated_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot_memory, '_pack_move_code', lambda start, end, move_key: 1)
+    memory = MoveMemory()
+    board = create_initial_board()
+    first, second = generate_turn_sequences(board, 'white')[:2]
+    memory.record(board, 'white', first.steps, 1.0)
+    memory.record(board, 'white', second.steps, -1.0)
+    path = write_binary_memory(memory, tmp_path / 'memory.bin')
+
+    mapped = open_memory(path)
+    try:
+        assert mapped.stats_for(board, 'white', first.steps) == memory.stats_for(board, 'white', first.steps)
+        assert mapped.stats_for(board, 'white', second.steps) == memory.stats_for(board, 'white', second.steps)
+    finally:
+        mapped.close()
+
+    data = path.read_bytes()
+    for size in (8, len(data) - 4):
+        path.write_bytes(data[:size])
+        try:
+            MappedMoveMemory(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('a truncated binary memory must be rejected')
+
+
+def test_move_memory_journal_replays_rolls_back_and_compacts(tmp_path):
+    path = tmp_path / 'memory.json'
+    board = create_initial_board()
+    first, second = generate_turn_sequences(board, 'white')[:2]
+    memory = MoveMemory()
+    journal = memory.open_journal(path)
+    memory.record(board, 'white', first.steps, 1.0)
+    journal.flush()
+    checkpoint = journal.offset()
+    memory.record(board, 'white', second.steps, -1.0)
+    memory.update_metadata({'best_validation_score': 0.75})
+    journal.flush()
+
+    replayed = MoveMemory.load(path)
+    assert replayed.stats_for(board, 'white', second.steps)['visits'] == 1
+    assert replayed.metadata['best_validation_score'] == 0.75
+
+    memory = memory.rollback(path, checkpoint)
+    assert memory.stats_for(board, 'white', first.steps)['visits'] == 1
+    assert memory.stats_for(board, 'white', second.steps) is None
+    assert memory.metadata == {}
+
+    memory.record(board, 'white', first.steps, 1.0)
+    memory.compact(path)
+    memory.journal.close()
+    compacted = MoveMemory.load(path)
+    assert compacted.stats_for(board, 'white', first.steps)['visits'] == 2
+    assert compacted.total_updates == 2
+
+
+def test_move_memory_journal_drops_a_torn_line_before_appending(tmp_path):
+    path = tmp_path / 'memory.json'
+    board = create_initial_board()
+    first, second = generate_turn_sequences(board, 'white')[:2]
+    memory = MoveMemory()
+    memory.open_journal(path)
+    memory.record(board, 'white', first.steps, 1.0)
+    memory.journal.close()
+    with (tmp_path / 'memory.json.journal').open('a', encoding='utf-8') as f:
+        f.write('{"p":"torn')
+
+    reopened = MoveMemory.load(path)
+    reopened.open_journal(path)
+    reopened.record(board, 'white', second.steps, 1.0)
+    reopened.record(board, 'white', second.steps, -1.0)
+    reopened.journal.close()
+
+    reloaded = MoveMemory.load(path)
+    assert reloaded.total_updates == 3
+    assert reloaded.stats_for(board, 'white', second.steps)['visits'] == 2
+
+
+def test_held_journal_entries_reach_disk_only_when_released(tmp_path):
+    path = tmp_path / 'memory.json'
+    board = create_initial_board()
+    first, second = generate_turn_sequences(board, 'white')[:2]
+    memory = MoveMemory()
+    journal = memory.open_journal(path)
+    journal.hold()
+    memory.record(board, 'white', first.steps, 1.0)
+    journal.flush()
+    assert MoveMemory.load(path).total_updates == 0
+
+    journal.release()
+    journal.flush()
+    journal.hold()
+    memory.record(board, 'white', second.steps, 1.0)
+    memory = memory.rollback(path, journal.offset())
+
+    assert memory.total_updates == 1
+    assert memory.stats_for(board, 'white', second.steps) is None
+
+
+def test_move_memory_prune_reports_lost_bias_mass():
+    memory = MoveMemory()
+    board = create_initial_board()
+    strong, weak, single, deep = generate_turn_sequences(board, 'white')[:4]
+    for _ in range(5):
+        memory.record(board, 'white', strong.steps, 1.0, ply=1)
+    memory.record(board, 'white', weak.steps, 0.1, ply=1)
+    memory.record(board, 'white', weak.steps, 0.1, ply=1)
+    memory.record(board, 'white', single.steps, 1.0, ply=1)
+    memory.new_generation()
+    memory.record(board, 'white', deep.steps, -1.0, ply=30)
+    memory.record(board, 'white', deep.steps, -1.0, ply=30)
+
+    report = memory.prune(min_visits=2, max_ply=20, max_moves=1)
+
+    assert report.removed == {'low_visits': 1, 'stale': 0, 'deep': 1, 'budget': 1}
+    assert memory.stats_for(board, 'white', strong.steps)['visits'] == 5
+    assert memory.move_count == report.moves_after == 1
+    assert 0 < report.lost_fraction < 1
+    del memory.stats_for(board, 'white', strong.steps)['generation']
+    assert memory.prune(max_age=0).removed['stale'] == 0
+    memory.new_generation()
+    assert memory.prune(max_age=0).removed['stale'] == 1
@@ -294,6 +294,16 @@ async def get_recorded_game(game_id: str, session: AsyncSession) -> dict | None:
         "black_id": game.black_id,
     }
 
+@connect
+async def get_recorded_histories(session: AsyncSession, limit: int = 50_000) -> list[dict]:
+    stmt = (
+        select(RecordedGame.history, RecordedGame.result)
+        .order_by(RecordedGame.timestamp.desc())
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [{"history": json.loads(history), "result": status} for history, status in result.all()]
+
 @connect
 async def record_game(user_id: int, mode: str, result: str, elo_change: int | None, session: AsyncSession, game_id: str | None = None) -> None:
     game = GameHistory(
@@ -29,6 +29,7 @@ from src.app.routers import (
 )
 from src.settings.settings import static_files
 from src.base import postgres, redis
+from src.app.game.bot_executor import bot_executor
 
 SRC_DIR = Path(__file__).resolve().parent
 
@@ -42,6 +43,7 @@ async def lifespan(_app: FastAPI):
     await postgres.init_db()
     await redis.check_redis_connection()
     yield
+    bot_executor.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(SessionValidationMiddleware)